@@ -1,6 +1,7 @@
 # backend/api/auth_config.py
-import os
 from pydantic import EmailStr, TypeAdapter
+
+from backend.core.settings import get_settings
 from backend.services.auth.verification.core import (
     VerificationPurpose,
     get_resend_min_interval_seconds,
@@ -9,7 +10,7 @@ from backend.services.auth.verification.core import (
 EMAIL_ADAPTER = TypeAdapter(EmailStr)
 
 SESSION_COOKIE_NAME = "__Host-pcbuild_session"
-SESSION_EXPIRES_MINUTES = int(os.getenv("SESSION_EXPIRES_MINUTES", "120"))
+SESSION_EXPIRES_MINUTES = get_settings().session_expires_minutes
 
 RESEND_SIGNUP_MIN_INTERVAL_SECONDS = get_resend_min_interval_seconds(VerificationPurpose.SIGNUP)
 RESEND_PASSWORD_RESET_MIN_INTERVAL_SECONDS = get_resend_min_interval_seconds(VerificationPurpose.PASSWORD_RESET)
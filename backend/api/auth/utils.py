@@ -1,12 +1,12 @@
 # backend/api/auth_utils.py
 from datetime import datetime, timezone
-from uuid import UUID
 
 from fastapi import HTTPException, Request, Response, status
 from sqlalchemy.orm import Session as OrmSession
 
 from backend.api.auth.config import SESSION_COOKIE_NAME, SESSION_EXPIRES_MINUTES
-from backend.models import Session as SessionModel
+from backend.models import Session as SessionModel, User
+from backend.services.auth.sessions import get_session_store
 
 
 def set_session_cookie(resp: Response, session_id: str, *, max_age: int | None = None) -> None:
@@ -37,22 +37,24 @@ def clear_session_cookie(resp: Response) -> None:
 
 
 def get_valid_session_from_request(request: Request, db: OrmSession) -> SessionModel | None:
-    raw = request.cookies.get(SESSION_COOKIE_NAME)
-    if not raw:
-        return None
-
-    try:
-        sid = UUID(raw)
-    except Exception:
+    """
+    取得 cookie 對應的 session ORM 物件（需要修改 session 本身時使用，例如 verify_email 的 rotation）。
+    一般的身分驗證請走 get_current_user（經 SessionStore 快取）。
+    與 DbSessionStore 相同比對 session_generation，已被整批撤銷的 session 不能再被 rotation 延續。
+    """
+    sid = get_session_store().session_id(request.cookies.get(SESSION_COOKIE_NAME))
+    if sid is None:
         return None
 
     now = datetime.now(timezone.utc)
     return (
         db.query(SessionModel)
+        .join(User, User.id == SessionModel.user_id)
         .filter(
             SessionModel.id == sid,
             SessionModel.revoked.is_(False),
             SessionModel.expires_at > now,
+            SessionModel.generation == User.session_generation,
         )
         .first()
     )
@@ -1,68 +1,67 @@
 # backend/api/dependencies/auth.py
 from datetime import datetime, timezone
-from uuid import UUID
 
 from fastapi import Depends, HTTPException, Request, status
-from sqlalchemy.orm import Session as OrmSession
 
 from backend.api.auth.config import SESSION_COOKIE_NAME
-from backend.api.dependencies.db import get_db
-from backend.models import User, Session as SessionModel
+from backend.services.auth.sessions import ResolvedSession, SessionUser, get_session_renewer, get_session_store
 
-def get_current_user(
-    request: Request,
-    db: OrmSession = Depends(get_db),
-) -> User:
+# 續期後要寫回的 cookie（value, max_age），由 session renewal middleware 加到回應上
+RENEWED_SESSION_COOKIE_STATE = "renewed_session_cookie"
+
+
+def _resolve(raw_token: str | None) -> tuple[ResolvedSession | None, bool]:
     """
-    從 HttpOnly Cookie (pcbuild_session) 取得目前登入的使用者。
-    若 Cookie 不存在、session 無效或過期，一律回傳 401。
+    以 session cookie 的值解析出有效 session；cookie 缺少、格式錯誤、session 撤銷或過期時回傳 None。
+    經 SessionStore 解析（快取命中 / 簽章 token 時不查 DB）；可能有 DB I/O，async 呼叫端請放進 threadpool。
+    啟用滑動過期時順便續期（只記在記憶體，批次寫入 DB）：回傳延長後的 session 與「這次有續期」。
     """
-    raw_token = request.cookies.get(SESSION_COOKIE_NAME)
-    if not raw_token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="未登入或憑證已失效",
-        )
+    store = get_session_store()
+    session = store.resolve(raw_token)
+    renewer = get_session_renewer()
+    if session is None or renewer is None:
+        return session, False
 
-    try:
-        session_id = UUID(raw_token)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="未登入或憑證已失效",
-        )
+    renewed = renewer.touch(session)
+    if renewed is None:
+        return session, False
+    store.extend(renewed)
+    return renewed, True
 
-    now = datetime.now(timezone.utc)
 
-    session = (
-        db.query(SessionModel)
-        .filter(
-            SessionModel.id == session_id,
-            SessionModel.revoked.is_(False),
-            SessionModel.expires_at > now,
-        )
-        .first()
-    )
+def load_session_user(raw_token: str | None) -> SessionUser | None:
+    """
+    以 session cookie 的值查出使用者（見 _resolve）。
+    HTTP 路由經 get_current_user 使用；WebSocket 在握手與定期重新驗證時直接呼叫
+    （長連線期間也會續期；瀏覽器端的 cookie 效期在下一次 HTTP 請求時更新）。
+    """
+    session, _ = _resolve(raw_token)
+    return session.user if session is not None else None
 
+
+def get_current_user(request: Request) -> SessionUser:
+    """
+    從 HttpOnly Cookie (pcbuild_session) 取得目前登入的使用者。
+    若 Cookie 不存在、session 無效或過期，一律回傳 401。
+    session 有續期時把新的 cookie 記在 request.state，由 middleware 加到回應上（串流回應也適用）。
+    """
+    session, renewed = _resolve(request.cookies.get(SESSION_COOKIE_NAME))
     if not session:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="未登入或憑證已失效",
         )
 
-    user = db.query(User).filter(User.id == session.user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="未登入或憑證已失效",
-        )
+    if renewed:
+        max_age = (session.expires_at - datetime.now(timezone.utc)).total_seconds()
+        setattr(request.state, RENEWED_SESSION_COOKIE_STATE, (get_session_store().cookie_value(session), max_age))
 
-    return user
+    return session.user
 
 
 def get_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: SessionUser = Depends(get_current_user),
+) -> SessionUser:
     """
     僅允許「已登入且已完成 Email 驗證」的使用者通過。
     """
@@ -71,4 +70,4 @@ def get_active_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Email 尚未驗證，請先完成信箱驗證。",
         )
-    return current_user
\ No newline at end of file
+    return current_user
@@ -2,10 +2,16 @@
 from fastapi import APIRouter
 
 from backend.api.routes.auth import router as auth_router
+from backend.api.routes.builds import router as builds_router
 from backend.api.routes.chat import router as chat_router
+from backend.api.routes.conversations import router as conversations_router
 from backend.api.routes.debug import router as debug_router
+from backend.api.routes.parts import router as parts_router
 
 api_router = APIRouter()
 api_router.include_router(chat_router)
+api_router.include_router(conversations_router)
 api_router.include_router(debug_router)
+api_router.include_router(parts_router)
+api_router.include_router(builds_router)
 api_router.include_router(auth_router)
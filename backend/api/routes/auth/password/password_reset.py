@@ -4,9 +4,9 @@ from sqlalchemy.orm import Session as OrmSession
 
 from backend.api.dependencies.db import get_db
 from backend.api.auth.utils import clear_session_cookie, raise_400
-from backend.models import Session as SessionModel
 from backend.schemas.auth import ResetPasswordIn
 from backend.security import hash_password, verify_password
+from backend.services.auth.sessions import bump_session_generation, get_session_store
 from backend.services.auth.tokens.email_tokens import consume_verification_token
 from backend.services.auth.verification.core import (
     InvalidOrExpiredTokenError,
@@ -46,15 +46,11 @@ def reset_password(
     if not user.is_active:
         user.is_active = True
 
-    db.query(SessionModel).filter(
-        SessionModel.user_id == user.id,
-        SessionModel.revoked.is_(False),
-    ).update(
-        {"revoked": True},
-        synchronize_session=False,
-    )
+    # 所有既有 session 一次失效（只寫 users 一列，不逐一更新 sessions）
+    bump_session_generation(db, user.id)
 
     db.commit()
+    get_session_store().invalidate_user(user.id)
 
     clear_session_cookie(response)
     return {"ok": True}
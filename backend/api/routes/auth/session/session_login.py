@@ -15,6 +15,7 @@ from backend.api.auth.utils import raise_400, set_session_cookie
 from backend.models import User, Session as SessionModel
 from backend.schemas.auth import LoginIn
 from backend.security import verify_password
+from backend.services.auth.sessions import ResolvedSession, get_session_store
 from backend.core.middleware.throttling.rate_limit import limiter
 
 router = APIRouter()
@@ -51,11 +52,12 @@ def login(
             user_id=user.id,
             expires_at=expires_at,
             kind="login",
+            generation=user.session_generation,
         )
         db.add(session)
         db.commit()
 
-        set_session_cookie(response, str(session.id))
+        set_session_cookie(response, get_session_store().cookie_value(ResolvedSession.from_models(session, user)))
 
         return {"ok": True, "needs_verification": True}
 
@@ -69,9 +71,10 @@ def login(
         user_id=user.id,
         expires_at=expires_at,
         kind="login",
+        generation=user.session_generation,
     )
     db.add(session)
     db.commit()
 
-    set_session_cookie(response, str(session.id))
+    set_session_cookie(response, get_session_store().cookie_value(ResolvedSession.from_models(session, user)))
     return {"ok": True}
@@ -1,13 +1,13 @@
 # backend/api/routes/auth/session/session_logout.py
-from uuid import UUID
-
 from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session as OrmSession
 
 from backend.api.dependencies.db import get_db
 from backend.api.auth.config import SESSION_COOKIE_NAME
 from backend.api.auth.utils import clear_session_cookie
+from backend.api.dependencies.auth import get_current_user
 from backend.models import Session as SessionModel
+from backend.services.auth.sessions import SessionUser, bump_session_generation, get_session_store
 
 router = APIRouter()
 
@@ -22,22 +22,38 @@ def logout(
     將目前 session 標記為 revoked，並清除瀏覽器 Cookie。
     未登入時呼叫也回 204，不暴露細節。
     """
-    raw_token = request.cookies.get(SESSION_COOKIE_NAME)
-
-    if raw_token:
-        try:
-            session_id = UUID(raw_token)
-            session = (
-                db.query(SessionModel)
-                .filter(SessionModel.id == session_id, SessionModel.revoked.is_(False))
-                .first()
-            )
-            if session:
-                session.revoked = True
-                db.commit()
-        except ValueError:
-            # Cookie 不是合法 UUID，忽略即可
-            pass
+    # Cookie 缺少或格式不對（不是合法 UUID / 簽章不符）時忽略即可
+    store = get_session_store()
+    session_id = store.session_id(request.cookies.get(SESSION_COOKIE_NAME))
+
+    if session_id is not None:
+        session = (
+            db.query(SessionModel)
+            .filter(SessionModel.id == session_id, SessionModel.revoked.is_(False))
+            .first()
+        )
+        if session:
+            session.revoked = True
+            db.commit()
+        store.invalidate(session_id)
+
+    clear_session_cookie(response)
+    return
+
+
+@router.post("/logout-all", status_code=204)
+def logout_all(
+    response: Response,
+    current_user: SessionUser = Depends(get_current_user),
+    db: OrmSession = Depends(get_db),
+):
+    """
+    登出所有裝置：目前使用者的所有 session（包含這一個）一起失效，並清除瀏覽器 Cookie。
+    只把 users.session_generation +1，不逐一更新 sessions。
+    """
+    bump_session_generation(db, current_user.id)
+    db.commit()
+    get_session_store().invalidate_user(current_user.id)
 
     clear_session_cookie(response)
     return
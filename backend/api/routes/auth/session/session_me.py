@@ -1,18 +1,30 @@
 # backend/api/routes/auth/session/session_me.py
 from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session as OrmSession
 
 from backend.api.dependencies.auth import get_current_user
+from backend.api.dependencies.db import get_db
 from backend.models import User
+from backend.services.auth.sessions import SessionUser
 
 router = APIRouter()
 
 
 @router.get("/me")
-def me(current_user: User = Depends(get_current_user)):
+def me(
+    current_user: SessionUser = Depends(get_current_user),
+    db: OrmSession = Depends(get_db),
+):
+    email, username = current_user.email, current_user.username
+    # 簽章 session 的 token 不帶 email / username，這時才以 id 查一次（get_db 在用到前不會連線）
+    if email is None:
+        user = db.get(User, current_user.id)
+        email, username = user.email, user.username
+
     # 回傳欄位需符合前端既有使用（email/username/is_active）
     return {
         "id": current_user.id,
-        "email": current_user.email,
-        "username": current_user.username,
+        "email": email,
+        "username": username,
         "is_active": current_user.is_active,
     }
@@ -39,8 +39,9 @@ def resend_verification(
     # A) 沒帶 email：走 session（給 index 的事件導向用）
     if not email:
         try:
-            current_user = get_current_user(request=request, db=db)
-            email = current_user.email
+            current_user = get_current_user(request=request)
+            # 簽章 session 的 token 不帶 email，需要時以 id 查
+            email = current_user.email or db.get(User, current_user.id).email
         except HTTPException:
             # 沒登入也沒 email：一律回成功（避免暴露狀態）
             return {"ok": True}
@@ -10,6 +10,7 @@ from backend.api.dependencies.db import get_db
 from backend.api.auth.config import SESSION_COOKIE_NAME
 from backend.api.auth.utils import clear_session_cookie, get_valid_session_from_request, set_session_cookie
 from backend.models import Session as SessionModel
+from backend.services.auth.sessions import ResolvedSession, get_session_store
 from backend.services.auth.workflows.signup_verification import verify_signup_token_and_activate_user
 from backend.services.auth.verification.core import InvalidOrExpiredTokenError
 
@@ -29,6 +30,10 @@ def verify_email(
     except InvalidOrExpiredTokenError:
         return RedirectResponse(url="/verify-email-failed.html", status_code=status.HTTP_302_FOUND)
 
+    # 帳號狀態已改變：這個使用者所有快取中的 session 都要重新解析（is_active）
+    store = get_session_store()
+    store.invalidate_user(user.id)
+
     def _success(mode: str) -> RedirectResponse:
         # mode 只表達顯示邏輯，不包含任何隱私資訊
         return RedirectResponse(
@@ -52,6 +57,7 @@ def verify_email(
         current_session.revoked = True
         db.add(current_session)
         db.commit()
+        store.invalidate(current_session.id)
 
         resp = _success("login")
         clear_session_cookie(resp)
@@ -63,6 +69,7 @@ def verify_email(
         current_session.revoked = True
         db.add(current_session)
         db.commit()
+        store.invalidate(current_session.id)
 
         resp = _success("login")
         clear_session_cookie(resp)
@@ -78,13 +85,15 @@ def verify_email(
         user_id=user.id,
         expires_at=current_session.expires_at,  # 保留剩餘有效期
         kind="login",
+        generation=current_session.generation,
     )
     current_session.revoked = True
 
     db.add(new_session)
     db.add(current_session)
     db.commit()
+    store.invalidate(current_session.id)
 
     resp = _success("home")
-    set_session_cookie(resp, str(new_session.id), max_age=max_age)
+    set_session_cookie(resp, store.cookie_value(ResolvedSession.from_models(new_session, user)), max_age=max_age)
     return resp
\ No newline at end of file
@@ -0,0 +1,40 @@
+# backend/api/routes/builds.py
+from typing import Literal
+
+from fastapi import APIRouter, Query
+
+from backend.schemas.builds import BuildListOut
+from backend.services.builds import PROFILES, get_build_optimizer
+
+router = APIRouter(prefix="/api/builds", tags=["builds"])
+
+BUILDS_MAX = 10
+
+ProfileName = Literal["gaming", "creator", "balanced"]
+
+
+@router.get("", response_model=BuildListOut)
+def suggest_builds(
+    budget: int = Query(ge=1000, le=1000000),
+    profile: ProfileName = "balanced",
+    k: int = Query(default=3, ge=1, le=BUILDS_MAX),
+) -> dict:
+    """
+    預算內的整機配單建議（CPU / 主機板 / 記憶體 / 顯示卡 / 電源 / 機殼全部相容）。
+    在零件快照上以 NumPy 向量化搜尋（Pareto 剪枝 + broadcasting），不查 DB、不呼叫模型；
+    組不出來時回傳空的 items。
+    """
+    builds = get_build_optimizer().optimize(budget, PROFILES[profile], k=k)
+    return {
+        "budget": budget,
+        "profile": profile,
+        "items": [
+            {
+                "total_price": b.total_price,
+                "performance": b.performance,
+                "score": b.score,
+                "parts": b.parts,
+            }
+            for b in builds
+        ],
+    }
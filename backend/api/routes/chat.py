@@ -1,22 +1,480 @@
 # backend/api/routes/chat.py
-from fastapi import APIRouter, Depends, Request, Response
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import TypeVar
+from uuid import UUID, uuid4
 
-from backend.api.dependencies.auth import get_active_user
-from backend.core.middleware.throttling.rate_limit import limiter
-from backend.models import User
-from backend.schemas.chat import ChatIn, ChatOut
-from backend.services.chat import generate_chat_reply
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from starlette.types import Receive, Scope, Send
+
+from backend.api.auth.config import SESSION_COOKIE_NAME
+from backend.api.dependencies.auth import get_active_user, load_session_user
+from backend.core.middleware.security.csrf import is_trusted_origin
+from backend.core.middleware.throttling.rate_limit import get_client_ip, hit_shared_limit, limiter
+from backend.core.settings import get_settings
+from backend.schemas.chat import ChatBatchIn, ChatBatchItemOut, ChatBatchOut, ChatIn, ChatOut, Turn
+from backend.services.auth.sessions import SessionUser
+from backend.services.chat import (
+    ChatOverloadedError,
+    ChatQuotaExceededError,
+    UpstreamUnavailableError,
+    generate_chat_reply,
+    stream_chat_reply,
+)
+from backend.services.chat.conversations import ConversationNotFoundError, get_conversation_store
+from backend.services.chat.metrics import get_chat_metrics
+from backend.services.chat.summary import ConversationWindow
 
 router = APIRouter(prefix="/api", tags=["chat"])
 
+# /chat、/chat/stream、WebSocket 每一輪與 batch 每一題共用同一組額度，避免換個端點就能加倍請求數
+CHAT_RATE_LIMIT = "30/minute"
+CHAT_RATE_LIMIT_SCOPE = "chat"
+
+# nginx 慣例：client 在回應前關閉連線（實際上沒人會收到這個回應，只為了 access log）
+_CLIENT_CLOSED_REQUEST = 499
+
+T = TypeVar("T")
+
+# 開始回覆前就能判定、帶 status_code / retry_after 的錯誤：一律轉成附 Retry-After 的 HTTP 錯誤
+_RETRY_LATER_ERRORS = (ChatOverloadedError, ChatQuotaExceededError, UpstreamUnavailableError)
+
+
+class _ClientDisconnected(Exception):
+    pass
+
+
+class _ClosingStreamingResponse(StreamingResponse):
+    """
+    回應結束時（含串流尚未開始就被取消、client 斷線）一定關閉 body_iterator 並呼叫 on_close。
+
+    Starlette 在 ASGI spec ≥ 2.4 的 server 上不監看斷線，直到下一次 send 失敗才拋 ClientDisconnect，
+    也不會關閉 body_iterator；body_iterator 還沒開始迭代時它的 finally 更不會執行，
+    BackgroundTask 也只在正常送完之後才跑。佔著排隊名額的串流必須在這裡收尾，不能等 GC。
+    """
+
+    def __init__(self, content: AsyncIterator[str], *, on_close: Callable[[], Awaitable[None]], **kwargs) -> None:
+        super().__init__(content, **kwargs)
+        self._on_close = on_close
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                aclose = getattr(self.body_iterator, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+            finally:
+                await self._on_close()
+
+
+def _raise_overloaded(exc: ChatOverloadedError | ChatQuotaExceededError | UpstreamUnavailableError) -> None:
+    # 503：全域排隊已滿 / 上游斷路器開啟；429：同一使用者排太多 / token 額度用完。都附上估算的 Retry-After
+    raise HTTPException(
+        status_code=exc.status_code,
+        detail={"errors": {"_global": str(exc)}},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def _sse_event(event: str, data: dict) -> str:
+    # SSE 格式：event 行 + data 行（JSON 單行）+ 空行作為事件結尾
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def _wait_disconnected(request: Request) -> None:
+    # body 已由 FastAPI 讀完，之後 receive() 只會在 client 斷線時收到 http.disconnect。
+    # 不用 request.is_disconnected() 輪詢：經過 BaseHTTPMiddleware 包裝的 receive 一定會讓出控制權，
+    # 「立即取消」的檢查永遠拿不到訊息
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def _cancel_on_disconnect(request: Request, work: Awaitable[T]) -> T:
+    """
+    執行 work，同時監看 client 是否斷線（關分頁 / 換頁）。
+    先斷線就取消 work——排隊中的請求離開佇列、執行中的請求釋放名額並中止上游呼叫
+    （SingleFlight 只在沒有其他等待者時才真的取消上游）——並拋 _ClientDisconnected。
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_wait_disconnected(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+
+    if not task.done() or task.cancelled():
+        get_chat_metrics().incr("chat.cancelled")
+        raise _ClientDisconnected()
+    return task.result()
+
+
+async def _resolve_conversation(
+    body: ChatIn,
+    user: SessionUser,
+) -> tuple[UUID, list[Turn], ConversationWindow | None, bool]:
+    """
+    回傳 (conversation_id, history, window, is_new)。
+    - 有 conversation_id：由伺服器載入最近紀錄與其位置（不屬於此使用者一律 404）
+    - 沒有：配發新 id，history 沿用前端送來的內容（舊版前端相容），第一輪成功後才建立
+    """
+    if body.conversation_id is None:
+        return uuid4(), body.history, None, True
+
+    try:
+        history, window = await run_in_threadpool(
+            get_conversation_store().load_history,
+            body.conversation_id,
+            user_id=user.id,
+        )
+    except ConversationNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"errors": {"_global": "找不到這段對話。"}},
+        )
+    return body.conversation_id, history, window, False
+
+
+async def _save_round(conversation_id: UUID, user: SessionUser, message: str, reply: str, *, is_new: bool) -> None:
+    await run_in_threadpool(
+        get_conversation_store().append_turns,
+        conversation_id,
+        user_id=user.id,
+        turns=[Turn(role="user", content=message), Turn(role="ai", content=reply)],
+        create=is_new,
+    )
+
 
 @router.post("/chat", response_model=ChatOut)
-@limiter.limit("30/minute")
-def chat(
+@limiter.shared_limit(CHAT_RATE_LIMIT, scope=CHAT_RATE_LIMIT_SCOPE)
+async def chat(
     request: Request,  # SlowAPI 需要顯式 request 參數
     response: Response, # <- 新增這行（符合 SlowAPI headers_enabled=True 的要求）
     body: ChatIn,
-    _: User = Depends(get_active_user),  # 未登入→401；未驗證→403
+    current_user: SessionUser = Depends(get_active_user),  # 未登入→401；未驗證→403
 ) -> ChatOut:
-    reply_text = generate_chat_reply(message=body.message, history=body.history)
-    return ChatOut(reply=reply_text)
+    conversation_id, history, window, is_new = await _resolve_conversation(body, current_user)
+
+    # async route：Gemini 往返只佔 coroutine，不再排進 AnyIO threadpool（login / me 等 sync route 共用）
+    try:
+        reply_text = await _cancel_on_disconnect(
+            request,
+            generate_chat_reply(
+                message=body.message,
+                history=history,
+                window=window,
+                user_key=current_user.id,
+                bypass_cache=body.bypass_cache,
+            ),
+        )
+    except _RETRY_LATER_ERRORS as exc:
+        _raise_overloaded(exc)
+    except _ClientDisconnected:
+        return Response(status_code=_CLIENT_CLOSED_REQUEST)
+
+    await _save_round(conversation_id, current_user, body.message, reply_text, is_new=is_new)
+    return ChatOut(reply=reply_text, conversation_id=conversation_id)
+
+
+@router.post("/chat/stream")
+@limiter.shared_limit(CHAT_RATE_LIMIT, scope=CHAT_RATE_LIMIT_SCOPE)
+async def chat_stream(
+    request: Request,
+    response: Response,
+    body: ChatIn,
+    current_user: SessionUser = Depends(get_active_user),  # 驗證在開始串流前完成，401/403 仍是一般 JSON 回應
+) -> StreamingResponse:
+    """
+    以 Server-Sent Events 串流回覆：
+
+    - event: delta  → {"text": "..."}：模型每產生一段文字就送出
+    - event: done   → {"reply": "...", "conversation_id": "..."}：完整回覆（與 /api/chat 相同）
+    - event: error  → {"errors": {"_global": "..."}}：串流途中上游失敗
+
+    排隊已滿時在開始串流前就回 503/429（附 Retry-After）。
+    """
+    conversation_id, history, window, is_new = await _resolve_conversation(body, current_user)
+
+    try:
+        # 排隊等名額期間也可能斷線；開始串流後的斷線與收尾見 _ClosingStreamingResponse
+        chunks = await _cancel_on_disconnect(
+            request,
+            stream_chat_reply(
+                message=body.message,
+                history=history,
+                window=window,
+                user_key=current_user.id,
+                bypass_cache=body.bypass_cache,
+            ),
+        )
+    except _RETRY_LATER_ERRORS as exc:
+        _raise_overloaded(exc)
+    except _ClientDisconnected:
+        return Response(status_code=_CLIENT_CLOSED_REQUEST)
+
+    async def event_stream() -> AsyncIterator[str]:
+        parts: list[str] = []
+        try:
+            async for text in chunks:
+                parts.append(text)
+                yield _sse_event("delta", {"text": text})
+
+            reply_text = "".join(parts).strip()
+            await _save_round(conversation_id, current_user, body.message, reply_text, is_new=is_new)
+        except (asyncio.CancelledError, GeneratorExit):
+            # client 斷線：舊版 ASGI server 由 Starlette 取消，新版在 send 失敗後由 _ClosingStreamingResponse 關閉；
+            # finally 會關閉上游串流並釋放名額
+            get_chat_metrics().incr("chat.cancelled")
+            raise
+        except UpstreamUnavailableError as exc:
+            yield _sse_event("error", {"errors": {"_global": str(exc)}})
+            return
+        except Exception:
+            # 串流已開始就無法再改 status code，只能用 error 事件告知前端
+            yield _sse_event("error", {"errors": {"_global": "目前服務暫時無法處理請求，請稍後再試。"}})
+            return
+        finally:
+            await chunks.aclose()
+
+        yield _sse_event("done", {"reply": reply_text, "conversation_id": str(conversation_id)})
+
+    return _ClosingStreamingResponse(
+        event_stream(),
+        # event_stream 還沒開始就結束時不會執行自己的 finally，由回應本身釋放名額（aclose 可重複呼叫）
+        on_close=chunks.aclose,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # 避免反向代理（nginx / Cloudflare）緩衝整段回應，抵銷串流效果
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+async def _batch_item(item: ChatIn, user: SessionUser) -> ChatBatchItemOut:
+    try:
+        conversation_id, history, window, is_new = await _resolve_conversation(item, user)
+        reply_text = await generate_chat_reply(
+            message=item.message,
+            history=history,
+            window=window,
+            user_key=user.id,
+            bypass_cache=item.bypass_cache,
+        )
+        await _save_round(conversation_id, user, item.message, reply_text, is_new=is_new)
+    except HTTPException as exc:
+        return ChatBatchItemOut(status=exc.status_code, errors=exc.detail["errors"])
+    except _RETRY_LATER_ERRORS as exc:
+        return ChatBatchItemOut(status=exc.status_code, errors={"_global": str(exc)}, retry_after=exc.retry_after)
+    except Exception:
+        return ChatBatchItemOut(status=500, errors={"_global": "目前服務暫時無法處理請求，請稍後再試。"})
+
+    return ChatBatchItemOut(status=200, reply=reply_text, conversation_id=conversation_id)
+
+
+@router.post("/chat/batch", response_model=ChatBatchOut)
+async def chat_batch(
+    request: Request,
+    body: ChatBatchIn,
+    current_user: SessionUser = Depends(get_active_user),
+) -> ChatBatchOut:
+    """
+    一次送出多個彼此獨立的問題（例如同一預算、不同用途的比較），並行處理後依原順序回傳。
+
+    - 限流依題數計費：N 題 = 在 /chat 共用額度上扣 N 次；額度不足時整批回 429
+    - 每批最多 CHAT_BATCH_CONCURRENCY 題同時執行，且每題都照常經過 ChatScheduler 准入控制
+      （排隊已滿等錯誤只影響該題，以 status / errors / retry_after 個別回報）
+    """
+    retry_after = hit_shared_limit(
+        CHAT_RATE_LIMIT,
+        scope=CHAT_RATE_LIMIT_SCOPE,
+        key=get_client_ip(request),
+        cost=len(body.items),
+    )
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={"errors": {"_global": "請求過於頻繁，請稍後再試。"}},
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    gate = asyncio.Semaphore(get_settings().chat_batch_concurrency)
+
+    async def run(item: ChatIn) -> ChatBatchItemOut:
+        async with gate:
+            return await _batch_item(item, current_user)
+
+    try:
+        results = await _cancel_on_disconnect(request, asyncio.gather(*(run(item) for item in body.items)))
+    except _ClientDisconnected:
+        return Response(status_code=_CLIENT_CLOSED_REQUEST)
+    return ChatBatchOut(results=results)
+
+# ===== WebSocket =====
+
+# WebSocket close code：1008 = policy violation（來源不被信任、未登入、session 已撤銷）
+_WS_POLICY_VIOLATION = 1008
+
+
+def _load_ws_user(raw_token: str | None) -> SessionUser | None:
+    # SessionStore 未命中時才查 DB（短命 session，不在整條連線期間佔住連線池）
+    user = load_session_user(raw_token)
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
+async def _ws_send_error(websocket: WebSocket, message: str, *, retry_after: int | None = None) -> None:
+    payload: dict = {"type": "error", "errors": {"_global": message}}
+    if retry_after is not None:
+        payload["retry_after"] = retry_after
+    await websocket.send_json(payload)
+
+
+async def _ws_turn(websocket: WebSocket, user: SessionUser, raw: str) -> None:
+    """處理一輪對話：與 /chat/stream 相同流程，只是以 WebSocket 訊息取代 SSE 事件。"""
+    try:
+        body = ChatIn.model_validate_json(raw)
+    except ValidationError:
+        await _ws_send_error(websocket, "訊息格式不正確。")
+        return
+
+    retry_after = hit_shared_limit(
+        CHAT_RATE_LIMIT,
+        scope=CHAT_RATE_LIMIT_SCOPE,
+        key=get_client_ip(websocket),
+    )
+    if retry_after is not None:
+        await _ws_send_error(websocket, "請求過於頻繁，請稍後再試。", retry_after=retry_after)
+        return
+
+    get_chat_metrics().incr("ws.turns")
+    try:
+        conversation_id, history, window, is_new = await _resolve_conversation(body, user)
+        chunks = await stream_chat_reply(
+            message=body.message,
+            history=history,
+            window=window,
+            user_key=user.id,
+            bypass_cache=body.bypass_cache,
+        )
+    except HTTPException as exc:
+        await _ws_send_error(websocket, exc.detail["errors"]["_global"])
+        return
+    except _RETRY_LATER_ERRORS as exc:
+        await _ws_send_error(websocket, str(exc), retry_after=exc.retry_after)
+        return
+    except Exception:
+        # 例如加入別人的上游呼叫時對方遇到不可重試的 4xx、cassette 找不到錄音：只讓這一輪失敗，連線繼續可用
+        get_chat_metrics().incr("ws.turn_error")
+        await _ws_send_error(websocket, "目前服務暫時無法處理請求，請稍後再試。")
+        return
+
+    parts: list[str] = []
+    try:
+        async for text in chunks:
+            parts.append(text)
+            await websocket.send_json({"type": "delta", "text": text})
+
+        reply_text = "".join(parts).strip()
+        await _save_round(conversation_id, user, body.message, reply_text, is_new=is_new)
+    except (asyncio.CancelledError, WebSocketDisconnect):
+        get_chat_metrics().incr("chat.cancelled")
+        raise
+    except UpstreamUnavailableError as exc:
+        await _ws_send_error(websocket, str(exc), retry_after=exc.retry_after)
+        return
+    except Exception:
+        await _ws_send_error(websocket, "目前服務暫時無法處理請求，請稍後再試。")
+        return
+    finally:
+        await chunks.aclose()
+
+    await websocket.send_json({"type": "done", "reply": reply_text, "conversation_id": str(conversation_id)})
+
+
+@router.websocket("/chat/ws")
+async def chat_ws(websocket: WebSocket) -> None:
+    """
+    長連線版本的 chat：握手時驗證一次身分，之後同一條連線可連續多輪對話，
+    省下每輪 HTTP 請求的 middleware 與 get_active_user。
+
+    - 握手：Origin 必須在 CSRF_TRUSTED_ORIGINS 內（WebSocket 不受 CORS 保護）；
+      __Host-pcbuild_session cookie 必須對應有效且已驗證的使用者；否則以 1008 關閉
+    - client → server：{"message": "...", "conversation_id": "...", "bypass_cache": false}（同 ChatIn）
+    - server → client：{"type": "delta" | "done" | "error", ...}（欄位同 /chat/stream 的 SSE 事件）
+    - 一次只處理一輪；處理中再送訊息會收到 error
+    - 每 CHAT_WS_REVALIDATE_SECONDS 重新檢查 session（登出、撤銷、過期後最晚在這段時間內斷線）
+    - 每一輪都計入與 /chat 相同的限流額度
+    """
+    if not is_trusted_origin(websocket):
+        await websocket.close(code=_WS_POLICY_VIOLATION)
+        return
+
+    raw_token = websocket.cookies.get(SESSION_COOKIE_NAME)
+    user = await run_in_threadpool(_load_ws_user, raw_token)
+    if user is None:
+        await websocket.close(code=_WS_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    get_chat_metrics().incr("ws.connections")
+
+    revalidate_every = get_settings().chat_ws_revalidate_seconds
+    next_check = time.monotonic() + revalidate_every
+    receiver: asyncio.Task[str] = asyncio.ensure_future(websocket.receive_text())
+    turn: asyncio.Task[None] | None = None
+
+    try:
+        while True:
+            waiting = {receiver} if turn is None else {receiver, turn}
+            await asyncio.wait(
+                waiting,
+                timeout=max(0.0, next_check - time.monotonic()),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+            if time.monotonic() >= next_check:
+                if await run_in_threadpool(_load_ws_user, raw_token) is None:
+                    get_chat_metrics().incr("ws.revoked")
+                    await _ws_send_error(websocket, "登入狀態已失效，請重新登入。")
+                    await websocket.close(code=_WS_POLICY_VIOLATION)
+                    return
+                next_check = time.monotonic() + revalidate_every
+
+            if turn is not None and turn.done():
+                try:
+                    turn.result()  # 斷線在這裡往外拋
+                except WebSocketDisconnect:
+                    raise
+                except Exception:
+                    # _ws_turn 沒接住的錯誤也只結束這一輪，不關閉連線
+                    get_chat_metrics().incr("ws.turn_error")
+                    await _ws_send_error(websocket, "目前服務暫時無法處理請求，請稍後再試。")
+                turn = None
+
+            if receiver.done():
+                raw = receiver.result()  # client 斷線時拋 WebSocketDisconnect
+                if turn is None:
+                    turn = asyncio.ensure_future(_ws_turn(websocket, user, raw))
+                else:
+                    await _ws_send_error(websocket, "上一則訊息仍在處理中，請稍候。")
+                receiver = asyncio.ensure_future(websocket.receive_text())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # 斷線時立刻取消進行中的一輪：釋放排隊名額並中止上游呼叫
+        receiver.cancel()
+        if turn is not None and not turn.done():
+            turn.cancel()
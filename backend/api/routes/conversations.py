@@ -0,0 +1,50 @@
+# backend/api/routes/conversations.py
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session as OrmSession
+
+from backend.api.dependencies.auth import get_active_user
+from backend.api.dependencies.db import get_db
+from backend.models import Conversation, Message
+from backend.schemas.chat import ConversationOut, MessageOut
+from backend.services.auth.sessions import SessionUser
+
+router = APIRouter(prefix="/api/conversations", tags=["chat"])
+
+
+@router.get("", response_model=list[ConversationOut])
+def list_conversations(
+    current_user: SessionUser = Depends(get_active_user),
+    db: OrmSession = Depends(get_db),
+) -> list[Conversation]:
+    """目前使用者的對話列表（最近更新的在前，最多 50 筆）。"""
+    return (
+        db.query(Conversation)
+        .filter(Conversation.user_id == current_user.id)
+        .order_by(Conversation.updated_at.desc())
+        .limit(50)
+        .all()
+    )
+
+
+@router.get("/{conversation_id}/messages", response_model=list[MessageOut])
+def list_messages(
+    conversation_id: UUID,
+    current_user: SessionUser = Depends(get_active_user),
+    db: OrmSession = Depends(get_db),
+) -> list[Message]:
+    """單一對話的完整訊息（舊→新）；不屬於目前使用者一律 404。"""
+    conversation = db.get(Conversation, conversation_id)
+    if conversation is None or conversation.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"errors": {"_global": "找不到這段對話。"}},
+        )
+
+    return (
+        db.query(Message)
+        .filter(Message.conversation_id == conversation_id)
+        .order_by(Message.id.asc())
+        .all()
+    )
@@ -4,6 +4,15 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from backend.api.dependencies.db import get_db
+from backend.services.auth.gc import get_auth_gc
+from backend.services.auth.sessions import get_session_renewer, get_session_store
+from backend.services.chat.cache import get_response_cache, get_semantic_cache
+from backend.services.chat.clients.resilient import get_resilient_genai_client
+from backend.services.chat.metrics import get_chat_metrics
+from backend.services.chat.scheduler import get_chat_scheduler
+from backend.services.chat.singleflight import get_single_flight
+from backend.services.chat.usage import get_usage_meter
+from backend.services.parts import get_parts_catalog
 
 router = APIRouter(tags=["debug"])
 
@@ -16,3 +25,28 @@ def debug_db(db: Session = Depends(get_db)):
     """
     result = db.execute(select(1)).scalar_one()
     return {"db_ok": result == 1}
+
+
+@router.get("/debug/chat/metrics")
+async def debug_chat_metrics():
+    """
+    目前 process 的 chat 計數器（快取 hit/miss/eviction 等）與排隊狀態。
+    與其他 /debug 路由一樣受 DEBUG_ROUTES_ENABLED 控制。
+    """
+    cache = get_response_cache()
+    semantic = get_semantic_cache()
+    flights = get_single_flight()
+    renewer = get_session_renewer()
+    return {
+        "counters": get_chat_metrics().snapshot(),
+        "cache": await cache.stats() if cache is not None else None,
+        "semantic_cache": semantic.stats() if semantic is not None else None,
+        "scheduler": get_chat_scheduler().stats(),
+        "upstream": get_resilient_genai_client().stats(),
+        "singleflight": flights.stats() if flights is not None else None,
+        "usage": get_usage_meter().stats(),
+        "parts_catalog": get_parts_catalog().stats(),
+        "sessions": get_session_store().stats(),
+        "auth_gc": get_auth_gc().stats(),
+        "session_renewal": renewer.stats() if renewer is not None else None,
+    }
@@ -0,0 +1,49 @@
+# backend/api/routes/parts.py
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from backend.schemas.parts import PartListOut
+from backend.services.parts import get_parts_catalog
+
+router = APIRouter(prefix="/api/parts", tags=["parts"])
+
+PARTS_PAGE_MAX = 100
+
+SortKey = Literal["price", "-price", "tdp", "-tdp", "name", "-name"]
+
+
+@router.get("", response_model=PartListOut)
+def list_parts(
+    category: Optional[str] = Query(default=None, max_length=32),
+    socket: Optional[str] = Query(default=None, max_length=32),
+    price_min: Optional[int] = Query(default=None, ge=0),
+    price_max: Optional[int] = Query(default=None, ge=0),
+    tdp_min: Optional[float] = Query(default=None, ge=0),
+    tdp_max: Optional[float] = Query(default=None, ge=0),
+    sort: SortKey = "price",
+    limit: int = Query(default=20, ge=1, le=PARTS_PAGE_MAX),
+    offset: int = Query(default=0, ge=0),
+) -> dict:
+    """
+    零件目錄查詢（多條件篩選 + 排序 + 分頁）。
+    全部在記憶體快照上以 NumPy 向量化完成，不查 DB；資料由背景工作定期從 parts 表增量刷新。
+    """
+    if price_min is not None and price_max is not None and price_min > price_max:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"errors": {"price_min": "最低價格不可高於最高價格。"}},
+        )
+
+    total, items = get_parts_catalog().snapshot.query(
+        category=category,
+        socket=socket,
+        price_min=price_min,
+        price_max=price_max,
+        tdp_min=tdp_min,
+        tdp_max=tdp_max,
+        sort=sort,
+        limit=limit,
+        offset=offset,
+    )
+    return {"total": total, "items": items}
@@ -3,13 +3,14 @@ from fastapi import FastAPI
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
 from backend.core.middleware import add_app_middlewares
+from backend.core.bootstrap.lifespan import lifespan
 from backend.core.bootstrap.routes import include_api_routes
 from backend.core.settings import get_settings
 from backend.core.bootstrap.static_site import mount_static_site
 
 
 def create_app() -> FastAPI:
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
     settings = get_settings()
 
     add_app_middlewares(app, settings)
@@ -0,0 +1,96 @@
+# backend/core/bootstrap/lifespan.py
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator, Callable
+
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+
+from backend.core.settings import get_settings
+from backend.services.auth.gc import get_auth_gc
+from backend.services.auth.sessions import SignedSessionStore, get_session_renewer, get_session_store
+from backend.services.chat.usage import get_usage_meter
+from backend.services.parts import get_parts_catalog
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_periodically(interval_seconds: float, job: Callable[[], object], name: str) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_in_threadpool(job)
+        except Exception:
+            # 單次失敗（例如 DB 暫時連不上）下一輪再試；背景工作本身不能因此結束
+            logger.exception("%s failed", name)
+
+
+async def _stop(task: asyncio.Task) -> None:
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    App 啟動 / 關閉時的背景工作：
+    - 載入零件目錄快照，之後定期增量刷新
+    - 定期把 token 用量批次寫入 DB，關閉前再寫一次
+    - SESSION_MODE=signed 時載入撤銷清單，之後定期與 sessions.revoked 同步
+    - 定期清掉過期的 session 與驗證 token（AUTH_GC_ENABLED）
+    - 滑動過期的 session 續期定期批次寫入 DB，關閉前再寫一次
+    """
+    settings = get_settings()
+    catalog = get_parts_catalog()
+    try:
+        await run_in_threadpool(catalog.refresh)
+    except Exception:
+        # 目錄載入失敗不阻擋啟動：/api/parts 暫時為空，相容性判斷改用種子資料，背景刷新會再試
+        logger.exception("initial parts catalog load failed")
+
+    tasks = [
+        asyncio.create_task(_run_periodically(settings.parts_refresh_seconds, catalog.refresh, "parts catalog refresh")),
+        asyncio.create_task(_run_periodically(settings.chat_usage_flush_seconds, get_usage_meter().flush, "token usage flush")),
+    ]
+
+    sessions = get_session_store()
+    if isinstance(sessions, SignedSessionStore):
+        try:
+            await run_in_threadpool(sessions.sync)
+        except Exception:
+            # 撤銷清單載入失敗時先以本機撤銷為準，背景同步會再試
+            logger.exception("initial session revocation sync failed")
+        tasks.append(
+            asyncio.create_task(
+                _run_periodically(settings.session_revocation_sync_seconds, sessions.sync, "session revocation sync")
+            )
+        )
+    renewer = get_session_renewer()
+    if renewer is not None:
+        tasks.append(
+            asyncio.create_task(_run_periodically(settings.session_renew_flush_seconds, renewer.flush, "session renewal flush"))
+        )
+
+    if settings.auth_gc_enabled:
+        tasks.append(
+            asyncio.create_task(_run_periodically(settings.auth_gc_interval_seconds, get_auth_gc().run, "auth gc"))
+        )
+
+    try:
+        yield
+    finally:
+        # 進行中的 GC 在目前這一批結束後停下（在 threadpool 裡跑，取消 task 不會中斷它）
+        get_auth_gc().stop()
+        for task in tasks:
+            await _stop(task)
+        try:
+            await run_in_threadpool(get_usage_meter().flush)
+        except Exception:
+            logger.exception("final token usage flush failed")
+        if renewer is not None:
+            try:
+                await run_in_threadpool(renewer.flush)
+            except Exception:
+                logger.exception("final session renewal flush failed")
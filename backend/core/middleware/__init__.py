@@ -8,6 +8,7 @@ from slowapi.middleware import SlowAPIMiddleware
 from backend.core.middleware.access.cors import add_cors_middleware
 from backend.core.middleware.security.csrf import add_csrf_protection_middleware
 from backend.core.middleware.security.security_headers import add_security_headers_middleware
+from backend.core.middleware.security.session_renewal import add_session_renewal_middleware
 from backend.core.middleware.gates.debug_gate import add_debug_gate_middleware
 from backend.core.middleware.throttling.rate_limit import limiter
 from backend.core.middleware.throttling.rate_limit_handler import rate_limit_exceeded_handler
@@ -25,7 +26,9 @@ def add_app_middlewares(app: FastAPI, settings) -> None:
         app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
         app.add_middleware(SlowAPIMiddleware)
 
-    # 維持你原本 app_factory 的順序：CORS -> CSRF -> security headers -> debug gate
+    # 維持你原本 app_factory 的順序：CORS -> CSRF -> security headers -> debug gate；
+    # session 續期的 cookie 只和 route 的回應有關，放在最內層
+    add_session_renewal_middleware(app)
     add_cors_middleware(app)
     add_csrf_protection_middleware(app)
     add_security_headers_middleware(app)
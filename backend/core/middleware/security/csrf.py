@@ -5,6 +5,7 @@ from urllib.parse import urlparse
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
+from starlette.requests import HTTPConnection
 
 from backend.core.settings import get_settings
 from backend.api.auth.config import SESSION_COOKIE_NAME
@@ -29,20 +30,46 @@ def _origin_from_referer(referer: str) -> str | None:
         return None
 
 
-def add_csrf_protection_middleware(app: FastAPI) -> None:
-    """
-    針對 cookie-based session 的 state-changing API：
-    - 若請求帶 cookie，且為 unsafe method，則要求 Origin/Referer 必須屬於信任清單。
-    OWASP 建議對狀態變更請求採取 CSRF 防護；SameSite 僅作為額外防護層。:contentReference[oaicite:1]{index=1}
-    """
+def load_trusted_origins() -> set[str]:
     settings = get_settings()
     trusted_raw = getattr(settings, "csrf_trusted_origins", "") or ""
-    trusted = {
+    return {
         _normalize_origin(x)
         for x in trusted_raw.split(",")
         if x.strip()
     }
 
+
+def request_origin(conn: HTTPConnection) -> str | None:
+    """取請求來源：優先 Origin，沒有時退回 Referer 的 scheme://host。"""
+    origin = conn.headers.get("origin")
+    if origin:
+        return _normalize_origin(origin)
+
+    referer = conn.headers.get("referer", "")
+    ro = _origin_from_referer(referer) if referer else None
+    return _normalize_origin(ro) if ro else None
+
+
+def is_trusted_origin(conn: HTTPConnection, trusted: set[str] | None = None) -> bool:
+    """
+    來源是否在 CSRF_TRUSTED_ORIGINS 內（未設定清單或沒有來源一律 False，fail-closed）。
+    HTTP 由下方 middleware 檢查；WebSocket 握手不經過 http middleware，由 route 自行呼叫。
+    """
+    if trusted is None:
+        trusted = load_trusted_origins()
+    req_origin = request_origin(conn)
+    return bool(trusted) and req_origin is not None and req_origin in trusted
+
+
+def add_csrf_protection_middleware(app: FastAPI) -> None:
+    """
+    針對 cookie-based session 的 state-changing API：
+    - 若請求帶 cookie，且為 unsafe method，則要求 Origin/Referer 必須屬於信任清單。
+    OWASP 建議對狀態變更請求採取 CSRF 防護；SameSite 僅作為額外防護層。:contentReference[oaicite:1]{index=1}
+    """
+    trusted = load_trusted_origins()
+
     @app.middleware("http")
     async def _csrf_guard(request: Request, call_next):
         # 只管 API，且只管會改狀態的方法
@@ -53,16 +80,8 @@ def add_csrf_protection_middleware(app: FastAPI) -> None:
         if SESSION_COOKIE_NAME not in request.cookies:
             return await call_next(request)
 
-        origin = request.headers.get("origin")
-        if origin:
-            req_origin = _normalize_origin(origin)
-        else:
-            referer = request.headers.get("referer", "")
-            ro = _origin_from_referer(referer) if referer else None
-            req_origin = _normalize_origin(ro) if ro else None
-
         # 未設定信任清單或來源不在清單：拒絕（fail-closed）
-        if not trusted or not req_origin or req_origin not in trusted:
+        if not is_trusted_origin(request, trusted):
             return JSONResponse(
                 status_code=403,
                 content={"errors": {"_global": "CSRF protection: invalid origin"}},
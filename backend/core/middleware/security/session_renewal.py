@@ -0,0 +1,33 @@
+# backend/core/middleware/security/session_renewal.py
+from __future__ import annotations
+
+from fastapi import FastAPI, Request
+from starlette.responses import Response
+
+from backend.api.auth.config import SESSION_COOKIE_NAME
+from backend.api.auth.utils import set_session_cookie
+from backend.api.dependencies.auth import RENEWED_SESSION_COOKIE_STATE
+
+
+def add_session_renewal_middleware(app: FastAPI) -> None:
+    """
+    滑動過期：get_current_user 續期 session 後，把新的 cookie（延長 max_age；簽章模式下是新 token）加到回應上。
+    放在 middleware 而不是 dependency 的 Response 參數，是因為直接回傳的 StreamingResponse 不會帶上 dependency 設的 cookie。
+    route 自己已經設定 / 清除 session cookie 時（logout-all 等）不覆蓋。
+    """
+    @app.middleware("http")
+    async def _session_renewal(request: Request, call_next):
+        response: Response = await call_next(request)
+
+        renewed = getattr(request.state, RENEWED_SESSION_COOKIE_STATE, None)
+        if renewed is None:
+            return response
+        if any(
+            name == b"set-cookie" and value.startswith(f"{SESSION_COOKIE_NAME}=".encode())
+            for name, value in response.raw_headers
+        ):
+            return response
+
+        value, max_age = renewed
+        set_session_cookie(response, value, max_age=max_age)
+        return response
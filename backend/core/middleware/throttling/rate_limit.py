@@ -1,9 +1,12 @@
 # backend/core/middleware/throttling/rate_limit.py
 from __future__ import annotations
 
+import math
+import time
 from ipaddress import ip_address  # ← 新增
-from fastapi import Request
 from slowapi import Limiter
+from slowapi.wrappers import LimitGroup
+from starlette.requests import HTTPConnection
 
 from backend.core.settings import get_settings
 
@@ -18,10 +21,11 @@ def _clean_ip(value: str | None) -> str | None:  # ← 新增
         return None
 
 
-def _get_client_ip(request: Request) -> str:
+def get_client_ip(request: HTTPConnection) -> str:
     """
     僅信任 Cloudflare 帶來的 CF-Connecting-IP（前提：流量確實經 Cloudflare edge 到 origin）。
     不信任 X-Forwarded-For（可被客戶端偽造）。
+    也用於 WebSocket 等不經 decorator 的路徑（見 hit_shared_limit）。
     """
     cf_ip = _clean_ip(request.headers.get("CF-Connecting-IP"))
     if cf_ip:
@@ -40,8 +44,11 @@ def _get_client_ip(request: Request) -> str:
 
 _settings = get_settings()
 
+# 避免同一個 Redis 被其他專案共用時 key 衝突；hit_shared_limit 也以此組出與 decorator 相同的 storage key
+RATE_LIMIT_KEY_PREFIX = "pcbuild:"
+
 limiter = Limiter(
-    key_func=_get_client_ip,
+    key_func=get_client_ip,
     default_limits=[_settings.rate_limit_default],
     enabled=_settings.rate_limit_enabled,
     headers_enabled=True,  # ← 保留你原本行為（若你想關可再談）
@@ -52,5 +59,31 @@ limiter = Limiter(
     in_memory_fallback=[_settings.rate_limit_default],
 
     # 新增：避免同一個 Redis 被其他專案共用時 key 衝突（你有多個 compose 專案時特別有用）
-    key_prefix="pcbuild:",
+    key_prefix=RATE_LIMIT_KEY_PREFIX,
 )
+
+
+def hit_shared_limit(limit_value: str, *, scope: str, key: str, cost: int = 1) -> int | None:
+    """
+    手動對 @limiter.shared_limit(limit_value, scope=scope) 的同一組額度扣 cost 次。
+    給不經 SlowAPI decorator 的路徑使用（WebSocket 每一輪、batch 依題數計費），
+    key 與 decorator 相同，因此和 HTTP 端點共用額度。
+
+    回傳 None 表示放行；超過額度時回傳建議的 Retry-After 秒數。
+    """
+    if not limiter.enabled:
+        return None
+
+    # 與 limiter.shared_limit() 建立相同的 LimitGroup，RateLimitItem 與 scope 都由 SlowAPI 解析，
+    # 經 limiter.limiter（limits 的 RateLimiter）以 [key_prefix, key, scope] 扣額度，與 decorator 路徑相同
+    group = LimitGroup(limit_value, lambda: key, scope, False, None, None, None, cost, False)
+    try:
+        for lim in group:
+            args = [RATE_LIMIT_KEY_PREFIX, key, lim.scope]
+            if not limiter.limiter.hit(lim.limit, *args, cost=cost):
+                reset_at = limiter.limiter.get_window_stats(lim.limit, *args).reset_time
+                return max(1, math.ceil(reset_at - time.time()))
+    except Exception:
+        # storage（Redis）暫時不可用：與 decorator 路徑的 fallback 一樣不因限流本身擋掉請求
+        return None
+    return None
@@ -38,12 +38,135 @@ class Settings(BaseSettings):
     rate_limit_default: str = Field(default="300/minute", alias="RATE_LIMIT_DEFAULT")
     rate_limit_storage_uri: str = Field(default="memory://", alias="RATE_LIMIT_STORAGE_URI")
 
+    # session 效期（分鐘）；啟用滑動過期時，活躍的 session 每 SESSION_RENEW_INTERVAL_SECONDS 最多延長一次，
+    # 續期先記在記憶體，每 SESSION_RENEW_FLUSH_SECONDS 批次寫入 DB
+    session_expires_minutes: int = Field(default=120, alias="SESSION_EXPIRES_MINUTES")
+    session_sliding_enabled: bool = Field(default=True, alias="SESSION_SLIDING_ENABLED")
+    session_renew_interval_seconds: float = Field(default=300.0, alias="SESSION_RENEW_INTERVAL_SECONDS")
+    session_renew_flush_seconds: float = Field(default=15.0, alias="SESSION_RENEW_FLUSH_SECONDS")
+
+    # session 解析的程序內快取（0 = 停用，每個請求都查 DB）；
+    # 多 worker 時撤銷最晚在 TTL 內於其他 worker 生效
+    session_cache_size: int = Field(default=10_000, alias="SESSION_CACHE_SIZE")
+    session_cache_ttl_seconds: float = Field(default=30.0, alias="SESSION_CACHE_TTL_SECONDS")
+    # 每位使用者 session_generation 的快取時間：整批撤銷（重設密碼、登出所有裝置）跨 worker 生效的上限
+    session_generation_ttl_seconds: float = Field(default=5.0, alias="SESSION_GENERATION_TTL_SECONDS")
+    # session cookie 形式：db = session UUID（每次驗證查 DB / 快取）；
+    # signed = HMAC 簽章 token（驗證不查 DB，撤銷清單每 SESSION_REVOCATION_SYNC_SECONDS 從 DB 同步）
+    session_mode: str = Field(default="db", alias="SESSION_MODE")
+    session_signing_key: str = Field(default="", alias="SESSION_SIGNING_KEY")
+    session_revocation_sync_seconds: float = Field(default=5.0, alias="SESSION_REVOCATION_SYNC_SECONDS")
+
+    # 過期 session / 已用或過期的驗證 token 清理（背景工作；也可用 python -m backend.services.auth.gc 手動執行）
+    auth_gc_enabled: bool = Field(default=True, alias="AUTH_GC_ENABLED")
+    auth_gc_interval_seconds: float = Field(default=3600.0, alias="AUTH_GC_INTERVAL_SECONDS")
+    auth_gc_retention_hours: float = Field(default=24.0, alias="AUTH_GC_RETENTION_HOURS")
+    auth_gc_batch_size: int = Field(default=500, alias="AUTH_GC_BATCH_SIZE")
+    # GC 最多佔用的時間比例（每批之後依耗時休息）；每輪最多刪 batch_size × max_batches 列
+    auth_gc_duty_cycle: float = Field(default=0.2, alias="AUTH_GC_DUTY_CYCLE")
+    auth_gc_max_batches: int = Field(default=200, alias="AUTH_GC_MAX_BATCHES")
+
     # CSRF trusted origins（用逗號分隔的字串）
     csrf_trusted_origins: str = Field(default="", alias="CSRF_TRUSTED_ORIGINS")
 
     # Debug routes
     debug_routes_enabled: bool = Field(default=False, alias="DEBUG_ROUTES_ENABLED")
 
+    # Chat 准入控制（每個 process 各自計算）
+    chat_max_concurrency: int = Field(default=16, alias="CHAT_MAX_CONCURRENCY")
+    chat_max_queue: int = Field(default=64, alias="CHAT_MAX_QUEUE")
+    chat_max_queue_per_user: int = Field(default=2, alias="CHAT_MAX_QUEUE_PER_USER")
+    chat_queue_timeout_seconds: float = Field(default=30.0, alias="CHAT_QUEUE_TIMEOUT_SECONDS")
+    # Chat backend：gemini / stub（離線壓測）/ cassette（錄製 record、重播 replay）
+    chat_backend: str = Field(default="gemini", alias="CHAT_BACKEND")
+    chat_stub_latency_seconds: float = Field(default=0.5, alias="CHAT_STUB_LATENCY_SECONDS")
+    chat_stub_chunk_delay_seconds: float = Field(default=0.05, alias="CHAT_STUB_CHUNK_DELAY_SECONDS")
+    chat_stub_chunks: int = Field(default=8, alias="CHAT_STUB_CHUNKS")
+    chat_stub_reply_chars: int = Field(default=400, alias="CHAT_STUB_REPLY_CHARS")
+    chat_stub_jitter: float = Field(default=0.0, alias="CHAT_STUB_JITTER")
+    chat_cassette_path: str = Field(default="var/chat_cassette.jsonl", alias="CHAT_CASSETTE_PATH")
+    chat_cassette_mode: str = Field(default="replay", alias="CHAT_CASSETTE_MODE")
+    chat_cassette_replay_timing: bool = Field(default=True, alias="CHAT_CASSETTE_REPLAY_TIMING")
+
+    # 模型分級路由（分級表見 services/chat/config.py 的 MODEL_TIERS，可用 JSON 覆寫）
+    chat_routing_enabled: bool = Field(default=True, alias="CHAT_ROUTING_ENABLED")
+    chat_model_tiers: dict[str, dict] = Field(default_factory=dict, alias="CHAT_MODEL_TIERS")
+    chat_routing_escalate_prompt_tokens: int = Field(default=4000, alias="CHAT_ROUTING_ESCALATE_PROMPT_TOKENS")
+
+    # Gemini 呼叫的 deadline / 重試 / hedge / 斷路器
+    chat_upstream_timeout_seconds: float = Field(default=30.0, alias="CHAT_UPSTREAM_TIMEOUT_SECONDS")
+    chat_upstream_max_retries: int = Field(default=2, alias="CHAT_UPSTREAM_MAX_RETRIES")
+    chat_upstream_backoff_base_seconds: float = Field(default=0.25, alias="CHAT_UPSTREAM_BACKOFF_BASE_SECONDS")
+    chat_upstream_backoff_max_seconds: float = Field(default=2.0, alias="CHAT_UPSTREAM_BACKOFF_MAX_SECONDS")
+    chat_upstream_hedge_enabled: bool = Field(default=False, alias="CHAT_UPSTREAM_HEDGE_ENABLED")
+    chat_upstream_hedge_min_seconds: float = Field(default=1.0, alias="CHAT_UPSTREAM_HEDGE_MIN_SECONDS")
+    chat_breaker_failure_threshold: int = Field(default=5, alias="CHAT_BREAKER_FAILURE_THRESHOLD")
+    chat_breaker_recovery_seconds: float = Field(default=30.0, alias="CHAT_BREAKER_RECOVERY_SECONDS")
+    # /api/chat/batch：單一批次內同時執行的題數
+    chat_batch_concurrency: int = Field(default=3, alias="CHAT_BATCH_CONCURRENCY")
+    # /api/chat/ws：連線期間重新檢查 session 的間隔（秒）
+    chat_ws_revalidate_seconds: float = Field(default=60.0, alias="CHAT_WS_REVALIDATE_SECONDS")
+    # 每位使用者的 token 額度（UTC 切日；0 = 不限制）與用量寫入 DB 的批次間隔
+    chat_daily_token_quota: int = Field(default=200_000, alias="CHAT_DAILY_TOKEN_QUOTA")
+    chat_monthly_token_quota: int = Field(default=3_000_000, alias="CHAT_MONTHLY_TOKEN_QUOTA")
+    chat_usage_flush_seconds: float = Field(default=15.0, alias="CHAT_USAGE_FLUSH_SECONDS")
+    chat_usage_counter_ttl_seconds: float = Field(default=300.0, alias="CHAT_USAGE_COUNTER_TTL_SECONDS")
+    # 相同 prompt 的並行請求合併成一次上游呼叫
+    chat_singleflight_enabled: bool = Field(default=True, alias="CHAT_SINGLEFLIGHT_ENABLED")
+
+    # Chat 回覆快取（exact match；backend: memory / redis）
+    chat_cache_enabled: bool = Field(default=True, alias="CHAT_CACHE_ENABLED")
+    chat_cache_backend: str = Field(default="memory", alias="CHAT_CACHE_BACKEND")
+    chat_cache_max_entries: int = Field(default=1024, alias="CHAT_CACHE_MAX_ENTRIES")
+    chat_cache_ttl_seconds: float = Field(default=3600.0, alias="CHAT_CACHE_TTL_SECONDS")
+    chat_cache_redis_url: str = Field(default="redis://localhost:6379/0", alias="CHAT_CACHE_REDIS_URL")
+
+    # Chat 近似問題快取（embedding 相似度；只用於沒有對話紀錄的第一句）
+    chat_semantic_cache_enabled: bool = Field(default=False, alias="CHAT_SEMANTIC_CACHE_ENABLED")
+    chat_semantic_cache_threshold: float = Field(default=0.92, alias="CHAT_SEMANTIC_CACHE_THRESHOLD")
+    chat_semantic_cache_capacity: int = Field(default=2048, alias="CHAT_SEMANTIC_CACHE_CAPACITY")
+    # float32 查詢最快；float16 記憶體減半，但 NumPy 沒有 float16 BLAS，查詢時需先轉型
+    chat_semantic_cache_dtype: str = Field(default="float32", alias="CHAT_SEMANTIC_CACHE_DTYPE")
+
+    # Prompt token 預算（超過時舊訊息改以滾動摘要代替；counter: estimate / exact）
+    chat_input_token_budget: int = Field(default=6000, alias="CHAT_INPUT_TOKEN_BUDGET")
+    chat_summary_token_budget: int = Field(default=400, alias="CHAT_SUMMARY_TOKEN_BUDGET")
+    chat_token_counter: str = Field(default="estimate", alias="CHAT_TOKEN_COUNTER")
+
+    # Gemini explicit context caching（穩定前綴達最低 token 數才登記）
+    # 前綴只有跨對話共用的 SYSTEM_PROMPT（目前遠低於 Gemini 2.5 Flash 的 1024 token 下限），
+    # 預設關閉；SYSTEM_PROMPT 加入固定的長篇說明 / 零件知識後再開啟。
+    # min_tokens 不要調低到模型下限以下，否則 create 只會失敗並進入暫停重試
+    chat_context_cache_enabled: bool = Field(default=False, alias="CHAT_CONTEXT_CACHE_ENABLED")
+    chat_context_cache_ttl_seconds: int = Field(default=3600, alias="CHAT_CONTEXT_CACHE_TTL_SECONDS")
+    chat_context_cache_min_tokens: int = Field(default=1024, alias="CHAT_CONTEXT_CACHE_MIN_TOKENS")
+
+    # 伺服器端對話紀錄的熱快取（每個對話保留最後 HISTORY_MAX_TURNS 則）
+    chat_conversation_cache_size: int = Field(default=2048, alias="CHAT_CONVERSATION_CACHE_SIZE")
+    chat_conversation_cache_ttl_seconds: float = Field(default=600.0, alias="CHAT_CONVERSATION_CACHE_TTL_SECONDS")
+
+    # 零件目錄記憶體快照的增量刷新間隔（秒）
+    parts_refresh_seconds: float = Field(default=30.0, alias="PARTS_REFRESH_SECONDS")
+
+    # 規則式相容性快速路徑（腳位、記憶體、電源、機殼；有把握時不呼叫模型）
+    chat_compat_enabled: bool = Field(default=True, alias="CHAT_COMPAT_ENABLED")
+
+    # 訊息提到整機預算時，先以零件資料庫算出前幾名相容配置附進 prompt（0 = 停用）
+    chat_build_context_top_k: int = Field(default=3, alias="CHAT_BUILD_CONTEXT_TOP_K")
+
+    # 零件知識檢索（RAG）：索引以 python -m backend.services.knowledge.build 建立；
+    # 目錄留空時使用 backend/data/knowledge_index，尚未建索引時自動停用
+    chat_knowledge_enabled: bool = Field(default=True, alias="CHAT_KNOWLEDGE_ENABLED")
+    chat_knowledge_index_dir: str = Field(default="", alias="CHAT_KNOWLEDGE_INDEX_DIR")
+    chat_knowledge_top_k: int = Field(default=4, alias="CHAT_KNOWLEDGE_TOP_K")
+    chat_knowledge_min_score: float = Field(default=0.5, alias="CHAT_KNOWLEDGE_MIN_SCORE")
+    chat_knowledge_nprobe: int = Field(default=8, alias="CHAT_KNOWLEDGE_NPROBE")
+
+    # Embedding（gemini / hashing；hashing 為決定性的本地實作，測試與離線用）
+    chat_embedder: str = Field(default="gemini", alias="CHAT_EMBEDDER")
+    chat_embedding_model: str = Field(default="gemini-embedding-001", alias="CHAT_EMBEDDING_MODEL")
+    chat_embedding_dim: int = Field(default=256, alias="CHAT_EMBEDDING_DIM")
+
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
     # FastAPI 官方建議用 lru_cache 避免每次 request 反覆載入設定
@@ -3,10 +3,18 @@ from backend.models.base import Base
 from backend.models.user import User
 from backend.models.email_verification_token import EmailVerificationToken
 from backend.models.session import Session
+from backend.models.conversation import Conversation
+from backend.models.message import Message
+from backend.models.token_usage import TokenUsage
+from backend.models.part import Part
 
 __all__ = [
     "Base",
     "User",
     "EmailVerificationToken",
     "Session",
+    "Conversation",
+    "Message",
+    "TokenUsage",
+    "Part",
 ]
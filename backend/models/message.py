@@ -0,0 +1,44 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import (
+    Text,
+    DateTime,
+    BigInteger,
+    ForeignKey,
+    Index,
+    text,
+)
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from backend.models.base import Base
+
+
+class Message(Base):
+    __tablename__ = "messages"
+
+    # 讀取最近 N 則：WHERE conversation_id = ? ORDER BY id DESC LIMIT N
+    __table_args__ = (
+        Index("idx_messages_conversation_id_id", "conversation_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+    conversation_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        ForeignKey("conversations.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    # 與 schemas.chat.Turn 一致："user" / "ai"
+    role: Mapped[str] = mapped_column(Text, nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=text("NOW()"),
+        nullable=False,
+    )
+
+    conversation: Mapped["Conversation"] = relationship(back_populates="messages")
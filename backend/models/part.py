@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.models.base import Base
+
+
+class Part(Base):
+    """
+    零件目錄（CPU / 主機板 / 顯示卡 / 電源 / 記憶體 / 機殼）。
+    查詢走 PartsCatalogService 的記憶體快照，DB 只在啟動與增量刷新時讀取：
+    刷新依 updated_at 取變更列，因此下架請設 is_active = false（不要直接刪除），
+    以 SQL 直接更新時也要一併更新 updated_at。
+    """
+
+    __tablename__ = "parts"
+
+    __table_args__ = (
+        Index("idx_parts_updated_at", "updated_at"),
+    )
+
+    # 穩定的 slug，例如 cpu-i5-14600k（與種子資料 / 知識索引的 doc id 相同）
+    id: Mapped[str] = mapped_column(
+        String(64),
+        primary_key=True,
+    )
+    category: Mapped[str] = mapped_column(
+        String(32),
+        nullable=False,
+    )
+    name: Mapped[str] = mapped_column(
+        String(200),
+        nullable=False,
+    )
+    # 新台幣參考價
+    price: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+    # 依類別而異的規格（socket、tdp_w、length_mm、wattage_w…）
+    specs: Mapped[dict[str, Any]] = mapped_column(
+        JSONB,
+        server_default=text("'{}'"),
+        nullable=False,
+    )
+    # 型號簡稱（「14600K」「4070 Ti」），給相容性判斷比對訊息用
+    aliases: Mapped[list[str]] = mapped_column(
+        JSONB,
+        server_default=text("'[]'"),
+        nullable=False,
+    )
+    is_active: Mapped[bool] = mapped_column(
+        Boolean,
+        server_default=text("TRUE"),
+        nullable=False,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=text("NOW()"),
+        onupdate=func.now(),
+        nullable=False,
+    )
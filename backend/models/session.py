@@ -4,6 +4,7 @@ from uuid import UUID
 from sqlalchemy import (
     Text,
     Boolean,
+    Integer,
     DateTime,
     BigInteger,
     ForeignKey,
@@ -54,5 +55,11 @@ class Session(Base):
         nullable=False,
         server_default=text("FALSE"),
     )
+    # 建立時使用者的 session_generation；與 users.session_generation 不同代表已被整批撤銷
+    generation: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        server_default=text("0"),
+    )
 
     user: Mapped["User"] = relationship(back_populates="sessions")
@@ -3,6 +3,7 @@ from datetime import datetime
 from sqlalchemy import (
     Text,
     Boolean,
+    Integer,
     DateTime,
     BigInteger,
     text,
@@ -38,6 +39,13 @@ class User(Base):
         server_default=text("NOW()"),
         nullable=False,
     )
+    # 每次 +1 就讓這個使用者「所有」既有 session 失效（重設密碼、登出所有裝置）；
+    # session 建立時記下當下的值，解析時兩者不同即視為已撤銷
+    session_generation: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        server_default=text("0"),
+    )
 
     sessions: Mapped[list["Session"]] = relationship(
         back_populates="user",
@@ -48,3 +56,8 @@ class User(Base):
         back_populates="user",
         cascade="all, delete-orphan",
     )
+
+    conversations: Mapped[list["Conversation"]] = relationship(
+        back_populates="user",
+        cascade="all, delete-orphan",
+    )
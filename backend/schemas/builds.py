@@ -0,0 +1,21 @@
+# backend/schemas/builds.py
+from typing import List
+
+from pydantic import BaseModel
+
+from backend.schemas.parts import PartOut
+
+
+class BuildOut(BaseModel):
+    total_price: int
+    # 依用途加權的效能指數（0~100）
+    performance: float
+    # 排序用分數：效能 × (預算 / 總價) ^ value_weight
+    score: float
+    parts: dict[str, PartOut]
+
+
+class BuildListOut(BaseModel):
+    budget: int
+    profile: str
+    items: List[BuildOut]
@@ -1,7 +1,12 @@
 # backend/schemas/chat.py
-from typing import List, Literal
+from datetime import datetime
+from typing import List, Literal, Optional
+from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
+
+# /api/chat/batch 單次最多題數（每題都計入 chat 限流額度）
+CHAT_BATCH_MAX_ITEMS = 10
 
 
 class Turn(BaseModel):
@@ -10,9 +15,56 @@ class Turn(BaseModel):
 
 
 class ChatIn(BaseModel):
-    message: str
-    history: List[Turn] = []
+    # 上限避免單一訊息就撐爆 input token 預算
+    message: str = Field(max_length=4000)
+    # 伺服器端對話 id；帶了就由伺服器讀取 / 追加紀錄，不需再送 history
+    conversation_id: Optional[UUID] = None
+    # 舊版前端相容：沒有 conversation_id 時，仍可由前端提供 history（僅作為本次脈絡）
+    history: List[Turn] = Field(default_factory=list, max_length=50)
+    # True：略過回覆快取讀取，強制重新向模型要答案（新答案仍會寫回快取）
+    bypass_cache: bool = False
 
 
 class ChatOut(BaseModel):
     reply: str
+    conversation_id: Optional[UUID] = None
+
+
+class ChatBatchIn(BaseModel):
+    items: List[ChatIn] = Field(min_length=1, max_length=CHAT_BATCH_MAX_ITEMS)
+
+    @field_validator("items")
+    @classmethod
+    def _distinct_conversations(cls, items: List[ChatIn]) -> List[ChatIn]:
+        # 同一段對話的多則訊息並行處理會交錯寫入紀錄，批次內不允許重複
+        ids = [i.conversation_id for i in items if i.conversation_id is not None]
+        if len(ids) != len(set(ids)):
+            raise ValueError("同一批次內的 conversation_id 不可重複")
+        return items
+
+
+class ChatBatchItemOut(BaseModel):
+    # 各題獨立成功 / 失敗；失敗時 status 與 errors 的意義同單題 /api/chat 的錯誤回應
+    status: int
+    reply: Optional[str] = None
+    conversation_id: Optional[UUID] = None
+    errors: Optional[dict[str, str]] = None
+    retry_after: Optional[int] = None
+
+
+class ChatBatchOut(BaseModel):
+    # 與 items 同順序
+    results: List[ChatBatchItemOut]
+
+
+class ConversationOut(BaseModel):
+    id: UUID
+    created_at: datetime
+    updated_at: datetime
+
+
+class MessageOut(BaseModel):
+    id: int
+    role: Literal["user", "ai"]
+    content: str
+    created_at: datetime
@@ -0,0 +1,18 @@
+# backend/schemas/parts.py
+from typing import Any, List
+
+from pydantic import BaseModel
+
+
+class PartOut(BaseModel):
+    id: str
+    category: str
+    name: str
+    price: int
+    specs: dict[str, Any]
+
+
+class PartListOut(BaseModel):
+    # 符合條件的總筆數（不受 limit / offset 影響）
+    total: int
+    items: List[PartOut]
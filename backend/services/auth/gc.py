@@ -0,0 +1,206 @@
+# backend/services/auth/gc.py
+"""
+清掉 sessions / email_verification_tokens 中不再有用的列（背景工作與 CLI 共用）：
+
+    python -m backend.services.auth.gc [--retention-hours 24] [--batch-size 500]
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import delete, or_, select, tuple_
+
+from backend.core.settings import get_settings
+from backend.db import SessionLocal
+from backend.models import EmailVerificationToken, Session as SessionModel
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GcReport:
+    table: str
+    deleted: int
+    batches: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.deleted / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "table": self.table,
+            "deleted": self.deleted,
+            "batches": self.batches,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+class AuthGarbageCollector:
+    """
+    以小批次刪除過了保留期的 session 與驗證 token：
+
+    - sessions：expires_at 早於 now - retention（已撤銷的 session 也等到過期後才刪：
+      SESSION_MODE=signed 的撤銷清單以 sessions.revoked 為準，列在 token 過期前必須留著；
+      token 的 exp 可能比 DB 的 expires_at 晚一個 session 效期，retention 不會短於 session 效期）
+    - email_verification_tokens：過期或已使用，且建立 / 到期時間早於保留期
+    - 每批一個短交易：SELECT ... ORDER BY 索引鍵 LIMIT n FOR UPDATE SKIP LOCKED 後 DELETE，
+      不等待請求正在使用的列；以 keyset（上一批最後一個鍵）往前推進，被跳過的列不會每批重掃
+    - 節流：每批之後休息「該批耗時 × (1 - duty_cycle) / duty_cycle」，GC 最多佔用 duty_cycle 比例的時間；
+      每輪最多 max_batches 批，剩下的留給下一輪
+    """
+
+    def __init__(
+        self,
+        *,
+        retention: timedelta,
+        batch_size: int,
+        duty_cycle: float,
+        max_batches: int,
+    ) -> None:
+        self.retention = retention
+        self.batch_size = max(1, batch_size)
+        self.duty_cycle = min(1.0, max(0.01, duty_cycle))
+        self.max_batches = max(1, max_batches)
+        self._stopping = threading.Event()
+        self._last_reports: list[GcReport] = []
+
+    def stop(self) -> None:
+        """讓進行中的 run() 在目前這一批結束後停下（關機時呼叫）。"""
+        self._stopping.set()
+
+    def run(self) -> list[GcReport]:
+        """同步（DB I/O，含節流的 sleep）；回傳各表的刪除統計。"""
+        self._stopping.clear()
+        cutoff = datetime.now(timezone.utc) - self.retention
+        reports = [self._collect_sessions(cutoff), self._collect_tokens(cutoff)]
+        for report in reports:
+            logger.info(
+                "auth gc %s: deleted %d rows in %d batches, %.1fs (%.0f rows/s)",
+                report.table,
+                report.deleted,
+                report.batches,
+                report.seconds,
+                report.rows_per_second,
+            )
+        self._last_reports = reports
+        return reports
+
+    # ===== 各表 =====
+
+    def _collect_sessions(self, cutoff: datetime) -> GcReport:
+        key = (SessionModel.expires_at, SessionModel.id)
+
+        def select_batch(after: tuple | None):
+            stmt = select(*key).where(SessionModel.expires_at < cutoff)
+            if after is not None:
+                stmt = stmt.where(tuple_(*key) > tuple_(*after))
+            return stmt
+
+        def delete_batch(rows: list[Any]):
+            return delete(SessionModel).where(SessionModel.id.in_([row.id for row in rows]))
+
+        return self._collect(SessionModel.__tablename__, key, select_batch, delete_batch)
+
+    def _collect_tokens(self, cutoff: datetime) -> GcReport:
+        key = (EmailVerificationToken.id,)
+
+        def select_batch(after: tuple | None):
+            stmt = select(*key).where(
+                or_(EmailVerificationToken.is_used.is_(True), EmailVerificationToken.expires_at < cutoff),
+                EmailVerificationToken.created_at < cutoff,
+            )
+            if after is not None:
+                stmt = stmt.where(EmailVerificationToken.id > after[0])
+            return stmt
+
+        def delete_batch(rows: list[Any]):
+            return delete(EmailVerificationToken).where(EmailVerificationToken.id.in_([row.id for row in rows]))
+
+        return self._collect(EmailVerificationToken.__tablename__, key, select_batch, delete_batch)
+
+    def _collect(self, table: str, key: tuple, select_batch, delete_batch) -> GcReport:
+        started = time.monotonic()
+        deleted = 0
+        batches = 0
+        after: tuple | None = None
+
+        while batches < self.max_batches and not self._stopping.is_set():
+            batch_started = time.monotonic()
+            with SessionLocal() as db:
+                rows = db.execute(
+                    select_batch(after)
+                    .order_by(*key)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                ).all()
+                if not rows:
+                    break
+                db.execute(delete_batch(rows))
+                db.commit()
+
+            batches += 1
+            deleted += len(rows)
+            after = tuple(rows[-1])
+            if len(rows) < self.batch_size:
+                break
+
+            elapsed = time.monotonic() - batch_started
+            self._stopping.wait(elapsed * (1 - self.duty_cycle) / self.duty_cycle)
+
+        return GcReport(table=table, deleted=deleted, batches=batches, seconds=time.monotonic() - started)
+
+    def stats(self) -> dict[str, Any]:
+        return {"last_run": [report.as_dict() for report in self._last_reports]}
+
+
+def _retention(hours: float) -> timedelta:
+    # 未 flush 的續期讓簽章 token 的 exp 最多比 DB 晚一個 session 效期（見 sessions/renewal.py）
+    lifetime = timedelta(minutes=get_settings().session_expires_minutes)
+    return max(timedelta(hours=hours), lifetime)
+
+
+@lru_cache(maxsize=1)
+def get_auth_gc() -> AuthGarbageCollector:
+    settings = get_settings()
+    return AuthGarbageCollector(
+        retention=_retention(settings.auth_gc_retention_hours),
+        batch_size=settings.auth_gc_batch_size,
+        duty_cycle=settings.auth_gc_duty_cycle,
+        max_batches=settings.auth_gc_max_batches,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Delete expired sessions and used/expired verification tokens.")
+    parser.add_argument("--retention-hours", type=float, default=settings.auth_gc_retention_hours)
+    parser.add_argument("--batch-size", type=int, default=settings.auth_gc_batch_size)
+    parser.add_argument("--duty-cycle", type=float, default=settings.auth_gc_duty_cycle)
+    parser.add_argument("--max-batches", type=int, default=settings.auth_gc_max_batches)
+    args = parser.parse_args(argv)
+
+    collector = AuthGarbageCollector(
+        retention=_retention(args.retention_hours),
+        batch_size=args.batch_size,
+        duty_cycle=args.duty_cycle,
+        max_batches=args.max_batches,
+    )
+    for report in collector.run():
+        print(
+            f"{report.table}: deleted {report.deleted} rows in {report.batches} batches, "
+            f"{report.seconds:.1f}s ({report.rows_per_second:.0f} rows/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
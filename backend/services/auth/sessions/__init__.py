@@ -0,0 +1,25 @@
+# backend/services/auth/sessions/__init__.py
+from .cache import CachedSessionStore
+from .db import DbSessionStore
+from .generations import SessionGenerations, bump_session_generation
+from .provider import get_session_store
+from .renewal import SessionRenewer, get_session_renewer
+from .signed import RevocationSet, SessionTokenSigner, SignedSessionStore
+from .types import ResolvedSession, SessionStore, SessionUser, parse_session_id
+
+__all__ = [
+    "CachedSessionStore",
+    "DbSessionStore",
+    "ResolvedSession",
+    "RevocationSet",
+    "SessionStore",
+    "SessionGenerations",
+    "SessionRenewer",
+    "SessionTokenSigner",
+    "SessionUser",
+    "SignedSessionStore",
+    "bump_session_generation",
+    "get_session_renewer",
+    "get_session_store",
+    "parse_session_id",
+]
@@ -0,0 +1,136 @@
+# backend/services/auth/sessions/cache.py
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID
+
+from backend.services.auth.sessions.generations import SessionGenerations
+from backend.services.auth.sessions.types import ResolvedSession, SessionStore
+
+
+@dataclass
+class _Entry:
+    session: ResolvedSession
+    expires_at: float
+
+
+class CachedSessionStore:
+    """
+    在任一 SessionStore 前面加一層程序內快取（LRU + TTL，以 session UUID 為 key），
+    讓大部分 /api/auth/me、/api/chat 請求不必查 DB。
+
+    - 只快取「有效」的 session；查不到的 cookie 不快取（避免被亂打的 UUID 塞滿）
+    - 項目最晚在 session 本身的 expires_at 失效，過期的 session 不會因快取而多活
+    - invalidate / invalidate_user 立即移除本 worker 的項目；
+      多 worker 時其他 worker 最多在 ttl_seconds 內仍認得單獨登出的 session，TTL 請保持短
+    - 命中時仍比對使用者目前的 session_generation（SessionGenerations，短 TTL），
+      整批撤銷（重設密碼、登出所有裝置）在其他 worker 上也只需等 generation 快取過期
+    """
+
+    def __init__(
+        self,
+        backend: SessionStore,
+        generations: SessionGenerations,
+        *,
+        max_entries: int,
+        ttl_seconds: float,
+    ) -> None:
+        self.backend = backend
+        self.generations = generations
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[UUID, _Entry] = OrderedDict()
+        self._by_user: dict[int, set[UUID]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def resolve(self, raw_token: str | None) -> ResolvedSession | None:
+        session_id = self.backend.session_id(raw_token)
+        if session_id is None:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and entry.expires_at <= now:
+                self._remove(session_id)
+                entry = None
+
+        if entry is not None:
+            if self.generations.current(entry.session.user.id) == entry.session.generation:
+                with self._lock:
+                    self._hits += 1
+                    if session_id in self._entries:
+                        self._entries.move_to_end(session_id)
+                return entry.session
+            # 已被整批撤銷
+            with self._lock:
+                self._remove(session_id)
+            return None
+
+        with self._lock:
+            self._misses += 1
+        session = self.backend.resolve(raw_token)
+        if session is None:
+            return None
+        self.generations.observe(session.user.id, session.generation)
+
+        remaining = (session.expires_at - datetime.now(timezone.utc)).total_seconds()
+        with self._lock:
+            self._entries[session_id] = _Entry(session, time.monotonic() + min(self.ttl_seconds, remaining))
+            self._entries.move_to_end(session_id)
+            self._by_user.setdefault(session.user.id, set()).add(session_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+        return session
+
+    def session_id(self, raw_token: str | None) -> UUID | None:
+        return self.backend.session_id(raw_token)
+
+    def cookie_value(self, session: ResolvedSession) -> str:
+        return self.backend.cookie_value(session)
+
+    def extend(self, session: ResolvedSession) -> None:
+        with self._lock:
+            entry = self._entries.get(session.session_id)
+            if entry is not None:
+                entry.session = session
+        self.backend.extend(session)
+
+    def invalidate(self, session_id: UUID) -> None:
+        with self._lock:
+            self._remove(session_id)
+        self.backend.invalidate(session_id)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for session_id in list(self._by_user.get(user_id, ())):
+                self._remove(session_id)
+        self.generations.forget(user_id)
+        self.backend.invalidate_user(user_id)
+
+    def _remove(self, session_id: UUID) -> None:
+        # 呼叫端需持有 _lock
+        entry = self._entries.pop(session_id, None)
+        if entry is None:
+            return
+        sessions = self._by_user.get(entry.session.user.id)
+        if sessions is not None:
+            sessions.discard(session_id)
+            if not sessions:
+                del self._by_user[entry.session.user.id]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                **self.backend.stats(),
+                "cached_sessions": len(self._entries),
+                "cached_generations": len(self.generations),
+                "cache_hits": self._hits,
+                "cache_misses": self._misses,
+            }
@@ -0,0 +1,79 @@
+# backend/services/auth/sessions/db.py
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import select
+
+from backend.db import SessionLocal
+from backend.models import Session as SessionModel, User
+from backend.services.auth.sessions.types import ResolvedSession, SessionUser, parse_session_id
+
+
+class DbSessionStore:
+    """
+    cookie 是 session UUID；直接查 DB：sessions JOIN users 一次查詢取得 session 與使用者，
+    同時比對 session_generation（每次操作自行開關短命 session）。
+    """
+
+    def resolve(self, raw_token: str | None) -> ResolvedSession | None:
+        session_id = parse_session_id(raw_token)
+        if session_id is None:
+            return None
+
+        with SessionLocal() as db:
+            row = db.execute(
+                select(
+                    SessionModel.kind,
+                    SessionModel.expires_at,
+                    SessionModel.generation,
+                    User.id,
+                    User.email,
+                    User.username,
+                    User.is_active,
+                    User.is_admin,
+                )
+                .join(User, User.id == SessionModel.user_id)
+                .where(
+                    SessionModel.id == session_id,
+                    SessionModel.revoked.is_(False),
+                    SessionModel.expires_at > datetime.now(timezone.utc),
+                    SessionModel.generation == User.session_generation,
+                )
+            ).first()
+
+        if row is None:
+            return None
+        return ResolvedSession(
+            session_id=session_id,
+            kind=row.kind or "login",
+            expires_at=row.expires_at,
+            user=SessionUser(
+                id=row.id,
+                is_active=row.is_active,
+                email=row.email,
+                username=row.username,
+                is_admin=row.is_admin,
+            ),
+            generation=row.generation,
+        )
+
+    def session_id(self, raw_token: str | None) -> UUID | None:
+        return parse_session_id(raw_token)
+
+    def cookie_value(self, session: ResolvedSession) -> str:
+        return str(session.session_id)
+
+    def extend(self, session: ResolvedSession) -> None:
+        return None
+
+    def invalidate(self, session_id: UUID) -> None:
+        # 沒有快取，撤銷寫進 DB 就立即生效
+        return None
+
+    def invalidate_user(self, user_id: int) -> None:
+        return None
+
+    def stats(self) -> dict[str, int]:
+        return {}
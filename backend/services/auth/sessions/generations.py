@@ -0,0 +1,65 @@
+# backend/services/auth/sessions/generations.py
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session as OrmSession
+
+from backend.db import SessionLocal
+from backend.models import User
+
+
+def bump_session_generation(db: OrmSession, user_id: int) -> None:
+    """
+    讓使用者所有既有 session 失效：只更新 users 的一列（不逐一改 sessions），由呼叫端 commit；
+    commit 後請呼叫 SessionStore.invalidate_user，本 worker 立即生效。
+    """
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(session_generation=User.session_generation + 1)
+    )
+
+
+class SessionGenerations:
+    """
+    每位使用者目前的 session_generation（LRU + 短 TTL 的程序內快取），供快取 / 簽章 session 解析時比對。
+    過期才以主鍵查一次 users；其他 worker 的整批撤銷最晚在 ttl_seconds 內生效。
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_users: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max(1, max_users)
+        self._lock = threading.Lock()
+        self._values: OrderedDict[int, tuple[int, float]] = OrderedDict()
+
+    def current(self, user_id: int) -> int | None:
+        """使用者不存在時回傳 None。"""
+        with self._lock:
+            cached = self._values.get(user_id)
+            if cached is not None and cached[1] > time.monotonic():
+                return cached[0]
+
+        with SessionLocal() as db:
+            generation = db.execute(select(User.session_generation).where(User.id == user_id)).scalar_one_or_none()
+        if generation is not None:
+            self.observe(user_id, generation)
+        return generation
+
+    def observe(self, user_id: int, generation: int) -> None:
+        """剛從 DB 讀到的值（例如 session 解析未命中時 JOIN 出來的）直接放進快取。"""
+        with self._lock:
+            self._values[user_id] = (generation, time.monotonic() + self.ttl_seconds)
+            self._values.move_to_end(user_id)
+            while len(self._values) > self.max_users:
+                self._values.popitem(last=False)
+
+    def forget(self, user_id: int) -> None:
+        with self._lock:
+            self._values.pop(user_id, None)
+
+    def __len__(self) -> int:
+        return len(self._values)
@@ -0,0 +1,47 @@
+# backend/services/auth/sessions/provider.py
+from __future__ import annotations
+
+from datetime import timedelta
+from functools import lru_cache
+
+from backend.core.settings import get_settings
+from backend.services.auth.sessions.cache import CachedSessionStore
+from backend.services.auth.sessions.db import DbSessionStore
+from backend.services.auth.sessions.generations import SessionGenerations
+from backend.services.auth.sessions.signed import RevocationSet, SessionTokenSigner, SignedSessionStore
+from backend.services.auth.sessions.types import SessionStore
+
+
+@lru_cache(maxsize=1)
+def get_session_store() -> SessionStore:
+    """
+    SESSION_MODE=db（預設）：cookie 是 session UUID，查 DB；SESSION_CACHE_TTL_SECONDS=0 時不快取
+    （除錯或需要撤銷立即跨 worker 生效時使用）。
+    SESSION_MODE=signed：cookie 是簽章 token（需要 SESSION_SIGNING_KEY），DB 模式只用來解析舊的 UUID cookie。
+    """
+    settings = get_settings()
+    generations = SessionGenerations(
+        ttl_seconds=settings.session_generation_ttl_seconds,
+        max_users=settings.session_cache_size,
+    )
+    store: SessionStore = DbSessionStore()
+    if settings.session_cache_ttl_seconds > 0:
+        store = CachedSessionStore(
+            store,
+            generations,
+            max_entries=settings.session_cache_size,
+            ttl_seconds=settings.session_cache_ttl_seconds,
+        )
+
+    if settings.session_mode == "db":
+        return store
+    if settings.session_mode != "signed":
+        raise ValueError(f"Unknown SESSION_MODE: {settings.session_mode}")
+    if not settings.session_signing_key:
+        raise ValueError("SESSION_MODE=signed requires SESSION_SIGNING_KEY")
+    return SignedSessionStore(
+        SessionTokenSigner(settings.session_signing_key),
+        RevocationSet(max_token_lifetime=timedelta(minutes=settings.session_expires_minutes)),
+        generations,
+        fallback=store,
+    )
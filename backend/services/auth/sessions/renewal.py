@@ -0,0 +1,106 @@
+# backend/services/auth/sessions/renewal.py
+from __future__ import annotations
+
+import dataclasses
+import threading
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from uuid import UUID
+
+from sqlalchemy import DateTime, column, update, values
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+
+from backend.core.settings import get_settings
+from backend.db import SessionLocal
+from backend.models import Session as SessionModel
+from backend.services.auth.sessions.types import ResolvedSession
+
+# 一條 UPDATE ... FROM (VALUES ...) 最多帶幾列
+_FLUSH_CHUNK = 1000
+
+
+class SessionRenewer:
+    """
+    滑動過期：活躍的 login session 在剩餘效期少於 lifetime - interval 時延長為 now + lifetime。
+
+    - touch()：只在記憶體記下新的到期時間（dirty set），不碰 DB；
+      每個 session 每 interval 最多觸發一次（依 session 目前的 expires_at 判斷，不另外記時間）
+    - flush()：把累積的續期以 UPDATE sessions ... FROM (VALUES ...) 批次寫入
+      （由 lifespan 背景工作定期呼叫，關機時再 flush 一次）；寫入失敗時併回下次再試
+    - 已撤銷的 session 也照樣延長 DB 上的 expires_at：簽章 session 的撤銷清單以它為準，必須不早於 token 內的到期時間
+
+    續期尚未 flush 前 worker 當掉，DB 上的 expires_at 停在續期前：
+    - DB 模式：最多損失一次續期（session 在原本的到期時間失效）
+    - 簽章模式：已簽發的 token 仍帶著延長後的 exp，可能比 DB 的 expires_at 晚最多一個 lifetime；
+      RevocationSet.sync 與 auth GC 因此把撤銷 / 列多保留一個 lifetime（見 signed.py、gc.py）
+    """
+
+    def __init__(self, *, lifetime: timedelta, interval_seconds: float) -> None:
+        self.lifetime = lifetime
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._dirty: dict[UUID, datetime] = {}
+
+    def touch(self, session: ResolvedSession) -> ResolvedSession | None:
+        """需要續期時回傳延長後的 session（呼叫端據此更新快取與 cookie），否則回傳 None。"""
+        if session.kind != "login":
+            return None
+
+        expires_at = datetime.now(timezone.utc) + self.lifetime
+        if (expires_at - session.expires_at).total_seconds() < self.interval_seconds:
+            return None
+
+        with self._lock:
+            self._dirty[session.session_id] = expires_at
+        return dataclasses.replace(session, expires_at=expires_at)
+
+    def flush(self) -> int:
+        """同步（DB I/O）；回傳送出的續期筆數。"""
+        with self._lock:
+            if not self._dirty:
+                return 0
+            batch, self._dirty = self._dirty, {}
+
+        rows = list(batch.items())
+        try:
+            with SessionLocal() as db:
+                for start in range(0, len(rows), _FLUSH_CHUNK):
+                    renewed = values(
+                        column("id", PGUUID(as_uuid=True)),
+                        column("expires_at", DateTime(timezone=True)),
+                        name="renewed",
+                    ).data(rows[start:start + _FLUSH_CHUNK])
+                    db.execute(
+                        update(SessionModel)
+                        .where(
+                            SessionModel.id == renewed.c.id,
+                            SessionModel.expires_at < renewed.c.expires_at,
+                        )
+                        .values(expires_at=renewed.c.expires_at)
+                        .execution_options(synchronize_session=False)
+                    )
+                db.commit()
+        except Exception:
+            # 併回待寫入（同一 session 保留較晚的到期時間），下次 flush 再試
+            with self._lock:
+                for session_id, expires_at in batch.items():
+                    if self._dirty.get(session_id, expires_at) <= expires_at:
+                        self._dirty[session_id] = expires_at
+            raise
+        return len(rows)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"pending_renewals": len(self._dirty)}
+
+
+@lru_cache(maxsize=1)
+def get_session_renewer() -> SessionRenewer | None:
+    """SESSION_SLIDING_ENABLED=false 時回傳 None（固定效期，沿用登入當下的 expires_at）。"""
+    settings = get_settings()
+    if not settings.session_sliding_enabled:
+        return None
+    return SessionRenewer(
+        lifetime=timedelta(minutes=settings.session_expires_minutes),
+        interval_seconds=settings.session_renew_interval_seconds,
+    )
@@ -0,0 +1,209 @@
+# backend/services/auth/sessions/signed.py
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import select
+
+from backend.db import SessionLocal
+from backend.models import Session as SessionModel
+from backend.services.auth.sessions.generations import SessionGenerations
+from backend.services.auth.sessions.types import ResolvedSession, SessionStore, SessionUser
+
+_KINDS = {"login": "l", "signup": "s"}
+_KIND_NAMES = {v: k for k, v in _KINDS.items()}
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class SessionTokenSigner:
+    """
+    session token = base64url(payload) "." base64url(HMAC-SHA256(key, payload))。
+    payload 是精簡的 JSON：session id、user id、is_active、kind、到期時間（unix 秒）、session_generation。
+    只簽章不加密：內容不含 email 等個資，cookie 為 HttpOnly。
+    """
+
+    def __init__(self, key: str) -> None:
+        self._key = key.encode("utf-8")
+
+    def _mac(self, payload: bytes) -> bytes:
+        return hmac.new(self._key, payload, hashlib.sha256).digest()
+
+    def issue(self, session: ResolvedSession) -> str:
+        payload = json.dumps(
+            [
+                session.session_id.hex,
+                session.user.id,
+                int(session.user.is_active),
+                _KINDS.get(session.kind, session.kind),
+                int(session.expires_at.timestamp()),
+                session.generation,
+            ],
+            separators=(",", ":"),
+        ).encode("utf-8")
+        return f"{_b64encode(payload)}.{_b64encode(self._mac(payload))}"
+
+    def verify(self, token: str) -> ResolvedSession | None:
+        """簽章不符、格式錯誤或已過期時回傳 None。"""
+        payload_text, sep, mac_text = token.partition(".")
+        if not sep:
+            return None
+        try:
+            payload = _b64decode(payload_text)
+            if not hmac.compare_digest(self._mac(payload), _b64decode(mac_text)):
+                return None
+            sid, user_id, is_active, kind, exp, generation = json.loads(payload)
+            expires_at = datetime.fromtimestamp(exp, timezone.utc)
+            session_id = UUID(hex=sid)
+        except (ValueError, TypeError):
+            return None
+
+        if expires_at <= datetime.now(timezone.utc):
+            return None
+        return ResolvedSession(
+            session_id=session_id,
+            kind=_KIND_NAMES.get(kind, kind),
+            expires_at=expires_at,
+            user=SessionUser(id=user_id, is_active=bool(is_active)),
+            generation=generation,
+        )
+
+
+class RevocationSet:
+    """
+    已撤銷、尚未過期的 session id（以 sessions.revoked 為準）。
+    每個 worker 一份，sync() 由 lifespan 背景工作定期從 DB 重新載入，讓其他 worker 的撤銷在一個同步間隔內生效；
+    本 worker 撤銷的 session 以 add() 立即加入。
+    集合大小只和「尚未過期就被登出」的 session 數有關，用精確的 set 即可，不需 Bloom filter。
+
+    滑動過期時，續期後的 token 立刻帶著新的 exp，DB 的 expires_at 要等 SessionRenewer flush 才更新
+    （worker 在 flush 前當掉就不會更新）；token 的 exp 最多比 DB 晚一個 max_token_lifetime，
+    因此 sync 保留 expires_at 在 now - max_token_lifetime 之後的撤銷，而不是只保留尚未過期的。
+    """
+
+    def __init__(self, *, max_token_lifetime: timedelta = timedelta(0)) -> None:
+        self.max_token_lifetime = max_token_lifetime
+        self._lock = threading.Lock()
+        self._revoked: dict[UUID, datetime] = {}
+        # 上次 sync 之後才由本機加入的項目（DB 查詢可能還看不到，sync 時保留一輪）
+        self._recent: set[UUID] = set()
+        self.synced_at: datetime | None = None
+
+    def __contains__(self, session_id: UUID) -> bool:
+        return session_id in self._revoked
+
+    def add(self, session_id: UUID, expires_at: datetime) -> None:
+        with self._lock:
+            self._revoked[session_id] = expires_at
+            self._recent.add(session_id)
+
+    def sync(self) -> int:
+        """同步（DB I/O）；回傳目前集合大小。"""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            recent, self._recent = self._recent, set()
+
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(SessionModel.id, SessionModel.expires_at).where(
+                    SessionModel.revoked.is_(True),
+                    SessionModel.expires_at > now - self.max_token_lifetime,
+                )
+            ).all()
+
+        with self._lock:
+            revoked = {sid: expires_at for sid, expires_at in rows}
+            for sid in recent | self._recent:
+                if sid in self._revoked:
+                    revoked.setdefault(sid, self._revoked[sid])
+            self._revoked = revoked
+            self.synced_at = now
+            return len(revoked)
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+class SignedSessionStore:
+    """
+    SESSION_MODE=signed：cookie 是簽章 token，驗證只需 HMAC、一次 set 查詢與 generation 比對
+    （generation 快取過期時才以主鍵查一次 users）。
+
+    - 撤銷：logout 以 invalidate() 立即加入本機的 RevocationSet；其他 worker 靠定期 sync() 得知
+    - 整批撤銷（重設密碼、登出所有裝置）：token 內的 generation 與使用者目前的不同即失效
+    - 舊的 UUID cookie（切換模式前登入的使用者）交給 fallback（DB 模式）解析，不必全部重新登入
+    - token 內的 is_active 是簽發當下的狀態：verify_email 會 rotation 出新 token，
+      同一使用者其他裝置上的舊 token 要重新登入後才會更新
+    """
+
+    def __init__(
+        self,
+        signer: SessionTokenSigner,
+        revocations: RevocationSet,
+        generations: SessionGenerations,
+        *,
+        fallback: SessionStore,
+    ) -> None:
+        self.signer = signer
+        self.revocations = revocations
+        self.generations = generations
+        self.fallback = fallback
+
+    def resolve(self, raw_token: str | None) -> ResolvedSession | None:
+        if not raw_token:
+            return None
+        if "." not in raw_token:
+            return self.fallback.resolve(raw_token)
+
+        session = self.signer.verify(raw_token)
+        if session is None or session.session_id in self.revocations:
+            return None
+        if self.generations.current(session.user.id) != session.generation:
+            return None
+        return session
+
+    def session_id(self, raw_token: str | None) -> UUID | None:
+        if not raw_token:
+            return None
+        if "." not in raw_token:
+            return self.fallback.session_id(raw_token)
+        session = self.signer.verify(raw_token)
+        return session.session_id if session is not None else None
+
+    def cookie_value(self, session: ResolvedSession) -> str:
+        return self.signer.issue(session)
+
+    def extend(self, session: ResolvedSession) -> None:
+        # 新的到期時間在重新簽發的 token 裡；只有舊 UUID cookie 的快取需要更新
+        self.fallback.extend(session)
+
+    def invalidate(self, session_id: UUID) -> None:
+        # 不知道 token 的到期時間時以最長有效期保留（sync 會依 DB 的 expires_at 修正）
+        self.revocations.add(session_id, datetime.max.replace(tzinfo=timezone.utc))
+        self.fallback.invalidate(session_id)
+
+    def invalidate_user(self, user_id: int) -> None:
+        self.generations.forget(user_id)
+        self.fallback.invalidate_user(user_id)
+
+    def sync(self) -> int:
+        return self.revocations.sync()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            **self.fallback.stats(),
+            "revoked_sessions": len(self.revocations),
+            "cached_generations": len(self.generations),
+        }
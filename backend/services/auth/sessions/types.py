@@ -0,0 +1,94 @@
+# backend/services/auth/sessions/types.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Protocol
+from uuid import UUID
+
+if TYPE_CHECKING:
+    from backend.models import Session as SessionModel, User
+
+
+@dataclass(frozen=True)
+class SessionUser:
+    """
+    session 解析出的使用者唯讀快照：欄位名稱與 models.User 相同，route 可照常取用 .id / .email / .is_active；
+    不是 ORM 物件，可以安全地跨請求、跨執行緒放在快取裡（需要寫入時請自行以 id 查 User）。
+    簽章 session（SESSION_MODE=signed）的 cookie 只帶 id / is_active，email 等欄位為 None，需要時請以 id 查 User。
+    """
+    id: int
+    is_active: bool
+    email: str | None = None
+    username: str | None = None
+    is_admin: bool = False
+
+
+@dataclass(frozen=True)
+class ResolvedSession:
+    session_id: UUID
+    kind: str
+    expires_at: datetime
+    user: SessionUser
+    # 建立時的 users.session_generation（與目前值不同代表已被整批撤銷）
+    generation: int = 0
+
+    @classmethod
+    def from_models(cls, session: SessionModel, user: User) -> ResolvedSession:
+        return cls(
+            session_id=session.id,
+            kind=session.kind or "login",
+            expires_at=session.expires_at,
+            user=SessionUser(
+                id=user.id,
+                is_active=user.is_active,
+                email=user.email,
+                username=user.username,
+                is_admin=user.is_admin,
+            ),
+            generation=session.generation,
+        )
+
+
+class SessionStore(Protocol):
+    """
+    由 session cookie 解析出有效 session 與其使用者的介面：
+    SESSION_MODE=db 時 cookie 是 session UUID（SESSION_CACHE_* 決定是否包一層記憶體快取），
+    SESSION_MODE=signed 時 cookie 是 HMAC 簽章的 token（見 signed.py）。
+    方法皆為同步（可能有 DB I/O），async 呼叫端請以 run_in_threadpool 呼叫。
+
+    session 被撤銷或使用者狀態改變的地方（logout / reset_password / verify_email）
+    必須在 commit 後呼叫 invalidate / invalidate_user，讓快取立刻失效。
+    """
+
+    def resolve(self, raw_token: str | None) -> ResolvedSession | None:
+        """cookie 缺少 / 格式錯誤、session 不存在、已撤銷或已過期時回傳 None。"""
+        ...
+
+    def session_id(self, raw_token: str | None) -> UUID | None:
+        """只解出 cookie 對應的 session id（不檢查撤銷與過期；logout / rotation 修改 session 列時使用）。"""
+        ...
+
+    def cookie_value(self, session: ResolvedSession) -> str:
+        """新建立的 session 要寫進 cookie 的值。"""
+        ...
+
+    def extend(self, session: ResolvedSession) -> None:
+        """session 已續期（SessionRenewer）：更新快取中的 expires_at，DB 由 renewer 批次寫入。"""
+        ...
+
+    def invalidate(self, session_id: UUID) -> None: ...
+
+    def invalidate_user(self, user_id: int) -> None: ...
+
+    def stats(self) -> dict[str, int]: ...
+
+
+def parse_session_id(raw_token: str | None) -> UUID | None:
+    """session cookie 的值轉成 UUID；缺少或格式錯誤時回傳 None。"""
+    if not raw_token:
+        return None
+    try:
+        return UUID(raw_token)
+    except ValueError:
+        return None
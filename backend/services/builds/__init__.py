@@ -0,0 +1,16 @@
+# backend/services/builds/__init__.py
+from .intent import BuildRequest, format_build_facts, parse_build_request
+from .optimizer import Build, BuildOptimizer, get_build_optimizer
+from .profiles import DEFAULT_PROFILE, PROFILES, BuildProfile
+
+__all__ = [
+    "Build",
+    "BuildOptimizer",
+    "BuildProfile",
+    "BuildRequest",
+    "DEFAULT_PROFILE",
+    "PROFILES",
+    "format_build_facts",
+    "get_build_optimizer",
+    "parse_build_request",
+]
@@ -0,0 +1,116 @@
+# backend/services/builds/intent.py
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+from backend.services.builds.optimizer import Build
+from backend.services.builds.profiles import DEFAULT_PROFILE, PROFILES
+
+# 「預算 3 萬」「預算30000元」「3.5萬的預算」「4w 怎麼配」「預算 3 萬 5」「三萬五預算怎麼配」
+_CN_DIGITS = "一二兩三四五六七八九"
+_NUMBER = rf"\d{{1,3}}(?:,\d{{3}})+|\d+(?:\.\d+)?|[{_CN_DIGITS}]?十[{_CN_DIGITS}]?|[{_CN_DIGITS}]"
+
+
+def _amount(unit: str) -> str:
+    # 前面緊接英數字或「-」的是型號（「i5-13400」「RTX4060」），不是金額
+    return (
+        rf"(?<![A-Za-z\d.\-])({_NUMBER})\s*{unit}"
+        # 萬之後的零頭：「3 萬 5」「三萬五」= 35000、「3萬5千」「3萬5000」；後面緊接英數字的不算（「4萬 2K螢幕」）
+        rf"(?:\s*(\d+|[{_CN_DIGITS}])\s*(千)?(?![\dA-Za-z]))?"
+        r"\s*(?:元|塊|台幣)?"
+    )
+
+
+_AMOUNT = _amount(r"(萬|w|W|k|K|千)?")
+# 「能配」「怎麼配」之類的問法也常接在型號後面（「13400 能配 B760 嗎」），金額一定要帶單位
+_AMOUNT_WITH_UNIT = _amount(r"(萬|w|W|k|K|千|元|塊|台幣)")
+_BUDGET_PATTERNS = (
+    re.compile(r"預算(?:大概|大約|約|是|在|抓|只有|有)?\s*(?:NT\$?|\$)?\s*" + _AMOUNT),
+    re.compile(_AMOUNT + r"\s*(?:左右|以內|內|上下)?的?\s*預算"),
+    re.compile(
+        _AMOUNT_WITH_UNIT
+        + r"\s*(?:左右|以內|內|上下)?的?\s*(?:怎麼配|要怎麼配|能配|可以配|配一台|組一台|想組|想配)"
+    ),
+)
+_UNITS = {"萬": 10000, "w": 10000, "W": 10000, "k": 1000, "K": 1000, "千": 1000}
+_CN_VALUES = {"一": 1, "二": 2, "兩": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "八": 8, "九": 9}
+
+# 低於這個金額組不出本站資料庫裡的完整主機，高於這個多半是打錯字
+_BUDGET_MIN = 10000
+_BUDGET_MAX = 500000
+
+_PROFILE_KEYWORDS = (
+    ("creator", re.compile(r"剪片|剪輯|影片|渲染|算圖|工作站|生產力|3D|建模|直播|轉檔")),
+    ("gaming", re.compile(r"遊戲|電競|打game|玩game|fps|FPS|3A|畫質|幀")),
+)
+
+_CATEGORY_LABELS = {
+    "cpu": "CPU",
+    "motherboard": "主機板",
+    "ram": "記憶體",
+    "gpu": "顯示卡",
+    "psu": "電源",
+    "case": "機殼",
+}
+
+
+def _to_number(text: str) -> float:
+    """阿拉伯數字（可含千分位逗號）或一～九十九的中文數字。"""
+    if text[0].isdigit():
+        return float(text.replace(",", ""))
+    tens, ten, ones = text.partition("十")
+    if not ten:
+        return _CN_VALUES[text]
+    return (_CN_VALUES[tens] if tens else 1) * 10 + (_CN_VALUES[ones] if ones else 0)
+
+
+def _to_budget(amount: str, unit: str | None, rest: str | None, rest_unit: str | None) -> int:
+    budget = _to_number(amount) * _UNITS.get(unit, 1)
+    if rest and _UNITS.get(unit) == 10000:
+        # 萬之後單獨一位數（或帶「千」）是千位：「3 萬 5」= 35000；多位數照字面加：「3萬5000」
+        extra = _to_number(rest)
+        budget += extra * 1000 if rest_unit or len(rest) == 1 else extra
+    return int(budget)
+
+
+@dataclass(frozen=True)
+class BuildRequest:
+    budget: int
+    profile: str
+
+
+def parse_build_request(message: str) -> BuildRequest | None:
+    """從訊息抓出整機預算與用途；沒有提到預算（或金額不合理）時回傳 None。"""
+    for pattern in _BUDGET_PATTERNS:
+        match = pattern.search(message)
+        if match is None:
+            continue
+        budget = _to_budget(*match.groups())
+        if _BUDGET_MIN <= budget <= _BUDGET_MAX:
+            break
+    else:
+        return None
+
+    profile = DEFAULT_PROFILE
+    for name, pattern in _PROFILE_KEYWORDS:
+        if pattern.search(message):
+            profile = name
+            break
+    return BuildRequest(budget=budget, profile=profile)
+
+
+def format_build(build: Build) -> str:
+    parts = "｜".join(f"{_CATEGORY_LABELS[c]} {p['name']}" for c, p in build.parts.items())
+    return f"總價 NT${build.total_price:,}（效能指數 {build.performance}）：{parts}"
+
+
+def format_build_facts(request: BuildRequest, builds: list[Build]) -> list[str]:
+    """把配單結果轉成可附進 prompt 的事實（價格與相容性都已由本站資料庫驗證）。"""
+    label = PROFILES[request.profile].label
+    if not builds:
+        return [f"預算 NT${request.budget:,} 在本站零件資料庫中組不出相容的完整主機（{label}用途）。"]
+    return [
+        f"預算 NT${request.budget:,}、{label}用途的候選配置 {i}：{format_build(build)}"
+        for i, build in enumerate(builds, start=1)
+    ]
@@ -0,0 +1,228 @@
+# backend/services/builds/optimizer.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+
+from backend.services.builds.profiles import BuildProfile
+from backend.services.compat.rules import PSU_HEADROOM, REST_OF_SYSTEM_W
+from backend.services.parts import current_parts
+
+CATEGORIES = ("cpu", "motherboard", "ram", "gpu", "psu", "case")
+
+_MEMORY_BITS = {"DDR4": 1, "DDR5": 2}
+_BOARD_FORM_FACTOR_BITS = {"ATX": 1, "mATX": 2, "Mini-ITX": 4}
+_PSU_FORM_FACTOR_BITS = {"ATX": 1, "SFX": 2}
+# ATX 電源位可用轉接架裝 SFX，反之不行
+_CASE_PSU_ACCEPTS = {"ATX": 1 | 2, "SFX": 2}
+# 顯卡依長度分組做 Pareto 剪枝：短卡即使 CP 值較差也要留著給小機殼用
+_GPU_LENGTH_BUCKETS = np.array([270, 300, 330])
+
+
+@dataclass(frozen=True)
+class Build:
+    parts: dict[str, dict[str, Any]]
+    total_price: int
+    performance: float
+    score: float
+
+
+def _pareto(price: np.ndarray, perf: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """
+    每組內只留「沒有更便宜且效能不低於它的對手」的零件（價格 / 效能的 Pareto 前緣）；回傳保留的索引。
+    同組零件在相容性上可互換，被支配的零件不可能出現在最佳配置裡。
+    """
+    keep: list[np.ndarray] = []
+    for group in np.unique(groups):
+        idx = np.flatnonzero(groups == group)
+        order = idx[np.lexsort((-perf[idx], price[idx]))]
+        ordered_perf = perf[order]
+        best_so_far = np.maximum.accumulate(ordered_perf)
+        keep.append(order[np.r_[True, ordered_perf[1:] > best_so_far[:-1]]])
+    return np.sort(np.concatenate(keep)) if keep else np.zeros(0, dtype=np.int64)
+
+
+class _Columns:
+    """單一類別零件的欄式資料（records 與各欄位陣列的列一一對應）。"""
+
+    def __init__(self, records: list[dict[str, Any]], columns: dict[str, Any]) -> None:
+        self.records = records
+        self.price = np.array([r["price"] for r in records], dtype=np.int64)
+        for name, getter in columns.items():
+            setattr(self, name, np.array([getter(r["specs"]) for r in records]))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+class BuildOptimizer:
+    """
+    預算內的整機配單搜尋（不跑 Python 巢狀迴圈）：
+
+    1. 每個類別先依相容性屬性分組，做價格 / 效能的 Pareto 剪枝
+       （主機板、電源、機殼本身沒有效能分數，同組只留最便宜 / 規格最好的幾款）
+    2. CPU × 主機板 × 記憶體以 broadcasting 產生相容組合，再乘上顯示卡；
+       每一步都用「剩下類別的最低價」剪掉已經不可能在預算內的組合
+    3. 機殼 × 電源預先配對，對每個組合一次算出「放得下、瓦數夠、最便宜」的那一對
+    4. 依用途設定檔算效能與 score，同一組 CPU + 顯示卡只留最好的一套，取前 k 名
+    """
+
+    def __init__(self, records: list[dict[str, Any]]) -> None:
+        by_category: dict[str, list[dict[str, Any]]] = {c: [] for c in CATEGORIES}
+        for record in records:
+            if record["category"] in by_category:
+                by_category[record["category"]].append(record)
+
+        sockets = {s: i for i, s in enumerate(sorted({r["specs"]["socket"] for r in by_category["cpu"]}))}
+
+        self.cpu = _Columns(by_category["cpu"], {
+            "socket": lambda s: sockets[s["socket"]],
+            "memory": lambda s: sum(_MEMORY_BITS[m] for m in s["memory_types"]),
+            "gaming": lambda s: s.get("gaming_score", 0),
+            "multi": lambda s: s.get("multi_score", 0),
+            "max_power": lambda s: s.get("max_power_w", s.get("tdp_w", 0)),
+        })
+        self.board = _Columns(
+            [r for r in by_category["motherboard"] if r["specs"]["socket"] in sockets],
+            {
+                "socket": lambda s: sockets[s["socket"]],
+                "memory": lambda s: _MEMORY_BITS[s["memory_type"]],
+                "form_factor": lambda s: _BOARD_FORM_FACTOR_BITS[s["form_factor"]],
+            },
+        )
+        self.ram = _Columns(by_category["ram"], {
+            "memory": lambda s: _MEMORY_BITS[s["memory_type"]],
+            "capacity": lambda s: s["capacity_gb"],
+        })
+        self.gpu = _Columns(by_category["gpu"], {
+            "gaming": lambda s: s.get("gaming_score", 0),
+            "tdp": lambda s: s["tdp_w"],
+            "length": lambda s: s["length_mm"],
+            "recommended_psu": lambda s: s["recommended_psu_w"],
+        })
+        self.psu = _Columns(by_category["psu"], {
+            "wattage": lambda s: s["wattage_w"],
+            "form_factor": lambda s: _PSU_FORM_FACTOR_BITS[s["form_factor"]],
+        })
+        self.case = _Columns(by_category["case"], {
+            "form_factors": lambda s: sum(_BOARD_FORM_FACTOR_BITS[f] for f in s["motherboard_form_factors"]),
+            "gpu_length": lambda s: s["max_gpu_length_mm"],
+            "psu_accepts": lambda s: _CASE_PSU_ACCEPTS[s["psu_form_factor"]],
+        })
+
+        # 與用途無關的剪枝只做一次
+        self._boards = _pareto(
+            self.board.price,
+            np.zeros(len(self.board)),
+            self.board.socket * 100 + self.board.memory * 10 + self.board.form_factor,
+        )
+        self._gpus = _pareto(self.gpu.price, self.gpu.gaming, np.searchsorted(_GPU_LENGTH_BUCKETS, self.gpu.length))
+        psus = _pareto(self.psu.price, self.psu.wattage, self.psu.form_factor)
+        cases = _pareto(self.case.price, self.case.gpu_length, self.case.form_factors * 10 + self.case.psu_accepts)
+
+        # 機殼 × 電源預先配對（電源規格裝得進去的才算）
+        ci, pi = np.meshgrid(cases, psus, indexing="ij")
+        ci, pi = ci.ravel(), pi.ravel()
+        fits = (self.case.psu_accepts[ci] & self.psu.form_factor[pi]) != 0
+        self._pair_case, self._pair_psu = ci[fits], pi[fits]
+        self._pair_price = self.case.price[self._pair_case] + self.psu.price[self._pair_psu]
+
+    def optimize(self, budget: int, profile: BuildProfile, *, k: int = 3) -> list[Build]:
+        if min(len(self.cpu), len(self._boards), len(self.gpu), len(self._pair_price)) == 0:
+            return []
+
+        cpu_perf = profile.cpu_gaming_weight * self.cpu.gaming + profile.cpu_multi_weight * self.cpu.multi
+        cpus = _pareto(self.cpu.price, cpu_perf, self.cpu.socket * 10 + self.cpu.memory)
+
+        ram_ok = np.flatnonzero(self.ram.capacity >= profile.min_ram_gb)
+        ram_perf = np.minimum(self.ram.capacity, 64) / 64 * 100
+        rams = ram_ok[_pareto(self.ram.price[ram_ok], ram_perf[ram_ok], self.ram.memory[ram_ok])]
+        if len(rams) == 0:
+            return []
+
+        gpus = self._gpus
+        min_gpu = self.gpu.price[gpus].min()
+        min_pair = self._pair_price.min()
+
+        # CPU × 主機板：同腳位、主機板的記憶體世代 CPU 有支援
+        c, b = np.meshgrid(cpus, self._boards, indexing="ij")
+        c, b = c.ravel(), b.ravel()
+        ok = (self.cpu.socket[c] == self.board.socket[b]) & ((self.cpu.memory[c] & self.board.memory[b]) != 0)
+        c, b = c[ok], b[ok]
+
+        # × 記憶體：世代與主機板相同
+        c, r = np.repeat(c, len(rams)), np.tile(rams, len(b))
+        b = np.repeat(b, len(rams))
+        base = self.cpu.price[c] + self.board.price[b] + self.ram.price[r]
+        ok = (self.board.memory[b] == self.ram.memory[r]) & (base + min_gpu + min_pair <= budget)
+        c, b, r, base = c[ok], b[ok], r[ok], base[ok]
+
+        # × 顯示卡
+        n = len(c)
+        c, b, r, base = np.repeat(c, len(gpus)), np.repeat(b, len(gpus)), np.repeat(r, len(gpus)), np.repeat(base, len(gpus))
+        g = np.tile(gpus, n)
+        base = base + self.gpu.price[g]
+        ok = base + min_pair <= budget
+        c, b, r, g, base = c[ok], b[ok], r[ok], g[ok], base[ok]
+        if len(c) == 0:
+            return []
+
+        # 每個組合挑最便宜且相容的「機殼 + 電源」
+        load = self.cpu.max_power[c] + self.gpu.tdp[g] + REST_OF_SYSTEM_W
+        needed = np.maximum(self.gpu.recommended_psu[g], np.ceil(load * PSU_HEADROOM / 50) * 50)
+        valid = (
+            ((self.case.form_factors[self._pair_case][None, :] & self.board.form_factor[b][:, None]) != 0)
+            & (self.gpu.length[g][:, None] <= self.case.gpu_length[self._pair_case][None, :])
+            & (self.psu.wattage[self._pair_psu][None, :] >= needed[:, None])
+        )
+        cost = np.where(valid, self._pair_price[None, :], np.iinfo(np.int64).max // 4)
+        best_pair = np.argmin(cost, axis=1)
+        total = base + cost[np.arange(len(c)), best_pair]
+        ok = valid[np.arange(len(c)), best_pair] & (total <= budget)
+        c, b, r, g, best_pair, total = c[ok], b[ok], r[ok], g[ok], best_pair[ok], total[ok]
+        if len(c) == 0:
+            return []
+
+        performance = (
+            profile.gpu_weight * self.gpu.gaming[g]
+            + cpu_perf[c]
+            + profile.ram_weight * ram_perf[r]
+        )
+        score = performance * (budget / total) ** profile.value_weight
+
+        # 分數由高到低；同一組 CPU + 顯示卡只留最好的一套，避免前幾名只差在機殼
+        order = np.argsort(-score, kind="stable")
+        _, first = np.unique((c * len(self.gpu) + g)[order], return_index=True)
+        top = order[np.sort(first)][:k]
+
+        return [
+            Build(
+                parts={
+                    "cpu": self.cpu.records[c[i]],
+                    "motherboard": self.board.records[b[i]],
+                    "ram": self.ram.records[r[i]],
+                    "gpu": self.gpu.records[g[i]],
+                    "psu": self.psu.records[self._pair_psu[best_pair[i]]],
+                    "case": self.case.records[self._pair_case[best_pair[i]]],
+                },
+                total_price=int(total[i]),
+                performance=round(float(performance[i]), 1),
+                score=round(float(score[i]), 1),
+            )
+            for i in top.tolist()
+        ]
+
+
+def get_build_optimizer() -> BuildOptimizer:
+    """零件來自 parts 表的記憶體快照，快照版本變了才重建候選陣列。"""
+    version, _ = current_parts()
+    return _optimizer_for(version)
+
+
+@lru_cache(maxsize=1)
+def _optimizer_for(version: int) -> BuildOptimizer:
+    _, records = current_parts()
+    return BuildOptimizer(records)
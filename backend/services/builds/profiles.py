@@ -0,0 +1,54 @@
+# backend/services/builds/profiles.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class BuildProfile:
+    """
+    用途設定檔：效能分數 = Σ 權重 × 各零件的效能指數（0~100）。
+    value_weight 控制「CP 值」的比重：score = 效能 × (預算 / 總價) ^ value_weight，
+    0 代表只看效能（盡量花滿預算），越大越偏好省錢的配置。
+    """
+    name: str
+    label: str
+    gpu_weight: float
+    cpu_gaming_weight: float
+    cpu_multi_weight: float
+    ram_weight: float
+    min_ram_gb: int
+    value_weight: float = 0.25
+
+
+PROFILES: dict[str, BuildProfile] = {
+    "gaming": BuildProfile(
+        name="gaming",
+        label="遊戲",
+        gpu_weight=0.70,
+        cpu_gaming_weight=0.25,
+        cpu_multi_weight=0.0,
+        ram_weight=0.05,
+        min_ram_gb=16,
+    ),
+    "creator": BuildProfile(
+        name="creator",
+        label="影音創作 / 生產力",
+        gpu_weight=0.25,
+        cpu_gaming_weight=0.0,
+        cpu_multi_weight=0.55,
+        ram_weight=0.20,
+        min_ram_gb=32,
+    ),
+    "balanced": BuildProfile(
+        name="balanced",
+        label="綜合",
+        gpu_weight=0.45,
+        cpu_gaming_weight=0.20,
+        cpu_multi_weight=0.20,
+        ram_weight=0.15,
+        min_ram_gb=16,
+    ),
+}
+
+DEFAULT_PROFILE = "balanced"
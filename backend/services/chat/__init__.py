@@ -1,4 +1,13 @@
 # backend/services/chat/__init__.py
-from .service import generate_chat_reply
+from .clients.resilient import UpstreamUnavailableError
+from .scheduler import ChatOverloadedError
+from .service import generate_chat_reply, stream_chat_reply
+from .usage import ChatQuotaExceededError
 
-__all__ = ["generate_chat_reply"]
+__all__ = [
+    "ChatOverloadedError",
+    "ChatQuotaExceededError",
+    "UpstreamUnavailableError",
+    "generate_chat_reply",
+    "stream_chat_reply",
+]
@@ -0,0 +1,17 @@
+# backend/services/chat/backends/__init__.py
+from __future__ import annotations
+
+from .cassette import CassetteBackend, CassetteMissError
+from .gemini import GeminiBackend
+from .provider import get_chat_backend
+from .stub import StubBackend
+from .types import ChatBackend
+
+__all__ = [
+    "ChatBackend",
+    "GeminiBackend",
+    "StubBackend",
+    "CassetteBackend",
+    "CassetteMissError",
+    "get_chat_backend",
+]
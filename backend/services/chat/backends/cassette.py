@@ -0,0 +1,181 @@
+# backend/services/chat/backends/cassette.py
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+from dataclasses import asdict
+from pathlib import Path
+
+from backend.services.chat.backends.types import ChatBackend, UsageCallback
+from backend.services.chat.cache.keys import build_cache_key
+from backend.services.chat.prompt import ChatPrompt
+from backend.services.chat.routing import ModelTier
+from backend.services.chat.usage import TokenCounts
+
+
+class CassetteMissError(LookupError):
+    """replay 模式下找不到對應的錄製紀錄。"""
+
+
+class CassetteBackend:
+    """
+    錄製 / 重播 backend（JSONL 檔，每行一筆）：
+
+    - record：轉呼叫內層 backend（通常是 Gemini），把回覆切段與時間點寫進檔案
+    - replay：只讀檔案，依錄製時的 TTFT 與段落間隔重播（replay_timing=False 時不等待）；
+      找不到紀錄時拋 CassetteMissError
+
+    key 與回覆快取相同（正規化後的 prompt + 模型），同一份錄音可跨次壓測重複使用。
+    錄製時一併保存上游回報的 token 用量，重播時照樣回報，讓計量 / 額度流程與正式環境一致。
+    """
+
+    name = "cassette"
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        mode: str,
+        inner: ChatBackend | None = None,
+        replay_timing: bool = True,
+    ) -> None:
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if mode == "record" and inner is None:
+            raise ValueError("record mode needs an inner backend")
+
+        self.path = Path(path)
+        self.mode = mode
+        self.inner = inner
+        self.replay_timing = replay_timing
+        self._tapes: dict[str, dict] = {}
+        self._write_lock = asyncio.Lock()
+
+        if self.path.exists():
+            with self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        tape = json.loads(line)
+                        self._tapes[tape["key"]] = tape
+
+    @staticmethod
+    def _key(prompt: ChatPrompt, tier: ModelTier) -> str:
+        return build_cache_key(prompt.cache_text(), model=tier.model)
+
+    # ===== 對外介面 =====
+
+    async def generate(
+        self,
+        prompt: ChatPrompt,
+        *,
+        tier: ModelTier,
+        on_usage: UsageCallback | None = None,
+    ) -> str:
+        if self.mode == "replay":
+            tape = self._lookup(prompt, tier)
+            reply = "".join([piece async for piece in self._replay(tape)])
+            self._report_usage(tape, on_usage)
+            return reply
+
+        usage: list[TokenCounts] = []
+        started = time.monotonic()
+        reply = await self.inner.generate(prompt, tier=tier, on_usage=self._capture(usage, on_usage))
+        elapsed = time.monotonic() - started
+        await self._save(prompt, tier, chunks=[reply], offsets=[elapsed], usage=usage)
+        return reply
+
+    async def stream(
+        self,
+        prompt: ChatPrompt,
+        *,
+        tier: ModelTier,
+        on_usage: UsageCallback | None = None,
+    ) -> AsyncIterator[str]:
+        if self.mode == "replay":
+            tape = self._lookup(prompt, tier)
+            self._report_usage(tape, on_usage)
+            return self._replay(tape)
+
+        usage: list[TokenCounts] = []
+        started = time.monotonic()
+        chunks = await self.inner.stream(prompt, tier=tier, on_usage=self._capture(usage, on_usage))
+        return self._record_stream(prompt, tier, chunks, started, usage)
+
+    # ===== 內部 =====
+
+    def _lookup(self, prompt: ChatPrompt, tier: ModelTier) -> dict:
+        tape = self._tapes.get(self._key(prompt, tier))
+        if tape is None:
+            raise CassetteMissError(f"No recording for model={tier.model} in {self.path}")
+        return tape
+
+    @staticmethod
+    def _capture(sink: list[TokenCounts], on_usage: UsageCallback | None) -> UsageCallback:
+        def capture(counts: TokenCounts) -> None:
+            sink.append(counts)
+            if on_usage is not None:
+                on_usage(counts)
+
+        return capture
+
+    @staticmethod
+    def _report_usage(tape: dict, on_usage: UsageCallback | None) -> None:
+        # 舊版錄音沒有 usage 欄位，不回報
+        if on_usage is not None and tape.get("usage"):
+            on_usage(TokenCounts(**tape["usage"]))
+
+    async def _replay(self, tape: dict) -> AsyncIterator[str]:
+        previous = 0.0
+        for piece, offset in zip(tape["chunks"], tape["offsets"]):
+            if self.replay_timing:
+                await asyncio.sleep(max(0.0, offset - previous))
+            previous = offset
+            yield piece
+
+    async def _record_stream(
+        self,
+        prompt: ChatPrompt,
+        tier: ModelTier,
+        chunks: AsyncIterator[str],
+        started: float,
+        usage: list[TokenCounts],
+    ) -> AsyncIterator[str]:
+        pieces: list[str] = []
+        offsets: list[float] = []
+        try:
+            async for piece in chunks:
+                pieces.append(piece)
+                offsets.append(time.monotonic() - started)
+                yield piece
+        finally:
+            # 內層串流在 aclose 時才回報用量，先關掉再存檔
+            await chunks.aclose()
+        # 只錄完整跑完的串流
+        await self._save(prompt, tier, chunks=pieces, offsets=offsets, usage=usage)
+
+    async def _save(
+        self,
+        prompt: ChatPrompt,
+        tier: ModelTier,
+        *,
+        chunks: list[str],
+        offsets: list[float],
+        usage: list[TokenCounts],
+    ) -> None:
+        tape = {
+            "key": self._key(prompt, tier),
+            "model": tier.model,
+            "chunks": chunks,
+            "offsets": [round(x, 4) for x in offsets],
+            "usage": asdict(usage[-1]) if usage else None,
+        }
+        async with self._write_lock:
+            self._tapes[tape["key"]] = tape
+            await asyncio.to_thread(self._append, json.dumps(tape, ensure_ascii=False))
+
+    def _append(self, line: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
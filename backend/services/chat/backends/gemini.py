@@ -0,0 +1,122 @@
+# backend/services/chat/backends/gemini.py
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from google.genai import errors as genai_errors
+from google.genai import types
+
+from backend.services.chat.backends.types import UsageCallback
+from backend.services.chat.clients.resilient import get_resilient_genai_client
+from backend.services.chat.context_cache import get_context_cache_registry
+from backend.services.chat.metrics import get_chat_metrics
+from backend.services.chat.prompt import ChatPrompt
+from backend.services.chat.routing import ModelTier
+from backend.services.chat.usage import TokenCounts
+
+
+def _is_stale_cache_error(exc: genai_errors.ClientError, cached_name: str) -> bool:
+    # 上游刪除 / 過期的 handle 回 404（或 403「CachedContent not found (or permission denied)」）；
+    # 400、429 等與 handle 無關的錯誤重送也一樣會失敗，而且不該作廢仍有效的 handle
+    if exc.code not in (403, 404):
+        return False
+    text = f"{exc.message or ''} {exc}"
+    return cached_name in text or "cachedcontent" in text.lower().replace(" ", "").replace("_", "")
+
+
+def _report_usage(on_usage: UsageCallback | None, usage_metadata: Any) -> None:
+    if on_usage is None:
+        return
+    counts = TokenCounts.from_usage_metadata(usage_metadata)
+    if counts is not None:
+        on_usage(counts)
+
+
+class GeminiBackend:
+    """
+    正式環境的 backend：經 ResilientGenAIClient（deadline / 重試 / 斷路器）呼叫 Gemini，
+    穩定前綴夠長時改帶 explicit cached content 的 handle。
+    """
+
+    name = "gemini"
+
+    async def generate(
+        self,
+        prompt: ChatPrompt,
+        *,
+        tier: ModelTier,
+        on_usage: UsageCallback | None = None,
+    ) -> str:
+        client = get_resilient_genai_client()
+        resp = await self._call(client.models.generate_content, prompt, tier)
+        _report_usage(on_usage, getattr(resp, "usage_metadata", None))
+        return (getattr(resp, "text", None) or "").strip()
+
+    async def stream(
+        self,
+        prompt: ChatPrompt,
+        *,
+        tier: ModelTier,
+        on_usage: UsageCallback | None = None,
+    ) -> AsyncIterator[str]:
+        client = get_resilient_genai_client()
+        stream = await self._call(client.models.generate_content_stream, prompt, tier)
+        return self._texts(stream, on_usage)
+
+    # ===== 內部 =====
+
+    @staticmethod
+    async def _texts(stream: AsyncIterator[Any], on_usage: UsageCallback | None) -> AsyncIterator[str]:
+        # usage_metadata 是累計值，最後一個 chunk 的才是整次呼叫的用量；
+        # 中途中斷時以目前拿到的最後一筆計費（上游已經產生的 token 一樣會被收費）
+        usage = None
+        try:
+            async for chunk in stream:
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                text = getattr(chunk, "text", None)
+                if text:
+                    yield text
+        finally:
+            _report_usage(on_usage, usage)
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def _config(self, prompt: ChatPrompt, tier: ModelTier) -> tuple[types.GenerateContentConfig, str | None]:
+        """
+        穩定前綴已登記成 cached content 時改帶 handle（上游不必重新 prefill system_instruction），
+        否則照常送 system_instruction。回傳 (config, 使用中的 handle)。
+        cached content 綁定模型，因此 handle 依分級的 model 分開登記。
+        """
+        registry = get_context_cache_registry()
+        if registry is not None:
+            name = await registry.resolve(model=tier.model, system_instruction=prompt.system_instruction)
+            if name is not None:
+                return types.GenerateContentConfig(cached_content=name, **tier.generation_config()), name
+        return (
+            types.GenerateContentConfig(system_instruction=prompt.system_instruction, **tier.generation_config()),
+            None,
+        )
+
+    def _drop_context_cache(self, prompt: ChatPrompt, tier: ModelTier) -> types.GenerateContentConfig:
+        # handle 被上游提早刪除 / 過期：作廢後改走未快取的 config 重送一次
+        get_chat_metrics().incr("context_cache.invalidated")
+        registry = get_context_cache_registry()
+        if registry is not None:
+            registry.invalidate(model=tier.model, system_instruction=prompt.system_instruction)
+        return types.GenerateContentConfig(system_instruction=prompt.system_instruction, **tier.generation_config())
+
+    async def _call(self, method: Callable[..., Awaitable[Any]], prompt: ChatPrompt, tier: ModelTier) -> Any:
+        config, cached_name = await self._config(prompt, tier)
+        try:
+            return await method(model=tier.model, contents=prompt.contents, config=config)
+        except genai_errors.ClientError as exc:
+            # 串流只在建立時可安全重送；已經吐出部分文字後不會走到這裡
+            if cached_name is None or not _is_stale_cache_error(exc, cached_name):
+                raise
+            return await method(
+                model=tier.model,
+                contents=prompt.contents,
+                config=self._drop_context_cache(prompt, tier),
+            )
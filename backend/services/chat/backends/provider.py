@@ -0,0 +1,42 @@
+# backend/services/chat/backends/provider.py
+from __future__ import annotations
+
+from functools import lru_cache
+
+from backend.core.settings import get_settings
+from backend.services.chat.backends.gemini import GeminiBackend
+from backend.services.chat.backends.types import ChatBackend
+
+
+@lru_cache(maxsize=1)
+def get_chat_backend() -> ChatBackend:
+    """
+    依 CHAT_BACKEND 建立 backend（process 級別 singleton）：
+    gemini（預設）/ stub（離線壓測）/ cassette（錄製或重播真實回覆）。
+    """
+    settings = get_settings()
+
+    if settings.chat_backend == "stub":
+        from backend.services.chat.backends.stub import StubBackend
+
+        return StubBackend(
+            latency_seconds=settings.chat_stub_latency_seconds,
+            chunk_delay_seconds=settings.chat_stub_chunk_delay_seconds,
+            chunks=settings.chat_stub_chunks,
+            reply_chars=settings.chat_stub_reply_chars,
+            jitter=settings.chat_stub_jitter,
+        )
+
+    if settings.chat_backend == "cassette":
+        from backend.services.chat.backends.cassette import CassetteBackend
+
+        return CassetteBackend(
+            settings.chat_cassette_path,
+            mode=settings.chat_cassette_mode,
+            inner=GeminiBackend(),
+            replay_timing=settings.chat_cassette_replay_timing,
+        )
+
+    if settings.chat_backend != "gemini":
+        raise ValueError(f"Unknown CHAT_BACKEND: {settings.chat_backend}")
+    return GeminiBackend()
@@ -0,0 +1,103 @@
+# backend/services/chat/backends/stub.py
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+from collections.abc import AsyncIterator
+
+from backend.services.chat.backends.types import UsageCallback
+from backend.services.chat.prompt import ChatPrompt
+from backend.services.chat.routing import ModelTier
+from backend.services.chat.tokens import estimate_tokens
+from backend.services.chat.usage import TokenCounts
+
+_FILLER = "這是壓力測試用的固定回覆，內容與問題無關，只用來模擬模型輸出的長度與節奏。"
+
+
+class StubBackend:
+    """
+    本地假 backend（不連網）：回覆內容由 prompt 雜湊決定，延遲與切段方式可設定，
+    用來在離線環境量測整個 chat 流程（排隊、快取、SSE）的吞吐量與尾端延遲。
+
+    - latency_seconds：第一段文字前的等待（模擬 prefill / TTFT）
+    - chunk_delay_seconds：之後每段之間的間隔
+    - jitter：延遲的隨機浮動比例（以 prompt 雜湊為種子，同一 prompt 每次相同）
+    """
+
+    name = "stub"
+
+    def __init__(
+        self,
+        *,
+        latency_seconds: float,
+        chunk_delay_seconds: float,
+        chunks: int,
+        reply_chars: int,
+        jitter: float = 0.0,
+    ) -> None:
+        self.latency_seconds = latency_seconds
+        self.chunk_delay_seconds = chunk_delay_seconds
+        self.chunks = max(1, chunks)
+        self.reply_chars = max(1, reply_chars)
+        self.jitter = max(0.0, jitter)
+
+    def _plan(self, prompt: ChatPrompt, tier: ModelTier) -> tuple[list[str], float, float]:
+        digest = hashlib.sha256(f"{tier.model}\x1f{prompt.cache_text()}".encode("utf-8")).hexdigest()
+        head = f"（{tier.name} 測試回覆 {digest[:8]}）"
+        body = (_FILLER * (self.reply_chars // len(_FILLER) + 1))[: max(0, self.reply_chars - len(head))]
+        reply = head + body
+
+        size = -(-len(reply) // self.chunks)
+        pieces = [reply[i:i + size] for i in range(0, len(reply), size)]
+
+        scale = 1.0
+        if self.jitter:
+            scale += random.Random(digest).uniform(-self.jitter, self.jitter)
+        return pieces, self.latency_seconds * scale, self.chunk_delay_seconds * scale
+
+    async def generate(
+        self,
+        prompt: ChatPrompt,
+        *,
+        tier: ModelTier,
+        on_usage: UsageCallback | None = None,
+    ) -> str:
+        pieces, first, gap = self._plan(prompt, tier)
+        await asyncio.sleep(first + gap * (len(pieces) - 1))
+        reply = "".join(pieces)
+        self._report_usage(on_usage, prompt, reply)
+        return reply
+
+    async def stream(
+        self,
+        prompt: ChatPrompt,
+        *,
+        tier: ModelTier,
+        on_usage: UsageCallback | None = None,
+    ) -> AsyncIterator[str]:
+        pieces, first, gap = self._plan(prompt, tier)
+        self._report_usage(on_usage, prompt, "".join(pieces))
+        return self._emit(pieces, first, gap)
+
+    @staticmethod
+    def _report_usage(on_usage: UsageCallback | None, prompt: ChatPrompt, reply: str) -> None:
+        # 以本地估算模擬 usage_metadata，讓壓測時計量 / 額度流程也會被執行到
+        if on_usage is None:
+            return
+        prompt_tokens = estimate_tokens(prompt.cache_text())
+        output_tokens = estimate_tokens(reply)
+        on_usage(TokenCounts(
+            prompt_tokens=prompt_tokens,
+            output_tokens=output_tokens,
+            total_tokens=prompt_tokens + output_tokens,
+            requests=1,
+        ))
+
+    @staticmethod
+    async def _emit(pieces: list[str], first: float, gap: float) -> AsyncIterator[str]:
+        await asyncio.sleep(first)
+        for i, piece in enumerate(pieces):
+            if i:
+                await asyncio.sleep(gap)
+            yield piece
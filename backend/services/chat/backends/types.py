@@ -0,0 +1,39 @@
+# backend/services/chat/backends/types.py
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Callable
+from typing import Protocol
+
+from backend.services.chat.prompt import ChatPrompt
+from backend.services.chat.routing import ModelTier
+from backend.services.chat.usage import TokenCounts
+
+# 上游回報 token 用量時呼叫（每次呼叫最多一次；拿不到用量時不呼叫）
+UsageCallback = Callable[[TokenCounts], None]
+
+
+class ChatBackend(Protocol):
+    """
+    產生 chat 回覆的上游介面（CHAT_BACKEND 選擇實作）。
+    排隊、快取、SingleFlight 都在 service 層處理，backend 只負責「送出 prompt、拿回文字」。
+    """
+
+    name: str
+
+    async def generate(
+        self,
+        prompt: ChatPrompt,
+        *,
+        tier: ModelTier,
+        on_usage: UsageCallback | None = None,
+    ) -> str: ...
+
+    async def stream(
+        self,
+        prompt: ChatPrompt,
+        *,
+        tier: ModelTier,
+        on_usage: UsageCallback | None = None,
+    ) -> AsyncIterator[str]:
+        """建立串流（失敗在這裡就拋出），回傳逐段 yield 文字的 async iterator。"""
+        ...
@@ -0,0 +1,20 @@
+# backend/services/chat/cache/__init__.py
+from __future__ import annotations
+
+from .keys import build_cache_key, normalize_prompt
+from .memory import InMemoryResponseCache
+from .provider import get_response_cache, get_semantic_cache
+from .redis_backend import RedisResponseCache
+from .semantic import SemanticCache
+from .types import ResponseCache
+
+__all__ = [
+    "ResponseCache",
+    "InMemoryResponseCache",
+    "RedisResponseCache",
+    "SemanticCache",
+    "build_cache_key",
+    "normalize_prompt",
+    "get_response_cache",
+    "get_semantic_cache",
+]
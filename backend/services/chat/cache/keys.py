@@ -0,0 +1,25 @@
+# backend/services/chat/cache/keys.py
+from __future__ import annotations
+
+import hashlib
+import re
+import unicodedata
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# prompt 格式或正規化規則變動時遞增，讓舊快取自然失效
+CACHE_KEY_VERSION = "v1"
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    NFKC（全形/半形統一）+ 連續空白壓成單一空白 + 去頭尾空白。
+    只做不影響語意的正規化，避免把不同問題算成同一個 key。
+    """
+    text = unicodedata.normalize("NFKC", prompt)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def build_cache_key(prompt: str, *, model: str) -> str:
+    digest = hashlib.sha256(f"{model}\n{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+    return f"chat:{CACHE_KEY_VERSION}:{digest}"
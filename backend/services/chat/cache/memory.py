@@ -0,0 +1,52 @@
+# backend/services/chat/cache/memory.py
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+
+from backend.services.chat.metrics import ChatMetrics
+
+
+class InMemoryResponseCache:
+    """
+    process 內 LRU + TTL 快取（OrderedDict：最近使用的放最後）。
+    只在 event loop 內使用，不需 lock；多 worker 時各自一份。
+    """
+
+    def __init__(self, *, max_entries: int, ttl_seconds: float, metrics: ChatMetrics) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._metrics = metrics
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    async def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._metrics.incr("cache.miss")
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._metrics.incr("cache.expired")
+            self._metrics.incr("cache.miss")
+            return None
+
+        self._entries.move_to_end(key)
+        self._metrics.incr("cache.hit")
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._metrics.incr("cache.eviction")
+
+    async def stats(self) -> dict[str, int | str]:
+        return {
+            "backend": "memory",
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+        }
@@ -0,0 +1,56 @@
+# backend/services/chat/cache/provider.py
+from __future__ import annotations
+
+from functools import lru_cache
+
+from backend.core.settings import get_settings
+from backend.services.chat.cache.memory import InMemoryResponseCache
+from backend.services.chat.cache.semantic import SemanticCache
+from backend.services.chat.cache.types import ResponseCache
+from backend.services.chat.metrics import get_chat_metrics
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> ResponseCache | None:
+    """
+    依 Settings 建立回覆快取（process 級別 singleton）；停用時回傳 None。
+    CHAT_CACHE_BACKEND=memory（預設）或 redis。
+    """
+    settings = get_settings()
+    if not settings.chat_cache_enabled:
+        return None
+
+    if settings.chat_cache_backend == "redis":
+        from redis.asyncio import Redis
+
+        from backend.services.chat.cache.redis_backend import RedisResponseCache
+
+        return RedisResponseCache(
+            Redis.from_url(settings.chat_cache_redis_url),
+            max_entries=settings.chat_cache_max_entries,
+            ttl_seconds=settings.chat_cache_ttl_seconds,
+            metrics=get_chat_metrics(),
+        )
+
+    return InMemoryResponseCache(
+        max_entries=settings.chat_cache_max_entries,
+        ttl_seconds=settings.chat_cache_ttl_seconds,
+        metrics=get_chat_metrics(),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticCache | None:
+    """近似問題快取（預設關閉，需 CHAT_SEMANTIC_CACHE_ENABLED=true）。"""
+    settings = get_settings()
+    if not settings.chat_semantic_cache_enabled:
+        return None
+
+    return SemanticCache(
+        capacity=settings.chat_semantic_cache_capacity,
+        dim=settings.chat_embedding_dim,
+        threshold=settings.chat_semantic_cache_threshold,
+        ttl_seconds=settings.chat_cache_ttl_seconds,
+        dtype=settings.chat_semantic_cache_dtype,
+        metrics=get_chat_metrics(),
+    )
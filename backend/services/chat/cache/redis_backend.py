@@ -0,0 +1,89 @@
+# backend/services/chat/cache/redis_backend.py
+from __future__ import annotations
+
+import time
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from backend.services.chat.metrics import ChatMetrics
+
+
+class RedisResponseCache:
+    """
+    Redis 協定的回覆快取（多 worker / 多台共用）。
+
+    - 每筆回覆：SET key value EX ttl（過期交給 Redis）
+    - 另以一個 sorted set（score = 最後使用時間）記錄 LRU 順序，
+      超過 max_entries 時 ZPOPMIN 淘汰最舊的 key
+    - Redis 異常一律視為 miss / 略過寫入，不讓快取拖垮聊天功能
+
+    client 由外部注入，測試時可換成任何相容 Redis 協定的替身（例如 fakeredis）。
+    """
+
+    def __init__(
+        self,
+        client: Redis,
+        *,
+        max_entries: int,
+        ttl_seconds: float,
+        metrics: ChatMetrics,
+        namespace: str = "pcbuild:",
+    ) -> None:
+        self._client = client
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = max(1, int(ttl_seconds))
+        self._metrics = metrics
+        self._ns = namespace
+        self._lru_key = f"{namespace}chat:lru"
+
+    async def get(self, key: str) -> str | None:
+        full_key = self._ns + key
+        try:
+            raw = await self._client.get(full_key)
+            if raw is not None:
+                await self._client.zadd(self._lru_key, {full_key: time.time()})
+        except RedisError:
+            self._metrics.incr("cache.error")
+            self._metrics.incr("cache.miss")
+            return None
+
+        if raw is None:
+            self._metrics.incr("cache.miss")
+            return None
+
+        self._metrics.incr("cache.hit")
+        return raw.decode("utf-8") if isinstance(raw, bytes) else str(raw)
+
+    async def set(self, key: str, value: str) -> None:
+        full_key = self._ns + key
+        now = time.time()
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.set(full_key, value.encode("utf-8"), ex=self.ttl_seconds)
+                pipe.zadd(self._lru_key, {full_key: now})
+                # 已被 Redis 依 TTL 清掉的 key 也從 LRU 索引移除
+                pipe.zremrangebyscore(self._lru_key, "-inf", now - self.ttl_seconds)
+                pipe.zcard(self._lru_key)
+                *_, size = await pipe.execute()
+
+            overflow = int(size) - self.max_entries
+            if overflow > 0:
+                popped = await self._client.zpopmin(self._lru_key, overflow)
+                victims = [member for member, _score in popped]
+                if victims:
+                    await self._client.delete(*victims)
+                    self._metrics.incr("cache.eviction", len(victims))
+        except RedisError:
+            self._metrics.incr("cache.error")
+
+    async def stats(self) -> dict[str, int | str]:
+        try:
+            size = int(await self._client.zcard(self._lru_key))
+        except RedisError:
+            size = -1
+        return {
+            "backend": "redis",
+            "size": size,
+            "max_entries": self.max_entries,
+        }
@@ -0,0 +1,103 @@
+# backend/services/chat/cache/semantic.py
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+from backend.services.chat.metrics import ChatMetrics
+
+
+class SemanticCache:
+    """
+    近似問題快取：以 NumPy 矩陣保存最近問題的 embedding，查詢時一次算整批 cosine similarity。
+
+    - 向量預先 L2 正規化，cosine = 內積；儲存可選 float32（查詢最快）或 float16（記憶體減半）
+    - 容量固定（預先配置 capacity × dim），滿了以 LRU 淘汰最久未命中的列
+    - 每列附 TTL，過期的列在查詢時直接遮掉
+    - 每列附 partition（例如模型分級）：只比對同一 partition 的列，不同模型的回覆不會互相命中
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int,
+        dim: int,
+        threshold: float,
+        ttl_seconds: float,
+        metrics: ChatMetrics,
+        dtype: str = "float32",
+    ) -> None:
+        self.capacity = max(1, capacity)
+        self.dim = dim
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._metrics = metrics
+
+        self._vectors = np.zeros((self.capacity, dim), dtype=np.dtype(dtype))
+        self._expires_at = np.zeros(self.capacity, dtype=np.float64)
+        self._last_used = np.zeros(self.capacity, dtype=np.int64)
+        self._partitions = np.zeros(self.capacity, dtype=np.int32)
+        self._partition_ids: dict[str, int] = {}
+        self._replies: list[str | None] = [None] * self.capacity
+        self._size = 0
+        self._tick = 0
+
+    def _partition_id(self, partition: str) -> int:
+        return self._partition_ids.setdefault(partition, len(self._partition_ids))
+
+    def lookup_many(self, queries: np.ndarray, *, partition: str = "") -> list[str | None]:
+        """queries: shape (k, dim) 且已正規化；回傳每個查詢在同一 partition 中最相似且超過門檻的回覆。"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if self._size == 0:
+            self._metrics.incr("semantic_cache.miss", len(queries))
+            return [None] * len(queries)
+
+        n = self._size
+        # (n, dim) @ (dim, k) → (n, k)；float16 先升成 float32 再算，避免精度與 BLAS 效能問題
+        sims = self._vectors[:n].astype(np.float32, copy=False) @ queries.T
+        sims[self._expires_at[:n] <= time.monotonic()] = -np.inf
+        sims[self._partitions[:n] != self._partition_id(partition)] = -np.inf
+
+        best_rows = np.argmax(sims, axis=0)
+        best_scores = sims[best_rows, np.arange(len(queries))]
+
+        results: list[str | None] = []
+        for row, score in zip(best_rows.tolist(), best_scores.tolist()):
+            if score >= self.threshold:
+                self._tick += 1
+                self._last_used[row] = self._tick
+                self._metrics.incr("semantic_cache.hit")
+                results.append(self._replies[row])
+            else:
+                self._metrics.incr("semantic_cache.miss")
+                results.append(None)
+        return results
+
+    def lookup(self, query: np.ndarray, *, partition: str = "") -> str | None:
+        return self.lookup_many(query, partition=partition)[0]
+
+    def add(self, vector: np.ndarray, reply: str, *, partition: str = "") -> None:
+        if self._size < self.capacity:
+            row = self._size
+            self._size += 1
+        else:
+            # 優先重用已過期的列，否則淘汰最久未使用的列
+            expired = np.flatnonzero(self._expires_at <= time.monotonic())
+            row = int(expired[0]) if len(expired) else int(np.argmin(self._last_used))
+            self._metrics.incr("semantic_cache.eviction")
+
+        self._tick += 1
+        self._vectors[row] = np.asarray(vector, dtype=np.float32).reshape(-1)
+        self._expires_at[row] = time.monotonic() + self.ttl_seconds
+        self._last_used[row] = self._tick
+        self._partitions[row] = self._partition_id(partition)
+        self._replies[row] = reply
+
+    def stats(self) -> dict[str, int | str]:
+        return {
+            "size": self._size,
+            "capacity": self.capacity,
+            "dtype": str(self._vectors.dtype),
+            "bytes": int(self._vectors.nbytes),
+        }
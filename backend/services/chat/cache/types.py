@@ -0,0 +1,14 @@
+# backend/services/chat/cache/types.py
+from __future__ import annotations
+
+from typing import Protocol
+
+
+class ResponseCache(Protocol):
+    """chat 回覆快取介面：key 由 build_cache_key 產生，value 為完整回覆文字。"""
+
+    async def get(self, key: str) -> str | None: ...
+
+    async def set(self, key: str, value: str) -> None: ...
+
+    async def stats(self) -> dict[str, int | str]: ...
@@ -2,6 +2,7 @@
 from functools import lru_cache
 
 from google import genai
+from google.genai.client import AsyncClient
 
 from backend.core.settings import get_settings
 
@@ -16,3 +17,12 @@ def get_genai_client() -> genai.Client:
     if api_key:
         return genai.Client(api_key=api_key)
     return genai.Client()
+
+
+def get_async_genai_client() -> AsyncClient:
+    """
+    取得非同步 Gemini client（client.aio）。
+    與同步 client 共用同一個底層 genai.Client（同一組連線設定與 API key），
+    讓 async route 直接 await，不佔用 AnyIO threadpool。
+    """
+    return get_genai_client().aio
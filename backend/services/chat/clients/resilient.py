@@ -0,0 +1,330 @@
+# backend/services/chat/clients/resilient.py
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+import httpx
+from google.genai import errors as genai_errors
+from google.genai.client import AsyncClient
+
+from backend.core.settings import get_settings
+from backend.services.chat.clients.genai_client import get_async_genai_client
+from backend.services.chat.metrics import get_chat_metrics
+
+# 視為暫時性（可重試、計入斷路器）的 HTTP 狀態碼
+_RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class UpstreamUnavailableError(Exception):
+    """
+    上游（Gemini）暫時無法使用：斷路器開啟中，或重試後仍逾時 / 失敗。
+    介面與 ChatOverloadedError 相同（status_code / retry_after），route 以同一方式回 503。
+    """
+
+    def __init__(self, message: str = "AI 服務暫時無法使用，請稍後再試。", *, retry_after: int = 1):
+        super().__init__(message)
+        self.status_code = 503
+        self.retry_after = retry_after
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """只有「請求沒有被上游處理完成」的暫時性失敗才重試；4xx（參數錯誤、快取 handle 失效）直接往外拋。"""
+    if isinstance(exc, asyncio.TimeoutError):
+        return True
+    if isinstance(exc, genai_errors.APIError):
+        return exc.code in _RETRYABLE_STATUS
+    return isinstance(exc, (httpx.TransportError, ConnectionError))
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    timeout_seconds: float
+    max_retries: int
+    backoff_base_seconds: float
+    backoff_max_seconds: float
+
+    def backoff(self, attempt: int) -> float:
+        # full jitter：0 ~ min(max, base * 2^attempt)，避免大量請求同時重試
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    連續 failure_threshold 次暫時性失敗後開啟，recovery_seconds 內直接拒絕（不打上游）；
+    之後進入半開，只放一個試探請求，成功就關閉、失敗就重新開啟。
+    event loop 單執行緒使用，不需額外 lock。
+    """
+
+    def __init__(self, *, failure_threshold: int, recovery_seconds: float) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_seconds = recovery_seconds
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.recovery_seconds:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return
+
+        get_chat_metrics().incr("upstream.breaker_rejected")
+        remaining = self.recovery_seconds - (time.monotonic() - (self._opened_at or 0.0))
+        raise UpstreamUnavailableError(retry_after=max(1, math.ceil(remaining)))
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def release_probe(self) -> None:
+        """半開試探沒有得到結論（呼叫端取消、非上游錯誤）時歸還名額，讓下一個請求再試。"""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probing or self._failures >= self.failure_threshold:
+            if self._opened_at is None or self._probing:
+                get_chat_metrics().incr("upstream.breaker_opened")
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+    def stats(self) -> dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self._failures}
+
+
+class LatencyTracker:
+    """最近 window 次成功呼叫的延遲，用來算 hedge 的觸發時間（p95）。"""
+
+    _MIN_SAMPLES = 20
+
+    def __init__(self, window: int = 200) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def p95(self) -> float | None:
+        if len(self._samples) < self._MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class ResilientModels:
+    """
+    client.aio.models 的包裝，介面相同（generate_content / generate_content_stream），
+    額外提供 per-call deadline、帶 jitter 的有限重試、可選的 hedged request 與斷路器。
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], AsyncClient],
+        *,
+        policy: RetryPolicy,
+        breaker: CircuitBreaker,
+        hedge_enabled: bool,
+        hedge_min_seconds: float,
+    ) -> None:
+        self._client_factory = client_factory
+        self.policy = policy
+        self.breaker = breaker
+        self.hedge_enabled = hedge_enabled
+        self.hedge_min_seconds = hedge_min_seconds
+        self.latencies = LatencyTracker()
+
+    async def generate_content(self, **kwargs: Any) -> Any:
+        async def attempt() -> Any:
+            return await self._client_factory().models.generate_content(**kwargs)
+
+        return await self._call(attempt, hedge=self.hedge_enabled)
+
+    async def generate_content_stream(self, **kwargs: Any) -> AsyncIterator[Any]:
+        """
+        重試 / deadline 只套用在建立串流（尚未吐出任何內容前）；
+        之後每個 chunk 之間最多等 timeout_seconds，超過視為上游卡住。串流不做 hedge。
+        """
+        async def attempt() -> Any:
+            return await self._client_factory().models.generate_content_stream(**kwargs)
+
+        stream = await self._call(attempt, hedge=False, record_success=False)
+        return self._guard_stream(stream)
+
+    # ===== 內部 =====
+
+    async def _call(
+        self,
+        attempt: Callable[[], Awaitable[Any]],
+        *,
+        hedge: bool,
+        record_success: bool = True,
+    ) -> Any:
+        self.breaker.before_call()
+        try:
+            return await self._attempt_with_retries(attempt, hedge=hedge, record_success=record_success)
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
+
+    async def _attempt_with_retries(
+        self,
+        attempt: Callable[[], Awaitable[Any]],
+        *,
+        hedge: bool,
+        record_success: bool,
+    ) -> Any:
+        metrics = get_chat_metrics()
+        deadline = time.monotonic() + self.policy.timeout_seconds
+
+        for retry in range(self.policy.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            started = time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                if hedge:
+                    result = await asyncio.wait_for(self._hedged(attempt), timeout=remaining)
+                else:
+                    result = await asyncio.wait_for(attempt(), timeout=remaining)
+            except Exception as exc:
+                if not is_retryable(exc):
+                    # 4xx 代表上游有回應但這次呼叫沒有完成：不計失敗，也不能當成試探成功而關閉斷路器
+                    self.breaker.release_probe()
+                    raise
+
+                is_last = retry >= self.policy.max_retries
+                delay = self.policy.backoff(retry)
+                if is_last or time.monotonic() + delay >= deadline:
+                    self.breaker.record_failure()
+                    metrics.incr("upstream.failed")
+                    raise UpstreamUnavailableError() from exc
+
+                metrics.incr("upstream.retry")
+                await asyncio.sleep(delay)
+                continue
+
+            self.latencies.observe(time.monotonic() - started)
+            if record_success:
+                self.breaker.record_success()
+            return result
+
+        raise AssertionError("unreachable")
+
+    async def _hedged(self, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        第一個請求超過 p95 延遲仍未完成時再送一個，取先成功者、取消另一個。
+        樣本不足時不 hedge（避免冷啟動時把所有請求都送兩次）。
+        """
+        p95 = self.latencies.p95()
+        if p95 is None:
+            return await attempt()
+
+        tasks = [asyncio.ensure_future(attempt())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=max(self.hedge_min_seconds, p95))
+            if done:
+                return tasks[0].result()
+
+            get_chat_metrics().incr("upstream.hedged")
+            tasks.append(asyncio.ensure_future(attempt()))
+            pending = set(tasks)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            get_chat_metrics().incr("upstream.hedge_won")
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            # 輸掉的（或呼叫端被取消時仍在跑的）請求一律取消
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _guard_stream(self, stream: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        iterator = stream.__aiter__()
+        failed = False
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), timeout=self.policy.timeout_seconds)
+                except StopAsyncIteration:
+                    # 只有完整讀完的串流才算成功
+                    self.breaker.record_success()
+                    break
+                except Exception as exc:
+                    if not is_retryable(exc):
+                        raise
+                    failed = True
+                    self.breaker.record_failure()
+                    get_chat_metrics().incr("upstream.failed")
+                    raise UpstreamUnavailableError() from exc
+                yield chunk
+        finally:
+            # 呼叫端中途放棄（client 斷線）或非暫時性錯誤：不算失敗也不算成功，只歸還半開的試探名額
+            if not failed:
+                self.breaker.release_probe()
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+
+class ResilientGenAIClient:
+    """client.aio 的替代品：models 走 ResilientModels，其餘（caches 等）直接轉給原本的 client。"""
+
+    def __init__(self, client_factory: Callable[[], AsyncClient], models: ResilientModels) -> None:
+        self._client_factory = client_factory
+        self.models = models
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client_factory(), name)
+
+    def stats(self) -> dict[str, Any]:
+        p95 = self.models.latencies.p95()
+        return {
+            **self.models.breaker.stats(),
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_resilient_genai_client() -> ResilientGenAIClient:
+    settings = get_settings()
+    models = ResilientModels(
+        lambda: get_async_genai_client(),
+        policy=RetryPolicy(
+            timeout_seconds=settings.chat_upstream_timeout_seconds,
+            max_retries=settings.chat_upstream_max_retries,
+            backoff_base_seconds=settings.chat_upstream_backoff_base_seconds,
+            backoff_max_seconds=settings.chat_upstream_backoff_max_seconds,
+        ),
+        breaker=CircuitBreaker(
+            failure_threshold=settings.chat_breaker_failure_threshold,
+            recovery_seconds=settings.chat_breaker_recovery_seconds,
+        ),
+        hedge_enabled=settings.chat_upstream_hedge_enabled,
+        hedge_min_seconds=settings.chat_upstream_hedge_min_seconds,
+    )
+    return ResilientGenAIClient(lambda: get_async_genai_client(), models)
@@ -2,4 +2,19 @@
 
 MODEL_NAME = "gemini-2.5-flash"
 HISTORY_MAX_TURNS = 8
-SYSTEM_PROMPT = "你是電腦組裝顧問，所有回覆一律使用繁體中文。"
\ No newline at end of file
+# ConversationStore 在 prompt 視窗之前多載入的舊訊息數，等待併入滾動摘要（見 summary.py）
+HISTORY_SUMMARY_TURNS = 8
+SYSTEM_PROMPT = "你是電腦組裝顧問，所有回覆一律使用繁體中文。"
+
+# 較舊對話的滾動摘要：用便宜、快速的模型在背景產生
+SUMMARY_MODEL_NAME = "gemini-2.5-flash-lite"
+
+# 模型分級（routing.py 依請求內容挑選）：
+# model、max_output_tokens、thinking_budget（0 = 關閉思考；2.5 Pro 不可關閉，最低 128）
+# 可用 CHAT_MODEL_TIERS（JSON）覆寫個別欄位，例如 {"lite": {"max_output_tokens": 128}}
+MODEL_TIERS = {
+    "lite": {"model": "gemini-2.5-flash-lite", "max_output_tokens": 256, "thinking_budget": 0},
+    "standard": {"model": MODEL_NAME, "max_output_tokens": 2048, "thinking_budget": 512},
+    "pro": {"model": "gemini-2.5-pro", "max_output_tokens": 4096, "thinking_budget": 2048},
+}
+DEFAULT_TIER = "standard"
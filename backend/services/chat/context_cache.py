@@ -0,0 +1,114 @@
+# backend/services/chat/context_cache.py
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from google.genai import types
+
+from backend.core.settings import get_settings
+from backend.services.chat.clients.genai_client import get_async_genai_client
+from backend.services.chat.metrics import get_chat_metrics
+from backend.services.chat.tokens import estimate_tokens
+
+# 到期前多久就視為過期並重新登記，避免拿到「送出時剛好過期」的 handle
+_REFRESH_MARGIN_SECONDS = 60
+# 登記失敗後暫停重試的時間（例如 prefix 未達模型最低 token 數、權限不足）
+_FAILURE_BACKOFF_SECONDS = 300
+
+
+class ContextCacheRegistry:
+    """
+    把穩定前綴（system_instruction）登記成 Gemini explicit cached content，並跨請求重複使用 handle。
+
+    - system_instruction 只含跨對話共用的內容（摘要、參考資料都在 contents），全站共用同一份 handle
+    - key = model + system_instruction 的雜湊；同一前綴在 TTL 內只登記一次
+    - 前綴估算 token 數低於 min_tokens 時不登記（模型有最低長度限制，太短也省不到什麼）
+    - 同一前綴同時多個請求只會送出一次 create（per-key lock）
+    - 任何失敗都回傳 None，呼叫端改走一般 system_instruction
+    """
+
+    def __init__(self, *, ttl_seconds: int, min_tokens: int, max_entries: int = 256) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.max_entries = max_entries
+        # key -> (cached content name 或 None（失敗）, 到期時間)
+        self._handles: OrderedDict[str, tuple[str | None, float]] = OrderedDict()
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def _key(model: str, system_instruction: str) -> str:
+        return hashlib.sha256(f"{model}\x1f{system_instruction}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> tuple[bool, str | None]:
+        entry = self._handles.get(key)
+        if entry is None:
+            return False, None
+        name, expires_at = entry
+        if expires_at - _REFRESH_MARGIN_SECONDS <= time.monotonic():
+            del self._handles[key]
+            return False, None
+        self._handles.move_to_end(key)
+        return True, name
+
+    def _store(self, key: str, name: str | None, lifetime: float) -> None:
+        self._handles[key] = (name, time.monotonic() + lifetime)
+        self._handles.move_to_end(key)
+        while len(self._handles) > self.max_entries:
+            # 淘汰的 handle 交給 TTL 自然過期，不另外呼叫 delete
+            self._handles.popitem(last=False)
+
+    async def resolve(self, *, model: str, system_instruction: str) -> str | None:
+        if estimate_tokens(system_instruction) < self.min_tokens:
+            return None
+
+        metrics = get_chat_metrics()
+        key = self._key(model, system_instruction)
+        found, name = self._lookup(key)
+        if found:
+            if name is not None:
+                metrics.incr("context_cache.hit")
+            return name
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            found, name = self._lookup(key)
+            if found:
+                return name
+
+            try:
+                cached = await get_async_genai_client().caches.create(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        system_instruction=system_instruction,
+                        ttl=f"{self.ttl_seconds}s",
+                    ),
+                )
+            except Exception:
+                metrics.incr("context_cache.error")
+                self._store(key, None, _FAILURE_BACKOFF_SECONDS)
+                return None
+            finally:
+                self._locks.pop(key, None)
+
+            metrics.incr("context_cache.create")
+            self._store(key, cached.name, self.ttl_seconds)
+            return cached.name
+
+    def invalidate(self, *, model: str, system_instruction: str) -> None:
+        """上游回報 handle 失效（被刪除 / 提早過期）時呼叫，下次請求會重新登記。"""
+        self._handles.pop(self._key(model, system_instruction), None)
+
+
+@lru_cache(maxsize=1)
+def get_context_cache_registry() -> ContextCacheRegistry | None:
+    settings = get_settings()
+    if not settings.chat_context_cache_enabled:
+        return None
+    return ContextCacheRegistry(
+        ttl_seconds=settings.chat_context_cache_ttl_seconds,
+        min_tokens=settings.chat_context_cache_min_tokens,
+    )
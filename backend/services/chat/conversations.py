@@ -0,0 +1,200 @@
+# backend/services/chat/conversations.py
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from uuid import UUID
+
+from sqlalchemy import func, update
+
+from backend.core.settings import get_settings
+from backend.db import SessionLocal
+from backend.models import Conversation, Message
+from backend.schemas.chat import Turn
+from backend.services.chat.config import HISTORY_MAX_TURNS, HISTORY_SUMMARY_TURNS
+from backend.services.chat.summary import ConversationWindow
+
+
+class ConversationNotFoundError(Exception):
+    """對話不存在或不屬於目前使用者（對外一律視為 404，不區分兩者）。"""
+
+
+@dataclass
+class _HotConversation:
+    user_id: int
+    turns: deque[Turn]
+    message_ids: deque[int]
+    has_older: bool = False
+    expires_at: float = field(default=0.0)
+
+
+class ConversationStore:
+    """
+    伺服器端對話紀錄：DB（conversations / messages）為準，
+    記憶體只保留每個對話最後 max_turns 則的熱快取（LRU + TTL），
+    讓連續對話不必每次重查 DB，也不必由前端重送 history。
+    max_turns 包含 prompt 視窗之前、等待併入滾動摘要的舊訊息（HISTORY_SUMMARY_TURNS）。
+
+    方法皆為同步（SQLAlchemy sync session），async route 請以 run_in_threadpool 呼叫；
+    每次操作自行開關短命 session，避免在等待 LLM 期間佔住連線池。
+
+    注意：多 worker 時熱快取各自一份，同一對話若輪流落在不同 worker，
+    最多在 TTL 內看到稍舊的紀錄；TTL 過後一律回 DB 重新載入。
+    """
+
+    def __init__(self, *, max_turns: int, max_conversations: int, ttl_seconds: float) -> None:
+        self.max_turns = max(1, max_turns)
+        self.max_conversations = max(1, max_conversations)
+        self.ttl_seconds = ttl_seconds
+        self._hot: OrderedDict[UUID, _HotConversation] = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ===== 熱快取 =====
+
+    def _get_hot(self, conversation_id: UUID) -> _HotConversation | None:
+        with self._lock:
+            entry = self._hot.get(conversation_id)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._hot[conversation_id]
+                return None
+            self._hot.move_to_end(conversation_id)
+            return entry
+
+    def _put_hot(
+        self,
+        conversation_id: UUID,
+        user_id: int,
+        turns: list[Turn],
+        message_ids: list[int],
+        *,
+        has_older: bool,
+    ) -> None:
+        with self._lock:
+            self._hot[conversation_id] = _HotConversation(
+                user_id=user_id,
+                turns=deque(turns, maxlen=self.max_turns),
+                message_ids=deque(message_ids, maxlen=self.max_turns),
+                has_older=has_older or len(turns) > self.max_turns,
+                expires_at=time.monotonic() + self.ttl_seconds,
+            )
+            self._hot.move_to_end(conversation_id)
+            while len(self._hot) > self.max_conversations:
+                self._hot.popitem(last=False)
+
+    def forget(self, conversation_id: UUID) -> None:
+        with self._lock:
+            self._hot.pop(conversation_id, None)
+
+    # ===== 讀寫 =====
+
+    def load_history(self, conversation_id: UUID, *, user_id: int) -> tuple[list[Turn], ConversationWindow]:
+        """
+        取得最後 max_turns 則（舊→新）與它們在對話中的位置（給滾動摘要接續用）；
+        對話不存在或不屬於 user 時拋 ConversationNotFoundError。
+        """
+        entry = self._get_hot(conversation_id)
+        if entry is not None:
+            if entry.user_id != user_id:
+                raise ConversationNotFoundError()
+            with self._lock:
+                window = ConversationWindow(
+                    conversation_id=conversation_id,
+                    message_ids=list(entry.message_ids),
+                    has_older=entry.has_older,
+                )
+                return list(entry.turns), window
+
+        with SessionLocal() as db:
+            conversation = db.get(Conversation, conversation_id)
+            if conversation is None or conversation.user_id != user_id:
+                raise ConversationNotFoundError()
+
+            # 多取一則，用來判斷視窗之前是否還有更舊的訊息
+            rows = (
+                db.query(Message.id, Message.role, Message.content)
+                .filter(Message.conversation_id == conversation_id)
+                .order_by(Message.id.desc())
+                .limit(self.max_turns + 1)
+                .all()
+            )
+
+        has_older = len(rows) > self.max_turns
+        rows = list(reversed(rows[: self.max_turns]))
+        turns = [Turn(role=role, content=content) for _, role, content in rows]
+        message_ids = [message_id for message_id, _, _ in rows]
+        self._put_hot(conversation_id, user_id, turns, message_ids, has_older=has_older)
+        return turns, ConversationWindow(conversation_id=conversation_id, message_ids=message_ids, has_older=has_older)
+
+    def load_turns_between(
+        self,
+        conversation_id: UUID,
+        *,
+        after_id: int | None,
+        before_id: int,
+        limit: int,
+    ) -> list[tuple[int, Turn]]:
+        """
+        滾動摘要補讀用：after_id < id < before_id 之間最新的 limit 則（舊→新）。
+        只在摘要落後到熱快取視窗之外（重啟、其他 worker 處理過）時才會呼叫。
+        """
+        with SessionLocal() as db:
+            query = (
+                db.query(Message.id, Message.role, Message.content)
+                .filter(Message.conversation_id == conversation_id, Message.id < before_id)
+            )
+            if after_id is not None:
+                query = query.filter(Message.id > after_id)
+            rows = query.order_by(Message.id.desc()).limit(limit).all()
+
+        return [(message_id, Turn(role=role, content=content)) for message_id, role, content in reversed(rows)]
+
+    def append_turns(self, conversation_id: UUID, *, user_id: int, turns: list[Turn], create: bool = False) -> None:
+        """
+        追加一輪（或多則）訊息。create=True 時同一個 transaction 內先建立對話，
+        讓「第一句就失敗」的請求不會留下空對話。
+        """
+        with SessionLocal() as db:
+            if create:
+                db.add(Conversation(id=conversation_id, user_id=user_id))
+                db.flush()
+            else:
+                db.execute(
+                    update(Conversation)
+                    .where(Conversation.id == conversation_id)
+                    .values(updated_at=func.now())
+                )
+
+            messages = [Message(conversation_id=conversation_id, role=t.role, content=t.content) for t in turns]
+            db.add_all(messages)
+            db.flush()
+            message_ids = [m.id for m in messages]
+            db.commit()
+
+        with self._lock:
+            entry = self._hot.get(conversation_id)
+            if entry is not None and entry.user_id == user_id:
+                if len(entry.turns) + len(turns) > self.max_turns:
+                    entry.has_older = True
+                entry.turns.extend(turns)
+                entry.message_ids.extend(message_ids)
+                entry.expires_at = time.monotonic() + self.ttl_seconds
+                self._hot.move_to_end(conversation_id)
+                return
+
+        if create:
+            self._put_hot(conversation_id, user_id, turns, message_ids, has_older=False)
+
+
+@lru_cache(maxsize=1)
+def get_conversation_store() -> ConversationStore:
+    settings = get_settings()
+    return ConversationStore(
+        max_turns=HISTORY_MAX_TURNS + HISTORY_SUMMARY_TURNS,
+        max_conversations=settings.chat_conversation_cache_size,
+        ttl_seconds=settings.chat_conversation_cache_ttl_seconds,
+    )
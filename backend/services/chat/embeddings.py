@@ -0,0 +1,85 @@
+# backend/services/chat/embeddings.py
+from __future__ import annotations
+
+import hashlib
+import unicodedata
+from functools import lru_cache
+from typing import Protocol
+
+import numpy as np
+from google.genai import types
+
+from backend.core.settings import get_settings
+from backend.services.chat.clients.genai_client import get_async_genai_client
+from backend.services.knowledge.index import l2_normalize
+
+
+class Embedder(Protocol):
+    """文字 → 向量。回傳 shape = (len(texts), dim) 的 float32 矩陣，每列已 L2 正規化。"""
+
+    dim: int
+
+    async def embed(self, texts: list[str]) -> np.ndarray: ...
+
+
+class HashingEmbedder:
+    """
+    決定性的本地 embedder（不需網路 / API key）：
+    字元 unigram + bigram 做 feature hashing，再 L2 正規化。
+    語意能力有限，主要給測試、離線壓測與本地開發使用。
+    """
+
+    def __init__(self, dim: int = 256) -> None:
+        self.dim = dim
+
+    def _bucket(self, feature: str) -> tuple[int, float]:
+        h = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(h, "little")
+        sign = 1.0 if value & 1 else -1.0
+        return (value >> 1) % self.dim, sign
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        chars = [c for c in unicodedata.normalize("NFKC", text).lower() if not c.isspace()]
+        features = chars + [a + b for a, b in zip(chars, chars[1:])]
+        for feature in features:
+            idx, sign = self._bucket(feature)
+            vec[idx] += sign
+        return vec
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return l2_normalize(np.stack([self._embed_one(t) for t in texts]))
+
+
+class GeminiEmbedder:
+    """透過 Gemini embedding 模型取得向量（client.aio，不佔 threadpool）。"""
+
+    def __init__(self, *, model: str, dim: int) -> None:
+        self.model = model
+        self.dim = dim
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        resp = await get_async_genai_client().models.embed_content(
+            model=self.model,
+            contents=texts,
+            config=types.EmbedContentConfig(
+                task_type="SEMANTIC_SIMILARITY",
+                output_dimensionality=self.dim,
+            ),
+        )
+        vectors = [e.values or [] for e in (resp.embeddings or [])]
+        return l2_normalize(np.asarray(vectors, dtype=np.float32))
+
+
+@lru_cache(maxsize=1)
+def get_embedder() -> Embedder:
+    """依 Settings 選擇 embedder：CHAT_EMBEDDER=gemini（預設）或 hashing。"""
+    settings = get_settings()
+    if settings.chat_embedder == "hashing":
+        return HashingEmbedder(dim=settings.chat_embedding_dim)
+    return GeminiEmbedder(model=settings.chat_embedding_model, dim=settings.chat_embedding_dim)
@@ -0,0 +1,30 @@
+# backend/services/chat/metrics.py
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from functools import lru_cache
+
+
+class ChatMetrics:
+    """
+    process 內的 chat 計數器（快取命中、排隊拒絕等），只用來觀察，不持久化。
+    多個 worker 各自計數；需要彙總時由外部監控分別抓取。
+    """
+
+    def __init__(self) -> None:
+        self._counters: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+
+@lru_cache(maxsize=1)
+def get_chat_metrics() -> ChatMetrics:
+    return ChatMetrics()
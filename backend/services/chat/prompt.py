@@ -1,18 +1,129 @@
 # backend/services/chat/prompt.py
+from dataclasses import dataclass
+
+from google.genai import types
+
+from backend.core.settings import get_settings
 from backend.schemas.chat import Turn
 from backend.services.chat.config import HISTORY_MAX_TURNS, SYSTEM_PROMPT
+from backend.services.chat.summary import ConversationWindow, get_rolling_summarizer
+from backend.services.chat.tokens import get_token_counter
+
+# 每則訊息 / 摘要段落的結構開銷（role、分隔）保守估計 token 數
+_TEMPLATE_OVERHEAD_TOKENS = 64
+
+
+@dataclass(frozen=True)
+class ChatPrompt:
+    """
+    送往 Gemini 的結構化 prompt：
+
+    - system_instruction：所有對話共用的穩定前綴（SYSTEM_PROMPT），走原生 system_instruction，
+      夠長時可登記成 explicit cached content 重複使用
+    - contents：滾動摘要 + 對話紀錄（user / model 交替）+ 本輪使用者訊息；
+      摘要每段對話不同、也會隨對話更新，不放進前綴，避免每段對話各登記一份 cached content
+    """
+    system_instruction: str
+    contents: list[types.Content]
+
+    def cache_text(self) -> str:
+        """決定性的序列化結果，給回覆快取算 key 用。"""
+        lines = [f"system\x1f{self.system_instruction}"]
+        for c in self.contents:
+            text = "".join(p.text or "" for p in (c.parts or []))
+            lines.append(f"{c.role}\x1f{text}")
+        return "\x1e".join(lines)
+
+
+def format_turn(t: Turn) -> str:
+    who = "使用者" if t.role == "user" else "AI"
+    return f"{who}：{t.content}"
+
+
+def _to_content(role: str, text: str) -> types.Content:
+    return types.Content(role=role, parts=[types.Part(text=text)])
 
 
-def build_prompt(message: str, history: list[Turn]) -> str:
-    def format_turn(t: Turn) -> str:
-        who = "使用者" if t.role == "user" else "AI"
-        return f"{who}：{t.content}"
+def format_summary(summary: str) -> str:
+    return f"更早之前的對話摘要：\n{summary}"
 
-    history_txt = "\n".join(format_turn(t) for t in history[-HISTORY_MAX_TURNS:])
 
-    return (
-        f"{SYSTEM_PROMPT}\n\n"
-        f"以下是先前對話紀錄（舊→新，最多{HISTORY_MAX_TURNS}則）：\n{history_txt}\n\n"
-        f"現在的使用者訊息：{message}\n"
-        f"請在理解脈絡後以繁體中文回答。"
+def format_knowledge(snippets: list[str]) -> str:
+    lines = "\n".join(f"- {s}" for s in snippets)
+    return f"參考資料（本站零件資料庫，價格僅供參考；與問題無關時忽略）：\n{lines}"
+
+
+def build_prompt(
+    message: str,
+    history: list[Turn],
+    *,
+    summary: str | None = None,
+    knowledge: list[str] | None = None,
+) -> ChatPrompt:
+    """
+    summary / knowledge 都不放進 system_instruction，讓穩定前綴仍可跨對話重複使用 context cache：
+
+    - summary：滾動摘要，併進最前面那則 user content（第一個 part）；history 以 model 開頭時自成一則
+    - knowledge：檢索到的零件片段，放在本輪使用者訊息前（同一則 user content 的另一個 part）
+    """
+    contents = [_to_content("user" if t.role == "user" else "model", t.content) for t in history]
+    if knowledge:
+        contents.append(types.Content(
+            role="user",
+            parts=[types.Part(text=format_knowledge(knowledge)), types.Part(text=message)],
+        ))
+    else:
+        contents.append(_to_content("user", message))
+    if summary:
+        if contents[0].role == "user":
+            contents[0] = types.Content(
+                role="user",
+                parts=[types.Part(text=format_summary(summary)), *(contents[0].parts or [])],
+            )
+        else:
+            contents.insert(0, _to_content("user", format_summary(summary)))
+    return ChatPrompt(system_instruction=SYSTEM_PROMPT, contents=contents)
+
+
+async def assemble_prompt(
+    message: str,
+    history: list[Turn],
+    *,
+    window: ConversationWindow | None = None,
+    knowledge: list[str] | None = None,
+) -> ChatPrompt:
+    """
+    依 input token 預算組 prompt（取代單純以則數裁切）：
+
+    1. 預算 = CHAT_INPUT_TOKEN_BUDGET − system prompt − 本輪訊息 − 參考資料 − 結構開銷
+    2. 完整訊息最多放最後 HISTORY_MAX_TURNS 則；放得下就全放，放不下則保留摘要預算，由新到舊塞入
+    3. 擠出視窗的舊訊息（含 store 多載入、視窗之前的訊息）交給 RollingSummarizer，
+       換成一段依 (conversation_id, 最後摘要到的訊息 id) 接續的滾動摘要
+    """
+    settings = get_settings()
+    counter = get_token_counter()
+
+    remaining = (
+        settings.chat_input_token_budget
+        - await counter.count(SYSTEM_PROMPT)
+        - await counter.count(message)
+        - (await counter.count(format_knowledge(knowledge)) if knowledge else 0)
+        - _TEMPLATE_OVERHEAD_TOKENS
     )
+
+    first = max(0, len(history) - HISTORY_MAX_TURNS)
+    costs = [await counter.count(format_turn(t)) for t in history[first:]]
+    has_older = first > 0 or (window is not None and window.has_older)
+    if not has_older and sum(costs) <= remaining:
+        return build_prompt(message, history, knowledge=knowledge)
+
+    remaining -= settings.chat_summary_token_budget
+    keep_from = len(history)
+    for i in range(len(history) - 1, first - 1, -1):
+        if costs[i - first] > remaining:
+            break
+        remaining -= costs[i - first]
+        keep_from = i
+
+    summary = get_rolling_summarizer().summarize(history[:keep_from], window)
+    return build_prompt(message, history[keep_from:], summary=summary, knowledge=knowledge)
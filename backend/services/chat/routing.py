@@ -0,0 +1,120 @@
+# backend/services/chat/routing.py
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+
+from google.genai import types
+
+from backend.core.settings import get_settings
+from backend.services.chat.config import DEFAULT_TIER, MODEL_TIERS
+from backend.services.chat.metrics import get_chat_metrics
+from backend.services.chat.prompt import ChatPrompt
+from backend.services.chat.tokens import estimate_tokens
+
+# 客套 / 確認類短句：不需要推理，交給最便宜的模型
+_TRIVIAL_RE = re.compile(
+    r"^(謝謝|感謝|多謝|謝啦|3q|thx|thanks?( you)?|好的?|好喔|好唷|ok(ay)?|了解|瞭解|收到|懂了|沒問題|"
+    r"嗨|哈囉|你好|hi|hello|hey|掰掰|再見|bye)[!！。.~～ ]*$",
+    re.IGNORECASE,
+)
+
+# 需要仔細推理的訊號：配單、相容性、效能比較、預算規劃
+_QUALITY_KEYWORDS = (
+    "推薦", "配單", "菜單", "預算", "相容", "比較", "差異", "瓶頸", "超頻", "功耗", "瓦數",
+    "升級", "效能", "散熱", "主機板", "顯卡", "cpu", "gpu", "記憶體", "電源",
+)
+_BUDGET_RE = re.compile(r"\d[\d,]*\s*(元|塊|萬|k|K|千)|預算")
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    name: str
+    model: str
+    max_output_tokens: int
+    thinking_budget: int
+
+    def generation_config(self) -> dict:
+        """給 GenerateContentConfig 的分級參數。"""
+        return {
+            "max_output_tokens": self.max_output_tokens,
+            "thinking_config": types.ThinkingConfig(thinking_budget=self.thinking_budget),
+        }
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    tier: ModelTier
+    reason: str
+
+
+class ModelRouter:
+    """
+    依 prompt 大小與本地啟發式規則（不呼叫任何模型）為每個請求挑模型分級：
+
+    - lite：客套 / 確認類短句，且沒有大量脈絡
+    - pro：品質敏感的請求（配單、相容性、效能比較等關鍵字命中多個，或帶預算的長問題），
+      以及脈絡很長、需要整合大量資訊的請求
+    - 其他：standard
+    """
+
+    def __init__(
+        self,
+        tiers: dict[str, ModelTier],
+        *,
+        default: str = DEFAULT_TIER,
+        trivial_max_chars: int = 16,
+        escalate_prompt_tokens: int = 4000,
+    ) -> None:
+        self.tiers = tiers
+        self.default = default
+        self.trivial_max_chars = trivial_max_chars
+        self.escalate_prompt_tokens = escalate_prompt_tokens
+
+    def _pick(self, name: str) -> ModelTier:
+        # 設定裡拿掉的分級退回預設分級
+        return self.tiers.get(name) or self.tiers[self.default]
+
+    def route(self, message: str, prompt: ChatPrompt) -> RouteDecision:
+        text = unicodedata.normalize("NFKC", message).strip()
+        prompt_tokens = estimate_tokens(prompt.cache_text())
+
+        if prompt_tokens >= self.escalate_prompt_tokens:
+            decision = RouteDecision(self._pick("pro"), "long_context")
+        elif len(text) <= self.trivial_max_chars and _TRIVIAL_RE.match(text):
+            decision = RouteDecision(self._pick("lite"), "trivial")
+        else:
+            lowered = text.lower()
+            hits = sum(1 for kw in _QUALITY_KEYWORDS if kw in lowered)
+            if hits >= 3 or (hits >= 1 and _BUDGET_RE.search(text) and len(text) >= 40):
+                decision = RouteDecision(self._pick("pro"), "quality")
+            else:
+                decision = RouteDecision(self._pick(self.default), "default")
+
+        metrics = get_chat_metrics()
+        metrics.incr(f"route.tier.{decision.tier.name}")
+        metrics.incr(f"route.reason.{decision.reason}")
+        return decision
+
+
+def load_tiers(overrides: dict[str, dict] | None = None) -> dict[str, ModelTier]:
+    tiers: dict[str, ModelTier] = {}
+    for name, spec in MODEL_TIERS.items():
+        merged = {**spec, **(overrides or {}).get(name, {})}
+        tiers[name] = ModelTier(name=name, **merged)
+    for name, spec in (overrides or {}).items():
+        if name not in tiers:
+            tiers[name] = ModelTier(name=name, **spec)
+    return tiers
+
+
+@lru_cache(maxsize=1)
+def get_model_router() -> ModelRouter:
+    settings = get_settings()
+    tiers = load_tiers(settings.chat_model_tiers)
+    if not settings.chat_routing_enabled:
+        # 關閉分級時所有請求都走預設分級（等同原本固定 MODEL_NAME）
+        tiers = {name: tiers[DEFAULT_TIER] for name in tiers}
+    return ModelRouter(tiers, escalate_prompt_tokens=settings.chat_routing_escalate_prompt_tokens)
@@ -0,0 +1,190 @@
+# backend/services/chat/scheduler.py
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Hashable
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from backend.core.settings import get_settings
+
+
+class ChatOverloadedError(Exception):
+    """
+    排隊已滿（或等待逾時）時拋出。
+    - status_code：503（全域滿載）或 429（單一使用者排太多）
+    - retry_after：依目前排隊長度與平均處理時間估算的建議等待秒數
+    """
+
+    def __init__(self, message: str, *, status_code: int, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class ChatSlot:
+    """已取得的執行名額；release() 可重複呼叫，只有第一次生效。"""
+
+    def __init__(self, scheduler: ChatScheduler) -> None:
+        self._scheduler = scheduler
+        self._started_at = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._scheduler._release(time.monotonic() - self._started_at)
+
+
+class ChatScheduler:
+    """
+    單一 process 內的 Gemini 呼叫准入控制（event loop 單執行緒使用，不需額外 lock）。
+
+    - 同時執行數上限：max_concurrency
+    - 等待佇列總長上限：max_queue；單一使用者上限：max_queue_per_user
+    - 名額釋出時依使用者輪流（round-robin）交給下一位，避免單一使用者洗版佔滿佇列
+    """
+
+    # 平均處理時間的 EWMA 權重與初始值（秒），用於估算 Retry-After
+    _EWMA_ALPHA = 0.2
+    _INITIAL_SERVICE_SECONDS = 8.0
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int,
+        max_queue: int,
+        max_queue_per_user: int,
+        queue_timeout_seconds: float,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.max_queue_per_user = max(0, max_queue_per_user)
+        self.queue_timeout_seconds = queue_timeout_seconds
+
+        self._active = 0
+        self._queued = 0
+        # user_key -> 該使用者的等待者（FIFO）；OrderedDict 的順序即輪替順序
+        self._waiters: OrderedDict[Hashable, deque[asyncio.Future[None]]] = OrderedDict()
+        self._avg_service_seconds = self._INITIAL_SERVICE_SECONDS
+
+    # ===== 對外介面 =====
+
+    async def acquire(self, user_key: Hashable) -> ChatSlot:
+        """取得執行名額；佇列已滿時立即拋出 ChatOverloadedError（不排隊）。"""
+        if self._active < self.max_concurrency and self._queued == 0:
+            self._active += 1
+            return ChatSlot(self)
+
+        if self._queued >= self.max_queue:
+            raise ChatOverloadedError(
+                "目前使用人數較多，請稍後再試。",
+                status_code=503,
+                retry_after=self._estimate_wait_seconds(self._queued + 1),
+            )
+
+        user_queue = self._waiters.get(user_key)
+        if user_queue is not None and len(user_queue) >= self.max_queue_per_user:
+            raise ChatOverloadedError(
+                "你的請求仍在處理中，請稍後再送出。",
+                status_code=429,
+                retry_after=self._estimate_wait_seconds(self._queued + 1),
+            )
+
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        if user_queue is None:
+            user_queue = self._waiters[user_key] = deque()
+        user_queue.append(fut)
+        self._queued += 1
+
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout=self.queue_timeout_seconds)
+        except (asyncio.CancelledError, asyncio.TimeoutError) as exc:
+            if fut.done() and not fut.cancelled():
+                # 名額已經轉交給我們，但呼叫端不要了：直接還回去
+                self._release(None)
+            else:
+                fut.cancel()
+                self._discard_waiter(user_key, fut)
+
+            if isinstance(exc, asyncio.TimeoutError):
+                raise ChatOverloadedError(
+                    "目前使用人數較多，請稍後再試。",
+                    status_code=503,
+                    retry_after=self._estimate_wait_seconds(self._queued + 1),
+                ) from None
+            raise
+
+        return ChatSlot(self)
+
+    @asynccontextmanager
+    async def slot(self, user_key: Hashable) -> AsyncIterator[None]:
+        slot = await self.acquire(user_key)
+        try:
+            yield
+        finally:
+            slot.release()
+
+    def stats(self) -> dict[str, float | int]:
+        return {
+            "active": self._active,
+            "queued": self._queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "avg_service_seconds": round(self._avg_service_seconds, 3),
+        }
+
+    # ===== 內部 =====
+
+    def _release(self, service_seconds: float | None) -> None:
+        if service_seconds is not None:
+            self._avg_service_seconds += self._EWMA_ALPHA * (service_seconds - self._avg_service_seconds)
+
+        # 有人在等：名額直接轉交（_active 不變）；否則歸還
+        while self._waiters:
+            user_key, user_queue = next(iter(self._waiters.items()))
+            fut = user_queue.popleft()
+            self._queued -= 1
+
+            if user_queue:
+                self._waiters.move_to_end(user_key)  # 輪到下一位使用者
+            else:
+                del self._waiters[user_key]
+
+            if not fut.done():
+                fut.set_result(None)
+                return
+
+        self._active -= 1
+
+    def _discard_waiter(self, user_key: Hashable, fut: asyncio.Future[None]) -> None:
+        user_queue = self._waiters.get(user_key)
+        if user_queue is None:
+            return
+        try:
+            user_queue.remove(fut)
+        except ValueError:
+            return
+        self._queued -= 1
+        if not user_queue:
+            del self._waiters[user_key]
+
+    def _estimate_wait_seconds(self, position: int) -> int:
+        # 前面有 position 個請求，每 max_concurrency 個一批，每批約平均處理時間
+        batches = math.ceil(position / self.max_concurrency)
+        return max(1, int(math.ceil(batches * self._avg_service_seconds)))
+
+
+@lru_cache(maxsize=1)
+def get_chat_scheduler() -> ChatScheduler:
+    settings = get_settings()
+    return ChatScheduler(
+        max_concurrency=settings.chat_max_concurrency,
+        max_queue=settings.chat_max_queue,
+        max_queue_per_user=settings.chat_max_queue_per_user,
+        queue_timeout_seconds=settings.chat_queue_timeout_seconds,
+    )
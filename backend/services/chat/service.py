@@ -1,18 +1,307 @@
 # backend/services/chat/service.py
+from collections.abc import AsyncGenerator, AsyncIterator, Hashable
+from dataclasses import dataclass
+from functools import partial
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+
+from backend.core.settings import get_settings
 from backend.schemas.chat import Turn
-from backend.services.chat.config import MODEL_NAME
-from backend.services.chat.clients.genai_client import get_genai_client
-from backend.services.chat.prompt import build_prompt
+from backend.services.builds import PROFILES, format_build_facts, get_build_optimizer, parse_build_request
+from backend.services.chat.backends import get_chat_backend
+from backend.services.chat.backends.types import UsageCallback
+from backend.services.chat.cache import build_cache_key, get_response_cache, get_semantic_cache
+from backend.services.chat.embeddings import get_embedder
+from backend.services.chat.metrics import get_chat_metrics
+from backend.services.chat.prompt import ChatPrompt, assemble_prompt
+from backend.services.chat.routing import ModelTier, get_model_router
+from backend.services.chat.scheduler import ChatSlot, get_chat_scheduler
+from backend.services.chat.singleflight import get_single_flight
+from backend.services.chat.summary import ConversationWindow
+from backend.services.chat.usage import get_usage_meter
+from backend.services.compat import CompatResult, get_compat_engine
+from backend.services.knowledge import get_knowledge_index, retrieve_snippets
+
+
+@dataclass
+class _CacheProbe:
+    """一次請求查快取時算出的 key / embedding（與近似快取的 partition），未命中時留給寫回快取使用。"""
+    cache_key: str
+    embedding: np.ndarray | None = None
+    partition: str = ""
+
+
+async def _embed_message(message: str, history: list[Turn]) -> np.ndarray | None:
+    """
+    近似問題快取（只用於第一句）與零件知識檢索共用同一次 query embedding；兩者都用不到時不呼叫。
+    """
+    if get_knowledge_index() is None and (get_semantic_cache() is None or history):
+        return None
+    try:
+        return (await get_embedder().embed([message]))[0]
+    except Exception:
+        # embedding 失敗只代表這次不用近似快取 / 知識檢索，不影響正常回覆
+        get_chat_metrics().incr("embedding.error")
+        return None
+
+
+def _check_compat(message: str) -> CompatResult:
+    """規則式相容性判斷：有把握時直接給回覆（不查快取、不計額度、不呼叫模型），否則回傳可附進 prompt 的事實。"""
+    engine = get_compat_engine()
+    if engine is None:
+        return CompatResult()
+
+    result = engine.evaluate(message)
+    if result.reply is not None:
+        get_chat_metrics().incr("compat.answered")
+    elif result.facts:
+        get_chat_metrics().incr("compat.facts")
+    return result
+
+
+async def _build_facts(message: str) -> list[str]:
+    """訊息提到整機預算時，先在零件快照上算出前幾名相容配置（數毫秒的 NumPy 運算，放進 threadpool）。"""
+    top_k = get_settings().chat_build_context_top_k
+    request = parse_build_request(message) if top_k > 0 else None
+    if request is None:
+        return []
+
+    builds = await run_in_threadpool(
+        get_build_optimizer().optimize,
+        request.budget,
+        PROFILES[request.profile],
+        k=top_k,
+    )
+    get_chat_metrics().incr("builds.context" if builds else "builds.empty")
+    return format_build_facts(request, builds)
+
+
+async def _prepare_prompt(
+    message: str,
+    history: list[Turn],
+    *,
+    window: ConversationWindow | None,
+    facts: list[str],
+) -> tuple[ChatPrompt, np.ndarray | None, bool]:
+    """
+    檢索相關零件片段（有索引時）並依 token 預算組出 prompt；
+    回傳 prompt、query embedding，以及 prompt 是否附了驗證過的事實。
+    facts（相容性規則驗證過的事實）與預算配單結果排在檢索片段之前。
+    """
+    embedding = await _embed_message(message, history)
+    verified = [*facts, *await _build_facts(message)]
+    knowledge = [f"已驗證：{fact}" for fact in verified]
+    if embedding is not None and get_knowledge_index() is not None:
+        snippets = retrieve_snippets(embedding)
+        get_chat_metrics().incr("knowledge.hit" if snippets else "knowledge.miss")
+        knowledge.extend(snippets)
+    prompt = await assemble_prompt(message=message, history=history, window=window, knowledge=knowledge)
+    return prompt, embedding, bool(verified)
+
+
+async def _probe_caches(
+    history: list[Turn],
+    prompt: ChatPrompt,
+    *,
+    embedding: np.ndarray | None,
+    tier: ModelTier,
+    verified: bool,
+    bypass_cache: bool,
+) -> tuple[str | None, _CacheProbe]:
+    """
+    依序查 exact-match 快取與近似問題快取。
+    近似快取只用於沒有對話紀錄、也沒有附驗證事實的第一句，並依模型分級分開：
+    有脈絡時「相似的問題」不代表答案可以共用；相容性事實 / 預算配單取決於問題裡的型號與金額，
+    「3萬怎麼配」與「5萬怎麼配」的 embedding 很接近，答案卻不同。
+    """
+    probe = _CacheProbe(cache_key=build_cache_key(prompt.cache_text(), model=tier.model), partition=tier.name)
+
+    cache = get_response_cache()
+    if cache is not None and not bypass_cache:
+        cached = await cache.get(probe.cache_key)
+        if cached is not None:
+            return cached, probe
+
+    semantic = get_semantic_cache()
+    if semantic is not None and not history and not verified and embedding is not None:
+        probe.embedding = embedding
+        if not bypass_cache:
+            cached = semantic.lookup(embedding, partition=probe.partition)
+            if cached is not None:
+                return cached, probe
+
+    return None, probe
+
+
+async def _store_caches(probe: _CacheProbe, reply_text: str) -> None:
+    if not reply_text:
+        return
+
+    cache = get_response_cache()
+    if cache is not None:
+        await cache.set(probe.cache_key, reply_text)
+
+    semantic = get_semantic_cache()
+    if semantic is not None and probe.embedding is not None:
+        semantic.add(probe.embedding, reply_text, partition=probe.partition)
 
 
-def generate_chat_reply(message: str, history: list[Turn]) -> str:
-    client = get_genai_client()
-    prompt = build_prompt(message=message, history=history)
+async def generate_chat_reply(
+    message: str,
+    history: list[Turn],
+    *,
+    user_key: Hashable,
+    window: ConversationWindow | None = None,
+    bypass_cache: bool = False,
+) -> str:
+    """
+    透過 ChatBackend（CHAT_BACKEND：Gemini / 本地 stub / cassette）產生回覆。
+    等待上游回應期間只佔用一個 coroutine，不會吃掉 sync route 共用的 threadpool。
 
-    resp = client.models.generate_content(
-        model=MODEL_NAME,
-        contents=prompt,
+    - 先試規則式相容性判斷（CompatEngine）：機械式的相容 / 電源問題直接回答，否則把驗證過的事實附進 prompt
+    - 訊息提到整機預算時，附上以零件資料庫算出的候選配置（BuildOptimizer）
+    - 有零件知識索引時，檢索相關片段放進 prompt（與近似快取共用一次 embedding）
+    - 再查回覆快取（exact match，再來是近似問題）；命中就不佔排隊名額
+    - 未命中才向 ChatScheduler 取得名額（可能拋 ChatOverloadedError）
+    - 同一 prompt 的並行請求合併成一次上游呼叫（SingleFlight），所有等待者拿到同一個結果或例外；
+      名額以第一位請求者（leader）的 user_key 取得
+    - 模型分級由 ModelRouter 依 prompt 決定（回覆快取 key 也包含所選模型）
+    - 未命中快取時先檢查使用者的 token 額度（可能拋 ChatQuotaExceededError），
+      上游回報的用量記在實際發出呼叫的 leader 名下；快取命中 / 合併到別人的呼叫不計量
+    """
+    compat = _check_compat(message)
+    if compat.reply is not None:
+        return compat.reply
+
+    prompt, embedding, verified = await _prepare_prompt(message, history, window=window, facts=compat.facts)
+    tier = get_model_router().route(message, prompt).tier
+    cached, probe = await _probe_caches(
+        history,
+        prompt,
+        embedding=embedding,
+        tier=tier,
+        verified=verified,
+        bypass_cache=bypass_cache,
+    )
+    if cached is not None:
+        return cached
+
+    meter = get_usage_meter()
+    await meter.check_quota(user_key)
+
+    async def call_upstream() -> str:
+        async with get_chat_scheduler().slot(user_key):
+            reply_text = await get_chat_backend().generate(
+                prompt,
+                tier=tier,
+                on_usage=partial(meter.record, user_key),
+            )
+
+        await _store_caches(probe, reply_text)
+        return reply_text
+
+    flights = get_single_flight()
+    if flights is None:
+        return await call_upstream()
+    return await flights.do(probe.cache_key, call_upstream)
+
+
+async def stream_chat_reply(
+    message: str,
+    history: list[Turn],
+    *,
+    user_key: Hashable,
+    window: ConversationWindow | None = None,
+    bypass_cache: bool = False,
+) -> AsyncIterator[str]:
+    """
+    串流版本：先取得 ChatScheduler 名額（滿載時在這裡就拋 ChatOverloadedError，
+    讓 route 仍能回 503/429），再回傳逐段 yield 文字的 async iterator。
+    名額在串流結束（或中斷）時釋放；呼叫端負責組回完整回覆。
+    相容性快速路徑或快取命中時直接一次吐出完整回覆，不佔名額。
+    同一 prompt 已有進行中的（非串流）上游呼叫時直接加入，等結果出來再一次吐出
+    （在回傳 iterator 前等待，leader 的 ChatOverloadedError 等例外仍由 route 照常處理）。
+    """
+    compat = _check_compat(message)
+    if compat.reply is not None:
+        return _replay_cached(compat.reply)
+
+    prompt, embedding, verified = await _prepare_prompt(message, history, window=window, facts=compat.facts)
+    tier = get_model_router().route(message, prompt).tier
+    cached, probe = await _probe_caches(
+        history,
+        prompt,
+        embedding=embedding,
+        tier=tier,
+        verified=verified,
+        bypass_cache=bypass_cache,
+    )
+    if cached is not None:
+        return _replay_cached(cached)
+
+    meter = get_usage_meter()
+    await meter.check_quota(user_key)
+
+    flights = get_single_flight()
+    if flights is not None and flights.in_flight(probe.cache_key):
+        return _replay_cached(await flights.join(probe.cache_key))
+
+    slot = await get_chat_scheduler().acquire(user_key)
+    return _SlotStream(
+        slot,
+        _stream_upstream(slot, prompt=prompt, tier=tier, probe=probe, on_usage=partial(meter.record, user_key)),
     )
 
-    reply_text = (getattr(resp, "text", None) or "").strip()
-    return reply_text
+
+async def _replay_cached(reply_text: str) -> AsyncIterator[str]:
+    yield reply_text
+
+
+class _SlotStream:
+    """
+    包住 _stream_upstream 的 async iterator：aclose() 一定會釋放名額。
+
+    async generator 尚未開始迭代就被 aclose() 時不會執行自己的 finally，
+    若呼叫端在第一次 __anext__ 前就放棄（例如 client 斷線），名額會永遠佔住。
+    """
+
+    def __init__(self, slot: ChatSlot, chunks: AsyncGenerator[str, None]) -> None:
+        self._slot = slot
+        self._chunks = chunks
+
+    def __aiter__(self) -> "_SlotStream":
+        return self
+
+    async def __anext__(self) -> str:
+        return await self._chunks.__anext__()
+
+    async def aclose(self) -> None:
+        try:
+            await self._chunks.aclose()
+        finally:
+            self._slot.release()
+
+
+async def _stream_upstream(
+    slot: ChatSlot,
+    *,
+    prompt: ChatPrompt,
+    tier: ModelTier,
+    probe: _CacheProbe,
+    on_usage: UsageCallback,
+) -> AsyncGenerator[str, None]:
+    parts: list[str] = []
+    try:
+        chunks = await get_chat_backend().stream(prompt, tier=tier, on_usage=on_usage)
+        try:
+            async for text in chunks:
+                parts.append(text)
+                yield text
+        finally:
+            await chunks.aclose()
+    finally:
+        slot.release()
+
+    # 只有完整跑完的串流才寫入快取（中斷 / 失敗的半截回覆不存）
+    await _store_caches(probe, "".join(parts).strip())
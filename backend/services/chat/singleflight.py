@@ -0,0 +1,85 @@
+# backend/services/chat/singleflight.py
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from backend.core.settings import get_settings
+from backend.services.chat.metrics import get_chat_metrics
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Task[Any]
+    waiters: int = 0
+
+
+class SingleFlight:
+    """
+    合併同一 key 的並行呼叫（event loop 單執行緒使用，不需額外 lock）：
+    第一個呼叫者（leader）建立實際執行的 task，之後同 key 的呼叫者只等待同一個結果或例外。
+
+    - task 以 asyncio.shield 等待：任何一位等待者被取消（例如 client 斷線）都不會取消共用的呼叫
+    - 以參考計數追蹤等待者；全部等待者都離開時才取消 task，避免沒人要的上游呼叫繼續跑
+    - task 結束後立即移除 key，之後的呼叫會重新執行（結果的重複使用交給回覆快取）
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, _Flight] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._flights
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        metrics = get_chat_metrics()
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(task=asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda t, k=key: self._finish(k, t))
+            metrics.incr("singleflight.leader")
+        else:
+            # 合併成功 = 省下一次上游呼叫
+            metrics.incr("singleflight.shared")
+
+        return await self._wait(flight)
+
+    async def join(self, key: Hashable) -> Any:
+        """只加入既有的呼叫（不存在時拋 KeyError）。"""
+        flight = self._flights[key]
+        get_chat_metrics().incr("singleflight.shared")
+        return await self._wait(flight)
+
+    async def _wait(self, flight: _Flight) -> Any:
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                get_chat_metrics().incr("singleflight.abandoned")
+
+    def _finish(self, key: Hashable, task: asyncio.Task[Any]) -> None:
+        flight = self._flights.get(key)
+        if flight is not None and flight.task is task:
+            del self._flights[key]
+        # 等待者都已離開時例外沒人取走，這裡讀一次避免 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": len(self._flights),
+            "waiters": sum(f.waiters for f in self._flights.values()),
+        }
+
+
+@lru_cache(maxsize=1)
+def get_single_flight() -> SingleFlight | None:
+    if not get_settings().chat_singleflight_enabled:
+        return None
+    return SingleFlight()
@@ -0,0 +1,255 @@
+# backend/services/chat/summary.py
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import lru_cache
+from uuid import UUID
+
+from fastapi.concurrency import run_in_threadpool
+from google.genai import types
+
+from backend.core.settings import get_settings
+from backend.schemas.chat import Turn
+from backend.services.chat.config import HISTORY_SUMMARY_TURNS, SUMMARY_MODEL_NAME
+from backend.services.chat.metrics import get_chat_metrics
+from backend.services.chat.tokens import estimate_tokens
+
+# 摘要暫代版本中，每則舊訊息最多保留的字數
+_INTERIM_LINE_CHARS = 60
+
+# 摘要落後太多（重啟、其他 worker 處理過）時，最多向 store 補讀的舊訊息數；更早的內容直接放棄
+_MAX_BACKFILL_TURNS = 40
+
+# (conversation_id, after_id, before_id) → 這段區間內的 (message_id, Turn)，舊→新
+OlderTurnsLoader = Callable[[UUID, int | None, int], list[tuple[int, Turn]]]
+
+
+@dataclass(frozen=True)
+class ConversationWindow:
+    """
+    ConversationStore.load_history 載入的這段 history 在整段對話中的位置。
+    滾動摘要以 (conversation_id, 最後摘要到的訊息 id) 接續，不再依賴 history 內容的前綴。
+    """
+    conversation_id: UUID
+    message_ids: list[int]  # 與 history 逐則對應（舊→新）
+    has_older: bool = False  # message_ids[0] 之前還有更舊的訊息（沒有載入）
+
+
+@dataclass(frozen=True)
+class _RollingSummary:
+    last_id: int  # 已併入 text 的最後一則訊息 id（含）
+    text: str
+
+
+@dataclass
+class _RefreshJob:
+    conversation_id: UUID
+    base: _RollingSummary | None
+    turns: list[tuple[int, Turn]] = field(default_factory=list)
+    # 需要向 store 補讀 (base.last_id, load_before) 之間的訊息時設定
+    load_before: int | None = None
+
+
+def _who(t: Turn) -> str:
+    return "使用者" if t.role == "user" else "AI"
+
+
+class RollingSummarizer:
+    """
+    被擠出 prompt 的舊訊息 → 每段對話一份滾動摘要，以 (conversation_id, 最後摘要到的訊息 id) 為 key。
+
+    - ConversationStore 在 prompt 視窗（HISTORY_MAX_TURNS）之前多載入一段舊訊息，
+      摘要只需處理「last_id 之後、被擠出視窗」的訊息，不會因視窗滑動而整段重算
+    - 尚未併入的訊息少於 refresh_turns 則時，直接以「既有摘要 + 節錄」回覆，不呼叫模型；
+      累積夠多（或摘要落後到視窗之外）才在背景以便宜模型濃縮，供之後的請求使用
+      → 摘要永遠不在請求的關鍵路徑上，也不會每輪都多一次模型呼叫
+    - 前端自帶 history（沒有 conversation_id 的舊版相容路徑）沒有穩定的訊息 id，只用節錄暫代
+    """
+
+    def __init__(
+        self,
+        *,
+        max_summary_tokens: int,
+        max_entries: int,
+        max_background: int,
+        refresh_turns: int,
+        load_older: OlderTurnsLoader | None = None,
+    ) -> None:
+        self.max_summary_tokens = max_summary_tokens
+        self.max_entries = max(1, max_entries)
+        self.refresh_turns = max(1, refresh_turns)
+        self._load_older = load_older
+        self._summaries: OrderedDict[UUID, _RollingSummary] = OrderedDict()
+        self._pending: dict[UUID, asyncio.Task[None]] = {}
+        self._max_background = max(1, max_background)
+
+    def summarize(self, dropped: list[Turn], window: ConversationWindow | None) -> str:
+        """dropped = history[:keep_from]（沒放進 prompt 的舊訊息）；window 為 None 表示前端自帶 history。"""
+        metrics = get_chat_metrics()
+        if window is None:
+            if not dropped:
+                return ""
+            metrics.incr("summary.interim")
+            return self._interim("", dropped)
+
+        if not dropped and not window.has_older:
+            return ""
+
+        current = self._get(window.conversation_id)
+        last_id = current.last_id if current is not None else None
+        unsummarized = [
+            (message_id, t)
+            for message_id, t in zip(window.message_ids, dropped)
+            if last_id is None or message_id > last_id
+        ]
+        # 摘要沒接到這次載入的第一則訊息：中間可能有沒載入的訊息，要向 store 補讀
+        behind = window.has_older and (last_id is None or last_id < window.message_ids[0])
+
+        if not unsummarized and not behind:
+            metrics.incr("summary.hit")
+            return current.text
+
+        if behind or len(unsummarized) >= self.refresh_turns:
+            self._schedule_refresh(_RefreshJob(
+                conversation_id=window.conversation_id,
+                base=current,
+                turns=unsummarized,
+                load_before=window.message_ids[0] if behind else None,
+            ))
+        metrics.incr("summary.interim")
+        return self._interim(current.text if current is not None else "", [t for _, t in unsummarized])
+
+    # ===== 內部 =====
+
+    def _get(self, conversation_id: UUID) -> _RollingSummary | None:
+        summary = self._summaries.get(conversation_id)
+        if summary is not None:
+            self._summaries.move_to_end(conversation_id)
+        return summary
+
+    def _put(self, conversation_id: UUID, summary: _RollingSummary) -> None:
+        current = self._summaries.get(conversation_id)
+        if current is not None and current.last_id >= summary.last_id:
+            return  # 較晚開始的 refresh 已經寫入更新的版本
+        self._summaries[conversation_id] = summary
+        self._summaries.move_to_end(conversation_id)
+        while len(self._summaries) > self.max_entries:
+            self._summaries.popitem(last=False)
+
+    def _interim(self, base: str, new_turns: list[Turn]) -> str:
+        # 由新到舊放入節錄，直到用完摘要預算；保留既有摘要在最前面
+        budget = self.max_summary_tokens - estimate_tokens(base)
+        lines: list[str] = []
+        for t in reversed(new_turns):
+            content = t.content.strip().replace("\n", " ")
+            if len(content) > _INTERIM_LINE_CHARS:
+                content = content[:_INTERIM_LINE_CHARS] + "…"
+            line = f"{_who(t)}：{content}"
+            cost = estimate_tokens(line)
+            if cost > budget:
+                break
+            lines.append(line)
+            budget -= cost
+        lines.reverse()
+        return "\n".join(x for x in [base, *lines] if x)
+
+    def _schedule_refresh(self, job: _RefreshJob) -> None:
+        key = job.conversation_id
+        if key in self._pending or len(self._pending) >= self._max_background:
+            return
+        task = asyncio.get_running_loop().create_task(self._refresh(job))
+        self._pending[key] = task
+        task.add_done_callback(lambda _t: self._pending.pop(key, None))
+
+    async def _refresh(self, job: _RefreshJob) -> None:
+        metrics = get_chat_metrics()
+        base_text = job.base.text if job.base is not None else ""
+        turns = list(job.turns)
+        last_id = turns[-1][0] if turns else None
+
+        if job.load_before is not None and self._load_older is not None:
+            try:
+                older = await run_in_threadpool(
+                    self._load_older,
+                    job.conversation_id,
+                    job.base.last_id if job.base is not None else None,
+                    job.load_before,
+                )
+            except Exception:
+                metrics.incr("summary.error")
+                return
+            metrics.incr("summary.backfill")
+            turns = older + turns
+            # 補讀涵蓋了 load_before 之前的所有訊息（超過上限的更早內容視同放棄）
+            last_id = max(last_id or 0, job.load_before - 1)
+
+        if last_id is None:
+            return
+        if not turns:
+            # 中間其實沒有漏掉的訊息，只需要把位置往前推
+            self._put(job.conversation_id, _RollingSummary(last_id=last_id, text=base_text))
+            return
+
+        summary = await self._condense(base_text, [t for _, t in turns])
+        if summary:
+            self._put(job.conversation_id, _RollingSummary(last_id=last_id, text=summary))
+            metrics.incr("summary.refresh")
+
+    async def _condense(self, base: str, new_turns: list[Turn]) -> str:
+        # 與一般回覆走同一個 backend（deadline / 重試 / 斷路器、stub / cassette 壓測）；
+        # backend 依賴 prompt 模組，這裡延後 import 避免循環
+        from backend.services.chat.backends import get_chat_backend
+        from backend.services.chat.prompt import ChatPrompt
+        from backend.services.chat.routing import ModelTier
+
+        transcript = "\n".join(f"{_who(t)}：{t.content}" for t in new_turns)
+        prompt = ChatPrompt(
+            system_instruction=(
+                "請將電腦組裝諮詢的對話濃縮成一段繁體中文摘要，"
+                f"不超過 {self.max_summary_tokens} 字，保留預算、用途、已決定或排除的零件與使用者偏好。"
+            ),
+            contents=[types.Content(
+                role="user",
+                parts=[types.Part(text=f"既有摘要：\n{base or '（無）'}\n\n新增對話：\n{transcript}")],
+            )],
+        )
+        tier = ModelTier(
+            name="summary",
+            model=SUMMARY_MODEL_NAME,
+            max_output_tokens=self.max_summary_tokens * 2,
+            thinking_budget=0,
+        )
+        try:
+            reply = await get_chat_backend().generate(prompt, tier=tier)
+        except Exception:
+            get_chat_metrics().incr("summary.error")
+            return ""
+        return reply.strip()
+
+
+def _load_older_turns(conversation_id: UUID, after_id: int | None, before_id: int) -> list[tuple[int, Turn]]:
+    # conversations 模組會連帶載入 DB 設定，只在真的需要補讀時才 import
+    from backend.services.chat.conversations import get_conversation_store
+
+    return get_conversation_store().load_turns_between(
+        conversation_id,
+        after_id=after_id,
+        before_id=before_id,
+        limit=_MAX_BACKFILL_TURNS,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_rolling_summarizer() -> RollingSummarizer:
+    settings = get_settings()
+    return RollingSummarizer(
+        max_summary_tokens=settings.chat_summary_token_budget,
+        max_entries=settings.chat_conversation_cache_size,
+        max_background=4,
+        # 比 store 多載入的舊訊息數少一輪（2 則），背景濃縮完成前這些訊息仍在記憶體中
+        refresh_turns=max(1, HISTORY_SUMMARY_TURNS - 2),
+        load_older=_load_older_turns,
+    )
@@ -0,0 +1,67 @@
+# backend/services/chat/tokens.py
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+from collections import OrderedDict
+from functools import lru_cache
+
+from backend.core.settings import get_settings
+from backend.services.chat.clients.genai_client import get_async_genai_client
+from backend.services.chat.config import MODEL_NAME
+
+# CJK 統一表意文字、注音、全形標點等：Gemini tokenizer 大致每字約 1 token
+_CJK_RE = re.compile(r"[\u2e80-\u9fff\uf900-\ufaff\uff00-\uffef\u3000-\u303f]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    快速本地估算（不呼叫 API）：CJK 每字算 1 token，其餘字元約 4 字元 1 token。
+    會略為高估，拿來做預算裁切比低估安全。
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    other = len(text) - cjk
+    return cjk + math.ceil(other / 4)
+
+
+class TokenCounter:
+    """
+    token 計數：預設用 estimate_tokens；exact=True 時改呼叫 count_tokens API。
+    exact 結果以文字雜湊做 LRU 快取——同一段對話的舊訊息每輪都會重算，快取後幾乎不再打 API；
+    API 失敗時退回估算值，不讓計數本身影響回覆。
+    """
+
+    def __init__(self, *, exact: bool, model: str = MODEL_NAME, max_cached: int = 4096) -> None:
+        self.exact = exact
+        self.model = model
+        self.max_cached = max_cached
+        self._cache: OrderedDict[str, int] = OrderedDict()
+
+    async def count(self, text: str) -> int:
+        if not self.exact or not text:
+            return estimate_tokens(text)
+
+        key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        try:
+            resp = await get_async_genai_client().models.count_tokens(model=self.model, contents=text)
+            tokens = int(resp.total_tokens or 0)
+        except Exception:
+            return estimate_tokens(text)
+
+        self._cache[key] = tokens
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        return tokens
+
+
+@lru_cache(maxsize=1)
+def get_token_counter() -> TokenCounter:
+    return TokenCounter(exact=get_settings().chat_token_counter == "exact")
@@ -0,0 +1,277 @@
+# backend/services/chat/usage.py
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from functools import lru_cache
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.core.settings import get_settings
+from backend.db import SessionLocal
+from backend.models import TokenUsage
+from backend.services.chat.metrics import get_chat_metrics
+
+
+class ChatQuotaExceededError(Exception):
+    """
+    使用者的每日 / 每月 token 額度已用完。
+    介面與 ChatOverloadedError 相同（status_code / retry_after），route 以同一方式回 429。
+    """
+
+    def __init__(self, message: str, *, retry_after: int):
+        super().__init__(message)
+        self.status_code = 429
+        self.retry_after = retry_after
+
+
+@dataclass
+class TokenCounts:
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    total_tokens: int = 0
+    requests: int = 0
+
+    @classmethod
+    def from_usage_metadata(cls, usage: Any) -> TokenCounts | None:
+        """由 Gemini 回應的 usage_metadata 轉換；沒有用量資訊時回傳 None。"""
+        if usage is None:
+            return None
+        prompt = usage.prompt_token_count or 0
+        output = (usage.candidates_token_count or 0) + (usage.thoughts_token_count or 0)
+        return cls(
+            prompt_tokens=prompt,
+            output_tokens=output,
+            cached_tokens=usage.cached_content_token_count or 0,
+            total_tokens=usage.total_token_count or (prompt + output),
+            requests=1,
+        )
+
+    def add(self, other: TokenCounts) -> None:
+        self.prompt_tokens += other.prompt_tokens
+        self.output_tokens += other.output_tokens
+        self.cached_tokens += other.cached_tokens
+        self.total_tokens += other.total_tokens
+        self.requests += other.requests
+
+
+@dataclass
+class _QuotaCounter:
+    day: date
+    day_total: int
+    month_total: int
+    loaded_at: float
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _seconds_until(moment: datetime) -> int:
+    return max(1, int((moment - datetime.now(timezone.utc)).total_seconds()))
+
+
+class UsageMeter:
+    """
+    token 用量計量與額度檢查（每日以 UTC 切日）：
+
+    - record()：只在記憶體累加 (user_id, day) 的用量，不碰 DB
+    - flush()：把累積的用量以一次 INSERT ... ON CONFLICT DO UPDATE 批次寫入 token_usage
+      （由 lifespan 背景工作定期呼叫，關機時再 flush 一次）；寫入失敗時併回下次再試
+    - check_quota()：使用快取的每位使用者計數（DB 已寫入 + 尚未 flush 的本機用量），
+      record() 同步累加，因此一般請求不需任何 DB 查詢；計數過期（counter_ttl_seconds）才重新載入
+    - 載入計數與 flush 互斥：flush 進行中的那一批無法判斷 DB 查詢是否已經看到，
+      因此載入時先等 flush 結束，查詢期間若又有 flush 開始或結束就重查（不同使用者的載入彼此不互斥）
+
+    多 worker 時各自只看得到自己尚未 flush 的用量，額度屬於軟上限：
+    最多超出「flush 間隔 × worker 數」內其他 worker 的用量。
+    """
+
+    def __init__(
+        self,
+        *,
+        daily_quota: int,
+        monthly_quota: int,
+        counter_ttl_seconds: float,
+    ) -> None:
+        self.daily_quota = daily_quota
+        self.monthly_quota = monthly_quota
+        self.counter_ttl_seconds = counter_ttl_seconds
+
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[int, date], TokenCounts] = {}
+        self._counters: dict[int, _QuotaCounter] = {}
+        # flush 的進行數與完成次數（成功或失敗都算），載入計數時據此判斷 DB 查詢結果是否可信
+        self._flushes_running = 0
+        self._flush_epoch = 0
+        self._flush_done = threading.Condition(self._lock)
+
+    # ===== 記錄 =====
+
+    def record(self, user_id: int, counts: TokenCounts) -> None:
+        day = _today()
+        with self._lock:
+            pending = self._pending.setdefault((user_id, day), TokenCounts())
+            pending.add(counts)
+
+            counter = self._counters.get(user_id)
+            if counter is not None and counter.day == day:
+                counter.day_total += counts.total_tokens
+                counter.month_total += counts.total_tokens
+
+        metrics = get_chat_metrics()
+        metrics.incr("usage.prompt_tokens", counts.prompt_tokens)
+        metrics.incr("usage.output_tokens", counts.output_tokens)
+
+    def flush(self) -> int:
+        """同步（DB I/O）；回傳寫入的列數。"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            self._flushes_running += 1
+
+        rows = [
+            {
+                "user_id": user_id,
+                "day": day,
+                "prompt_tokens": c.prompt_tokens,
+                "output_tokens": c.output_tokens,
+                "cached_tokens": c.cached_tokens,
+                "total_tokens": c.total_tokens,
+                "requests": c.requests,
+            }
+            for (user_id, day), c in batch.items()
+        ]
+        stmt = insert(TokenUsage).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TokenUsage.user_id, TokenUsage.day],
+            set_={
+                "prompt_tokens": TokenUsage.prompt_tokens + stmt.excluded.prompt_tokens,
+                "output_tokens": TokenUsage.output_tokens + stmt.excluded.output_tokens,
+                "cached_tokens": TokenUsage.cached_tokens + stmt.excluded.cached_tokens,
+                "total_tokens": TokenUsage.total_tokens + stmt.excluded.total_tokens,
+                "requests": TokenUsage.requests + stmt.excluded.requests,
+                "updated_at": func.now(),
+            },
+        )
+
+        try:
+            with SessionLocal() as db:
+                db.execute(stmt)
+                db.commit()
+        except Exception:
+            # 併回待寫入，下次 flush 再試（用量不因 DB 暫時失效而遺失）
+            with self._lock:
+                for key, counts in batch.items():
+                    self._pending.setdefault(key, TokenCounts()).add(counts)
+                self._finish_flush()
+            get_chat_metrics().incr("usage.flush_error")
+            raise
+
+        expired_before = time.monotonic() - self.counter_ttl_seconds
+        with self._lock:
+            self._finish_flush()
+            # 順便清掉過期的計數，避免不活躍使用者的計數一直留在記憶體
+            for uid in [uid for uid, c in self._counters.items() if c.loaded_at < expired_before]:
+                del self._counters[uid]
+        get_chat_metrics().incr("usage.flushed_rows", len(rows))
+        return len(rows)
+
+    def _finish_flush(self) -> None:
+        # 呼叫端持有 self._lock
+        self._flushes_running -= 1
+        self._flush_epoch += 1
+        self._flush_done.notify_all()
+
+    # ===== 額度 =====
+
+    async def check_quota(self, user_id: int) -> None:
+        if not self.daily_quota and not self.monthly_quota:
+            return
+
+        counter = self._counters.get(user_id)
+        if (
+            counter is None
+            or counter.day != _today()
+            or time.monotonic() - counter.loaded_at > self.counter_ttl_seconds
+        ):
+            counter = await run_in_threadpool(self._load_counter, user_id)
+
+        now = datetime.now(timezone.utc)
+        if self.daily_quota and counter.day_total >= self.daily_quota:
+            get_chat_metrics().incr("usage.quota_exceeded")
+            tomorrow = datetime.combine(counter.day + timedelta(days=1), dt_time(), tzinfo=timezone.utc)
+            raise ChatQuotaExceededError(
+                "今日的 AI 諮詢額度已用完，請明天再試。",
+                retry_after=_seconds_until(tomorrow),
+            )
+        if self.monthly_quota and counter.month_total >= self.monthly_quota:
+            get_chat_metrics().incr("usage.quota_exceeded")
+            next_month = datetime(now.year + now.month // 12, now.month % 12 + 1, 1, tzinfo=timezone.utc)
+            raise ChatQuotaExceededError(
+                "本月的 AI 諮詢額度已用完，請下個月再試。",
+                retry_after=_seconds_until(next_month),
+            )
+
+    def _load_counter(self, user_id: int) -> _QuotaCounter:
+        day = _today()
+        month_start = day.replace(day=1)
+
+        while True:
+            with self._lock:
+                while self._flushes_running:
+                    self._flush_done.wait()
+                epoch = self._flush_epoch
+
+            with SessionLocal() as db:
+                day_total, month_total = db.execute(
+                    select(
+                        func.coalesce(func.sum(TokenUsage.total_tokens).filter(TokenUsage.day == day), 0),
+                        func.coalesce(func.sum(TokenUsage.total_tokens), 0),
+                    ).where(
+                        TokenUsage.user_id == user_id,
+                        TokenUsage.day >= month_start,
+                    )
+                ).one()
+
+            with self._lock:
+                if self._flushes_running or self._flush_epoch != epoch:
+                    # 查詢期間有一批用量從 _pending 移往 DB，不知道查詢看到了沒有：重查
+                    continue
+                # 加上本機尚未寫入 DB 的用量
+                for (uid, d), counts in self._pending.items():
+                    if uid != user_id or d < month_start:
+                        continue
+                    month_total += counts.total_tokens
+                    if d == day:
+                        day_total += counts.total_tokens
+
+                counter = _QuotaCounter(
+                    day=day,
+                    day_total=int(day_total),
+                    month_total=int(month_total),
+                    loaded_at=time.monotonic(),
+                )
+                self._counters[user_id] = counter
+            return counter
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"pending_rows": len(self._pending), "cached_counters": len(self._counters)}
+
+
+@lru_cache(maxsize=1)
+def get_usage_meter() -> UsageMeter:
+    settings = get_settings()
+    return UsageMeter(
+        daily_quota=settings.chat_daily_token_quota,
+        monthly_quota=settings.chat_monthly_token_quota,
+        counter_ttl_seconds=settings.chat_usage_counter_ttl_seconds,
+    )
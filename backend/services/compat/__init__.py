@@ -0,0 +1,7 @@
+# backend/services/compat/__init__.py
+from .catalog import Mention, PartsCatalog
+from .engine import CompatEngine, CompatResult
+from .provider import get_compat_engine
+from .rules import CompatFact
+
+__all__ = ["CompatEngine", "CompatFact", "CompatResult", "Mention", "PartsCatalog", "get_compat_engine"]
@@ -0,0 +1,117 @@
+# backend/services/compat/catalog.py
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from backend.services.compat.rules import CHIPSETS, MEMORY_TYPES, SOCKETS
+
+_SEPARATORS = re.compile(r"[\s\-_]+")
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def _compact(text: str) -> str:
+    return _SEPARATORS.sub("", _normalize(text))
+
+
+def _alias_pattern(alias: str) -> str:
+    # 「RTX 4070 Ti」也要對到「4070ti」「4070-Ti」：詞之間的分隔字元可有可無
+    words = _SEPARATORS.split(_normalize(alias).strip())
+    return r"[\s\-_]*".join(re.escape(w) for w in words if w)
+
+
+def _name_variants(name: str) -> list[str]:
+    """
+    完整名稱去掉品牌 / 系列前綴的各種寫法，直到第一個含數字的詞為止：
+    「NVIDIA GeForce RTX 4070 Ti SUPER」→「GeForce RTX 4070 Ti SUPER」「RTX 4070 Ti SUPER」「4070 Ti SUPER」
+    """
+    words = _SEPARATORS.split(name.strip())
+    variants = [name]
+    for i, word in enumerate(words):
+        if i:
+            variants.append(" ".join(words[i:]))
+        if any(c.isdigit() for c in word):
+            break
+    return variants
+
+
+@dataclass(frozen=True)
+class Mention:
+    """
+    訊息中提到的一個實體。kind：part / chipset / socket / memory。
+    part 時 values 為可能的零件 id（多於一個代表簡稱有歧義，例如「7600」）。
+    """
+    kind: str
+    values: tuple[str, ...]
+
+    @property
+    def ambiguous(self) -> bool:
+        return len(self.values) > 1
+
+    @property
+    def value(self) -> str:
+        return self.values[0]
+
+
+class PartsCatalog:
+    """
+    記憶體內的零件目錄：id / 類別索引，加上一條把所有型號別名、晶片組、腳位、記憶體世代
+    合成的 regex（長的別名排前面，「4070 Ti SUPER」不會被「4070 Ti」先吃掉），
+    一次掃描就能找出訊息提到的所有實體。
+    """
+
+    def __init__(self, records: Iterable[dict[str, Any]]) -> None:
+        self.by_id: dict[str, dict[str, Any]] = {}
+        self.by_category: dict[str, list[dict[str, Any]]] = defaultdict(list)
+
+        patterns: dict[str, str] = {}
+        targets: dict[str, tuple[str, set[str]]] = {}
+
+        def register(kind: str, value: str, alias: str, pattern: str | None = None) -> None:
+            key = _compact(alias)
+            if not key:
+                return
+            patterns.setdefault(key, pattern or _alias_pattern(alias))
+            targets.setdefault(key, (kind, set()))[1].add(value)
+
+        for record in records:
+            self.by_id[record["id"]] = record
+            self.by_category[record["category"]].append(record)
+            for alias in (*_name_variants(record["name"]), *record.get("aliases", ())):
+                register("part", record["id"], alias)
+
+        for chipset in CHIPSETS:
+            # 「B760M」等 mATX 型號後綴也視為同一晶片組
+            register("chipset", chipset, chipset, pattern=re.escape(chipset.lower()) + "m?")
+            targets[_compact(chipset) + "m"] = targets[_compact(chipset)]
+        for socket in SOCKETS:
+            register("socket", socket, socket)
+        for memory_type in MEMORY_TYPES:
+            register("memory", memory_type, memory_type)
+
+        self._targets = {key: (kind, tuple(sorted(values))) for key, (kind, values) in targets.items()}
+        alternation = "|".join(patterns[key] for key in sorted(patterns, key=len, reverse=True))
+        self._pattern = re.compile(rf"(?<![a-z0-9])(?:{alternation})(?![a-z0-9])")
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def get(self, part_id: str) -> dict[str, Any] | None:
+        return self.by_id.get(part_id)
+
+    def find_mentions(self, text: str) -> list[Mention]:
+        """依出現順序回傳提到的實體（重複提到的只算一次）。"""
+        mentions: list[Mention] = []
+        for match in self._pattern.finditer(_normalize(text)):
+            kind, values = self._targets[_compact(match.group())]
+            mention = Mention(kind=kind, values=values)
+            if mention not in mentions:
+                mentions.append(mention)
+        return mentions
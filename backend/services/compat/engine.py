@@ -0,0 +1,167 @@
+# backend/services/compat/engine.py
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from backend.services.compat import rules
+from backend.services.compat.catalog import Mention, PartsCatalog
+from backend.services.compat.rules import CompatFact
+
+# 「能不能一起用」類的問法
+_COMPAT_INTENT = re.compile(
+    r"能配|可以配|配得|配不|相容|兼容|支援|支持|能用|可以用|能插|可以插|插得|插不|"
+    r"能裝|可以裝|裝得|裝不|放得|放不|塞得|塞不|能搭|可以搭|搭得|通用|夠嗎|夠不夠|夠用|"
+    r"(?:可以|能|行)嗎"
+)
+# 「要多大電源」類的問法
+_PSU_INTENT = re.compile(r"幾瓦|多少瓦|瓦數|多大的?電源|電源.{0,6}(?:夠|多大|多少|幾)")
+# 出現這些字眼代表還有開放式問題（推薦、比較、怎麼挑），不適合只回相容性結論
+_OPEN_QUESTION = re.compile(r"推薦|怎麼|如何|哪[個款張支顆家]|比較|還是|另外|順便|還想")
+
+# 超過這個長度的訊息通常還夾帶其他問題，不直接代答，只把驗證過的事實附進 prompt
+_FAST_PATH_MAX_CHARS = 60
+
+
+@dataclass(frozen=True)
+class CompatResult:
+    """
+    reply：有把握時的完整回覆（不必呼叫模型）；None 代表交給模型回答。
+    facts：已驗證的事實（reply 為 None 時附進 prompt，讓模型不必憑記憶回答規格）。
+    """
+    reply: str | None = None
+    facts: list[str] = field(default_factory=list)
+
+
+@dataclass
+class _Entities:
+    parts: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+    chipsets: list[str] = field(default_factory=list)
+    sockets: list[str] = field(default_factory=list)
+    memory_types: list[str] = field(default_factory=list)
+
+    def one(self, category: str) -> dict[str, Any] | None:
+        items = self.parts.get(category, [])
+        return items[0] if len(items) == 1 else None
+
+
+class CompatEngine:
+    """
+    規則式相容性判斷（腳位 / 晶片組、記憶體世代、電源瓦數、機殼空間）。
+
+    evaluate() 只做字串比對與查表（微秒級，不碰 DB、不呼叫模型）：
+    訊息明確是相容性 / 電源問題、提到的每個實體都能唯一對應且都被規則涵蓋時直接產生回覆；
+    否則回傳能驗證的事實，由模型整合進回答。
+    """
+
+    def __init__(self, catalog: PartsCatalog) -> None:
+        self.catalog = catalog
+
+    def evaluate(self, message: str) -> CompatResult:
+        mentions = self.catalog.find_mentions(message)
+        if not mentions:
+            return CompatResult()
+
+        entities = self._collect([m for m in mentions if not m.ambiguous])
+        psu_intent = bool(_PSU_INTENT.search(message))
+        facts, covered = self._facts(entities, psu_intent=psu_intent)
+        if not facts:
+            return CompatResult()
+
+        confident = (
+            (psu_intent or bool(_COMPAT_INTENT.search(message)))
+            and len(message) <= _FAST_PATH_MAX_CHARS
+            and not _OPEN_QUESTION.search(message)
+            and not any(m.ambiguous for m in mentions)
+            and all(len(items) == 1 for items in entities.parts.values())
+            and covered >= len(mentions)
+        )
+        texts = [f.text for f in facts]
+        return CompatResult(reply=self._compose(facts) if confident else None, facts=texts)
+
+    # ===== 內部 =====
+
+    def _collect(self, mentions: list[Mention]) -> _Entities:
+        entities = _Entities()
+        for mention in mentions:
+            if mention.kind == "part":
+                record = self.catalog.get(mention.value)
+                entities.parts.setdefault(record["category"], []).append(record)
+            elif mention.kind == "chipset":
+                entities.chipsets.append(mention.value)
+            elif mention.kind == "socket":
+                entities.sockets.append(mention.value)
+            elif mention.kind == "memory":
+                entities.memory_types.append(mention.value)
+        return entities
+
+    @staticmethod
+    def _facts(entities: _Entities, *, psu_intent: bool) -> tuple[list[CompatFact], int]:
+        """回傳事實，以及有被至少一條規則用到的實體數（用來判斷是否每個提到的東西都有答案）。"""
+        facts: list[CompatFact] = []
+        used: set[tuple[str, str]] = set()
+
+        def add(result: CompatFact | list[CompatFact], *keys: tuple[str, str]) -> None:
+            facts.extend(result if isinstance(result, list) else [result])
+            used.update(keys)
+
+        def key(record: dict[str, Any]) -> tuple[str, str]:
+            return ("part", record["id"])
+
+        parts = entities.parts
+        cpus, boards, gpus = parts.get("cpu", []), parts.get("motherboard", []), parts.get("gpu", [])
+        psus, rams, cases = parts.get("psu", []), parts.get("ram", []), parts.get("case", [])
+        memory_types = [(("memory", m), m) for m in entities.memory_types]
+        memory_types += [(key(ram), ram["specs"]["memory_type"]) for ram in rams]
+
+        for cpu in cpus:
+            for board in boards:
+                add(rules.cpu_board(cpu, board), key(cpu), key(board))
+            for chipset in entities.chipsets:
+                add(rules.cpu_chipset(cpu, chipset), key(cpu), ("chipset", chipset))
+            for socket in entities.sockets:
+                add(rules.cpu_socket(cpu, socket), key(cpu), ("socket", socket))
+            if not boards:
+                for mem_key, memory_type in memory_types:
+                    add(rules.cpu_memory(cpu, memory_type), key(cpu), mem_key)
+
+        for board in boards:
+            for mem_key, memory_type in memory_types:
+                add(rules.board_memory(board, memory_type), key(board), mem_key)
+            for case in cases:
+                add(rules.board_case(board, case), key(board), key(case))
+
+        for chipset in entities.chipsets:
+            for mem_key, memory_type in memory_types:
+                add(rules.chipset_memory(chipset, memory_type), ("chipset", chipset), mem_key)
+
+        cpu = cpus[0] if len(cpus) == 1 else None
+        for gpu in gpus:
+            cpu_keys = [key(cpu)] if cpu is not None else []
+            for psu in psus:
+                add(rules.gpu_psu(gpu, psu, cpu=cpu), key(gpu), key(psu), *cpu_keys)
+            if psu_intent and not psus:
+                add(rules.psu_recommendation(gpu, cpu=cpu), key(gpu), *cpu_keys)
+            for case in cases:
+                add(rules.gpu_case(gpu, case), key(gpu), key(case))
+
+        for psu in psus:
+            for case in cases:
+                add(rules.psu_case(psu, case), key(psu), key(case))
+
+        return facts, len(used)
+
+    @staticmethod
+    def _compose(facts: list[CompatFact]) -> str:
+        verdicts = [f.ok for f in facts if f.ok is not None]
+        lines = [f"- {f.text}" for f in facts]
+        if not verdicts:
+            head = ""
+        elif all(verdicts):
+            head = "可以，相容。"
+        else:
+            head = "不相容，請參考以下說明。"
+        body = "\n".join(lines) if len(lines) > 1 or head else facts[0].text
+        footer = "（依本站零件資料庫的規格自動判斷；實際尺寸與版本請以廠商規格頁為準）"
+        return "\n\n".join(x for x in (head, body, footer) if x)
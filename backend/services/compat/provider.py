@@ -0,0 +1,26 @@
+# backend/services/compat/provider.py
+from __future__ import annotations
+
+from functools import lru_cache
+
+from backend.core.settings import get_settings
+from backend.services.compat.catalog import PartsCatalog
+from backend.services.compat.engine import CompatEngine
+from backend.services.parts import current_parts
+
+
+def get_compat_engine() -> CompatEngine | None:
+    """
+    相容性快速路徑；CHAT_COMPAT_ENABLED=false 時回傳 None。
+    零件來自 parts 表的記憶體快照，快照版本變了才重建別名索引。
+    """
+    if not get_settings().chat_compat_enabled:
+        return None
+    version, _ = current_parts()
+    return _engine_for(version)
+
+
+@lru_cache(maxsize=1)
+def _engine_for(version: int) -> CompatEngine:
+    _, records = current_parts()
+    return CompatEngine(PartsCatalog(records))
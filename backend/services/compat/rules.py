@@ -0,0 +1,185 @@
+# backend/services/compat/rules.py
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any
+
+# 晶片組 → 腳位、支援的記憶體世代、是否支援 CPU 超頻
+# Intel 600/700 系列同一晶片組有 DDR4 / DDR5 兩種主機板，實際以主機板型號為準
+CHIPSETS: dict[str, dict[str, Any]] = {
+    "H610": {"socket": "LGA1700", "memory_types": ["DDR4", "DDR5"], "cpu_oc": False},
+    "B660": {"socket": "LGA1700", "memory_types": ["DDR4", "DDR5"], "cpu_oc": False},
+    "H670": {"socket": "LGA1700", "memory_types": ["DDR4", "DDR5"], "cpu_oc": False},
+    "Z690": {"socket": "LGA1700", "memory_types": ["DDR4", "DDR5"], "cpu_oc": True},
+    "B760": {"socket": "LGA1700", "memory_types": ["DDR4", "DDR5"], "cpu_oc": False},
+    "H770": {"socket": "LGA1700", "memory_types": ["DDR4", "DDR5"], "cpu_oc": False},
+    "Z790": {"socket": "LGA1700", "memory_types": ["DDR4", "DDR5"], "cpu_oc": True},
+    "H810": {"socket": "LGA1851", "memory_types": ["DDR5"], "cpu_oc": False},
+    "B860": {"socket": "LGA1851", "memory_types": ["DDR5"], "cpu_oc": False},
+    "Z890": {"socket": "LGA1851", "memory_types": ["DDR5"], "cpu_oc": True},
+    "A520": {"socket": "AM4", "memory_types": ["DDR4"], "cpu_oc": False},
+    "B450": {"socket": "AM4", "memory_types": ["DDR4"], "cpu_oc": True},
+    "B550": {"socket": "AM4", "memory_types": ["DDR4"], "cpu_oc": True},
+    "X570": {"socket": "AM4", "memory_types": ["DDR4"], "cpu_oc": True},
+    "A620": {"socket": "AM5", "memory_types": ["DDR5"], "cpu_oc": False},
+    "B650": {"socket": "AM5", "memory_types": ["DDR5"], "cpu_oc": True},
+    "B650E": {"socket": "AM5", "memory_types": ["DDR5"], "cpu_oc": True},
+    "X670": {"socket": "AM5", "memory_types": ["DDR5"], "cpu_oc": True},
+    "X670E": {"socket": "AM5", "memory_types": ["DDR5"], "cpu_oc": True},
+    "B850": {"socket": "AM5", "memory_types": ["DDR5"], "cpu_oc": True},
+    "X870": {"socket": "AM5", "memory_types": ["DDR5"], "cpu_oc": True},
+    "X870E": {"socket": "AM5", "memory_types": ["DDR5"], "cpu_oc": True},
+}
+
+SOCKETS = ("LGA1700", "LGA1851", "AM4", "AM5")
+MEMORY_TYPES = ("DDR4", "DDR5")
+
+# 主機板、記憶體、SSD、風扇等其餘零件的保守估計功耗
+REST_OF_SYSTEM_W = 100
+# 估計滿載功耗之外保留的餘裕（轉換效率甜蜜點約在 50~80% 負載）
+PSU_HEADROOM = 1.3
+
+
+@dataclass(frozen=True)
+class CompatFact:
+    """
+    一條已驗證的事實。ok：True 相容 / False 不相容 / None 純資訊（例如建議瓦數）。
+    text 為可直接給使用者看的一句話。
+    """
+    ok: bool | None
+    text: str
+
+
+def _is_unlocked(cpu: dict) -> bool:
+    # Intel K / KF、AMD 全系列（Ryzen 皆未鎖倍頻）
+    name = cpu["name"]
+    return name.startswith("AMD") or name.rstrip("F").endswith("K")
+
+
+def cpu_socket(cpu: dict, socket: str) -> CompatFact:
+    actual = cpu["specs"]["socket"]
+    if actual == socket:
+        return CompatFact(True, f"{cpu['name']} 使用 {actual} 腳位，與 {socket} 相同。")
+    return CompatFact(False, f"{cpu['name']} 使用 {actual} 腳位，無法安裝在 {socket} 主機板上。")
+
+
+def cpu_chipset(cpu: dict, chipset: str) -> list[CompatFact]:
+    info = CHIPSETS[chipset]
+    actual = cpu["specs"]["socket"]
+    if actual != info["socket"]:
+        return [CompatFact(
+            False,
+            f"{cpu['name']} 是 {actual} 腳位，{chipset} 晶片組主機板是 {info['socket']}，腳位不同無法安裝。",
+        )]
+
+    facts = [CompatFact(True, f"{cpu['name']} 與 {chipset} 晶片組主機板同為 {actual} 腳位，可以直接使用。")]
+    if _is_unlocked(cpu) and not info["cpu_oc"]:
+        facts.append(CompatFact(
+            None,
+            f"{chipset} 不支援 CPU 超頻，{cpu['name']} 的超頻功能無法使用（一般使用不受影響）。",
+        ))
+    return facts
+
+
+def cpu_board(cpu: dict, board: dict) -> list[CompatFact]:
+    socket = board["specs"]["socket"]
+    if cpu["specs"]["socket"] != socket:
+        return [CompatFact(
+            False,
+            f"{cpu['name']} 是 {cpu['specs']['socket']} 腳位，{board['name']} 是 {socket}，腳位不同無法安裝。",
+        )]
+
+    facts = cpu_chipset(cpu, board["specs"]["chipset"])
+    facts[0] = CompatFact(True, f"{cpu['name']} 與 {board['name']} 同為 {socket} 腳位，可以直接使用。")
+    memory_type = board["specs"]["memory_type"]
+    if memory_type not in cpu["specs"]["memory_types"]:
+        facts.append(cpu_memory(cpu, memory_type))
+    return facts
+
+
+def cpu_memory(cpu: dict, memory_type: str) -> CompatFact:
+    supported = cpu["specs"]["memory_types"]
+    if memory_type in supported:
+        return CompatFact(True, f"{cpu['name']} 支援 {memory_type} 記憶體（支援：{'/'.join(supported)}）。")
+    return CompatFact(False, f"{cpu['name']} 只支援 {'/'.join(supported)}，不能使用 {memory_type}。")
+
+
+def board_memory(board: dict, memory_type: str) -> CompatFact:
+    actual = board["specs"]["memory_type"]
+    if actual == memory_type:
+        return CompatFact(True, f"{board['name']} 使用 {actual} 記憶體。")
+    return CompatFact(False, f"{board['name']} 只能插 {actual}，不能使用 {memory_type}（插槽不同，無法混用）。")
+
+
+def chipset_memory(chipset: str, memory_type: str) -> CompatFact:
+    supported = CHIPSETS[chipset]["memory_types"]
+    if memory_type not in supported:
+        return CompatFact(False, f"{chipset} 晶片組主機板只支援 {'/'.join(supported)}，不能使用 {memory_type}。")
+    if len(supported) > 1:
+        return CompatFact(
+            None,
+            f"{chipset} 主機板有 DDR4 與 DDR5 兩種版本，要用 {memory_type} 必須選對應版本"
+            f"（DDR4 版型號通常標示 D4），兩者插槽不同無法混用。",
+        )
+    return CompatFact(True, f"{chipset} 晶片組主機板使用 {memory_type} 記憶體。")
+
+
+def gpu_psu(gpu: dict, psu: dict, *, cpu: dict | None = None) -> CompatFact:
+    needed = recommended_psu_watts(gpu, cpu=cpu)
+    wattage = psu["specs"]["wattage_w"]
+    basis = f"搭配 {cpu['name']} " if cpu is not None else ""
+    if wattage >= needed:
+        return CompatFact(True, f"{psu['name']}（{wattage}W）足夠{basis}{gpu['name']} 使用（建議 {needed}W 以上）。")
+    return CompatFact(False, f"{psu['name']}（{wattage}W）不足，{basis}{gpu['name']} 建議使用 {needed}W 以上電源。")
+
+
+def recommended_psu_watts(gpu: dict, *, cpu: dict | None = None) -> int:
+    """
+    沒有 CPU 資訊時採用顯卡原廠建議值（已假設搭配一般桌機 CPU）；
+    有 CPU 時以 CPU 最大功耗 + 顯卡 TDP + 其餘零件估算，再加 30% 餘裕並取 50W 級距，兩者取大。
+    """
+    vendor = gpu["specs"]["recommended_psu_w"]
+    if cpu is None:
+        return vendor
+    load = cpu["specs"]["max_power_w"] + gpu["specs"]["tdp_w"] + REST_OF_SYSTEM_W
+    return max(vendor, int(math.ceil(load * PSU_HEADROOM / 50) * 50))
+
+
+def psu_recommendation(gpu: dict, *, cpu: dict | None = None) -> CompatFact:
+    needed = recommended_psu_watts(gpu, cpu=cpu)
+    if cpu is None:
+        return CompatFact(
+            None,
+            f"{gpu['name']}（TDP {gpu['specs']['tdp_w']}W）原廠建議使用 {needed}W 以上電源；"
+            f"若搭配高功耗處理器（i7 / i9、Ryzen 9）建議再多留 100~150W。",
+        )
+    load = cpu["specs"]["max_power_w"] + gpu["specs"]["tdp_w"] + REST_OF_SYSTEM_W
+    return CompatFact(
+        None,
+        f"{cpu['name']}（最大 {cpu['specs']['max_power_w']}W）+ {gpu['name']}（TDP {gpu['specs']['tdp_w']}W）"
+        f"整機滿載約 {load}W，建議使用 {needed}W 以上電源。",
+    )
+
+
+def gpu_case(gpu: dict, case: dict) -> CompatFact:
+    length, limit = gpu["specs"]["length_mm"], case["specs"]["max_gpu_length_mm"]
+    if length <= limit:
+        return CompatFact(True, f"{gpu['name']}（參考長度 {length}mm）可放進 {case['name']}（顯卡限長 {limit}mm）。")
+    return CompatFact(False, f"{gpu['name']}（參考長度 {length}mm）超過 {case['name']} 的顯卡限長 {limit}mm，放不下。")
+
+
+def board_case(board: dict, case: dict) -> CompatFact:
+    form_factor = board["specs"]["form_factor"]
+    supported = case["specs"]["motherboard_form_factors"]
+    if form_factor in supported:
+        return CompatFact(True, f"{case['name']} 支援 {form_factor} 主機板（{board['name']}）。")
+    return CompatFact(False, f"{case['name']} 只支援 {'/'.join(supported)} 主機板，放不下 {form_factor} 的 {board['name']}。")
+
+
+def psu_case(psu: dict, case: dict) -> CompatFact:
+    psu_ff, case_ff = psu["specs"]["form_factor"], case["specs"]["psu_form_factor"]
+    if psu_ff == case_ff or (psu_ff == "SFX" and case_ff == "ATX"):
+        note = "（SFX 裝在 ATX 位置需轉接架）" if psu_ff != case_ff else ""
+        return CompatFact(True, f"{psu['name']}（{psu_ff}）可裝進 {case['name']}{note}。")
+    return CompatFact(False, f"{case['name']} 只能裝 {case_ff} 電源，{psu['name']} 是 {psu_ff} 規格裝不下。")
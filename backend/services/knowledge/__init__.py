@@ -0,0 +1,5 @@
+# backend/services/knowledge/__init__.py
+from .index import KnowledgeHit, KnowledgeIndex, write_index
+from .provider import get_knowledge_index, retrieve_snippets
+
+__all__ = ["KnowledgeHit", "KnowledgeIndex", "get_knowledge_index", "retrieve_snippets", "write_index"]
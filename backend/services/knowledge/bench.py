@@ -0,0 +1,91 @@
+# backend/services/knowledge/bench.py
+"""
+量測知識索引的查詢延遲與 recall（只量向量檢索本身，不含 query embedding 的網路時間）：
+
+    python -m backend.services.knowledge.bench [--index DIR] [--queries 2000] [--k 4] [--nprobe 8]
+    python -m backend.services.knowledge.bench --synthetic 50000 --dim 256
+
+--synthetic 以隨機的群聚向量在暫存目錄建一份 N 筆的索引，不需 API key，用來評估實際規模下的延遲。
+查詢向量取自索引內的向量再加上雜訊，recall@k 以全掃（search_exact）的結果為準。
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+# 只依賴 knowledge 的純 NumPy 部分：import backend.services.chat 會連帶載入 backend.db（需要 DATABASE_URL）
+from backend.services.knowledge.index import KnowledgeIndex, l2_normalize, write_index
+from backend.services.knowledge.provider import resolve_index_dir
+
+
+def _synthetic_index(path: str, *, n: int, dim: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    # 模擬「同類零件彼此相近」：先撒一批主題中心，每筆是某個中心加上雜訊
+    topics = l2_normalize(rng.standard_normal((max(1, n // 50), dim)))
+    vectors = l2_normalize(topics[rng.integers(0, len(topics), n)] + 1.4 * rng.standard_normal((n, dim)) / np.sqrt(dim))
+    docs = [{"id": f"doc-{i}", "text": f"synthetic #{i}"} for i in range(n)]
+    started = time.perf_counter()
+    meta = write_index(path, vectors=vectors, docs=docs, embedder="synthetic", model=None)
+    print(f"built synthetic index: n={n} dim={dim} nlist={meta['nlist']} in {time.perf_counter() - started:.1f}s")
+
+
+def _percentiles(samples: list[float]) -> str:
+    ms = np.asarray(samples) * 1000
+    return f"p50={np.percentile(ms, 50):.3f}ms p95={np.percentile(ms, 95):.3f}ms p99={np.percentile(ms, 99):.3f}ms"
+
+
+def run(index: KnowledgeIndex, *, queries: int, k: int, nprobe: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(index), queries)
+    noise = rng.standard_normal((queries, index.dim)).astype(np.float32) * (0.5 / np.sqrt(index.dim))
+    probes = l2_normalize(np.asarray(index.vectors[np.sort(rows)]) + noise)
+
+    # 暖身：把 mmap 的頁讀進 page cache，量的是穩定狀態
+    for q in probes[:50]:
+        index.search(q, k=k, nprobe=nprobe)
+
+    ivf_times: list[float] = []
+    exact_times: list[float] = []
+    recall_hits = 0
+    for q in probes:
+        t0 = time.perf_counter()
+        hits = index.search(q, k=k, nprobe=nprobe)
+        t1 = time.perf_counter()
+        exact = index.search_exact(q, k=k)
+        t2 = time.perf_counter()
+        ivf_times.append(t1 - t0)
+        exact_times.append(t2 - t1)
+        recall_hits += len({h.doc_id for h in hits} & {h.doc_id for h in exact})
+
+    print(f"index: n={len(index)} dim={index.dim} nlist={index.nlist} nprobe={nprobe} k={k} queries={queries}")
+    print(f"ivf   {_percentiles(ivf_times)}")
+    print(f"exact {_percentiles(exact_times)}")
+    print(f"recall@{k}={recall_hits / (queries * min(k, len(index))):.3f}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the parts knowledge index.")
+    parser.add_argument("--index", default=None, help="index directory (default: CHAT_KNOWLEDGE_INDEX_DIR)")
+    parser.add_argument("--synthetic", type=int, default=0, help="build a synthetic index with N rows instead")
+    parser.add_argument("--dim", type=int, default=256, help="vector dim for --synthetic")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        with tempfile.TemporaryDirectory() as tmp:
+            _synthetic_index(tmp, n=args.synthetic, dim=args.dim, seed=args.seed)
+            run(KnowledgeIndex(tmp), queries=args.queries, k=args.k, nprobe=args.nprobe, seed=args.seed)
+        return
+
+    index = KnowledgeIndex(args.index or resolve_index_dir())
+    run(index, queries=args.queries, k=args.k, nprobe=args.nprobe, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# backend/services/knowledge/build.py
+"""
+建立零件知識索引（離線執行，會呼叫設定中的 embedder）：
+
+    python -m backend.services.knowledge.build [--source parts.jsonl] [--out DIR]
+
+source 預設為 backend/data/parts_seed.jsonl，out 預設為 CHAT_KNOWLEDGE_INDEX_DIR
+（未設定時 backend/data/knowledge_index）。embedder 依 CHAT_EMBEDDER / CHAT_EMBEDDING_MODEL / CHAT_EMBEDDING_DIM，
+查詢時必須使用同一組設定。
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from backend.core.settings import get_settings
+from backend.services.chat.embeddings import get_embedder
+from backend.services.knowledge.index import write_index
+from backend.services.knowledge.provider import resolve_index_dir
+from backend.services.knowledge.snippets import render_snippet
+from backend.services.parts.seed import SEED_PATH, iter_part_records
+
+# Gemini embed_content 單次請求的筆數上限
+_EMBED_BATCH_SIZE = 100
+
+
+async def _embed_all(texts: list[str]) -> np.ndarray:
+    embedder = get_embedder()
+    batches = [
+        await embedder.embed(texts[i:i + _EMBED_BATCH_SIZE])
+        for i in range(0, len(texts), _EMBED_BATCH_SIZE)
+    ]
+    return np.concatenate(batches) if batches else np.zeros((0, embedder.dim), dtype=np.float32)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the parts knowledge index.")
+    parser.add_argument("--source", default=str(SEED_PATH), help="parts JSONL file")
+    parser.add_argument("--out", default=None, help="index directory")
+    parser.add_argument("--nlist", type=int, default=None, help="number of IVF partitions (default: auto)")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    out = args.out or resolve_index_dir()
+
+    docs = [{"id": r["id"], "text": render_snippet(r)} for r in iter_part_records(args.source)]
+    started = time.perf_counter()
+    vectors = asyncio.run(_embed_all([d["text"] for d in docs]))
+    embedded = time.perf_counter()
+
+    meta = write_index(
+        out,
+        vectors=vectors,
+        docs=docs,
+        embedder=settings.chat_embedder,
+        model=settings.chat_embedding_model if settings.chat_embedder == "gemini" else None,
+        nlist=args.nlist,
+    )
+    print(
+        f"indexed {meta['count']} docs (dim={meta['dim']}, nlist={meta['nlist']}) into {out}: "
+        f"embed {embedded - started:.1f}s, build {time.perf_counter() - embedded:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+# backend/services/knowledge/index.py
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+INDEX_FORMAT_VERSION = 1
+
+# 筆數不多時直接全掃（一次矩陣乘法），不值得分區
+_BRUTE_FORCE_MAX_ROWS = 4096
+
+_VECTORS_FILE = "vectors.npy"
+_CENTROIDS_FILE = "centroids.npy"
+_OFFSETS_FILE = "offsets.npy"
+_DOCS_FILE = "docs.jsonl"
+_META_FILE = "meta.json"
+
+
+def l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+@dataclass(frozen=True)
+class KnowledgeHit:
+    doc_id: str
+    text: str
+    score: float
+
+
+class KnowledgeIndex:
+    """
+    唯讀的知識片段向量索引（IVF-Flat，純 NumPy）：
+
+    - vectors.npy 以 mmap 開啟（多個 worker 共用同一份 page cache，不各自複製到記憶體）
+    - 建索引時以 k-means 分成 nlist 個區，列依所屬區連續存放（offsets 記錄每區範圍）
+    - 查詢時先比對 centroids，只掃最接近的 nprobe 個區，再取 top-k；
+      數萬筆時每次只碰幾千列，不必整個矩陣乘一次
+    - 向量皆已 L2 正規化，cosine = 內積
+
+    索引與 embedder 綁定（meta.json 記錄 embedder / model / dim），換 embedder 必須重建。
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.meta: dict[str, Any] = json.loads((self.path / _META_FILE).read_text(encoding="utf-8"))
+        if self.meta.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported knowledge index version in {self.path}: {self.meta.get('version')}")
+
+        self.vectors: np.ndarray = np.load(self.path / _VECTORS_FILE, mmap_mode="r")
+        self.centroids: np.ndarray = np.load(self.path / _CENTROIDS_FILE)
+        self.offsets: np.ndarray = np.load(self.path / _OFFSETS_FILE)
+
+        self._ids: list[str] = []
+        self._texts: list[str] = []
+        with (self.path / _DOCS_FILE).open(encoding="utf-8") as f:
+            for line in f:
+                doc = json.loads(line)
+                self._ids.append(doc["id"])
+                self._texts.append(doc["text"])
+
+        if len(self._texts) != len(self.vectors):
+            raise ValueError(f"Knowledge index {self.path} is inconsistent: docs and vectors differ in length")
+
+    @property
+    def dim(self) -> int:
+        return int(self.vectors.shape[1])
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def search(self, query: np.ndarray, *, k: int, nprobe: int, min_score: float = -1.0) -> list[KnowledgeHit]:
+        """query：shape (dim,) 且已正規化；回傳分數由高到低、不超過 k 筆且 >= min_score 的片段。"""
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        if len(self) == 0 or k <= 0:
+            return []
+
+        if self.nlist <= 1:
+            rows = None
+            scores = self.vectors @ query
+        else:
+            rows, scores = self._probe(query, nprobe)
+
+        k = min(k, len(scores))
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(scores[top])[::-1]]
+
+        hits: list[KnowledgeHit] = []
+        for i in top.tolist():
+            score = float(scores[i])
+            if score < min_score:
+                break
+            row = i if rows is None else int(rows[i])
+            hits.append(KnowledgeHit(doc_id=self._ids[row], text=self._texts[row], score=score))
+        return hits
+
+    def search_exact(self, query: np.ndarray, *, k: int) -> list[KnowledgeHit]:
+        """全掃版本（bench 用來算 IVF 的 recall）。"""
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        scores = self.vectors @ query
+        k = min(k, len(scores))
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(scores[top])[::-1]]
+        return [KnowledgeHit(doc_id=self._ids[i], text=self._texts[i], score=float(scores[i])) for i in top.tolist()]
+
+    def _probe(self, query: np.ndarray, nprobe: int) -> tuple[np.ndarray, np.ndarray]:
+        nprobe = max(1, min(nprobe, self.nlist))
+        centroid_scores = self.centroids @ query
+        lists = np.argpartition(centroid_scores, -nprobe)[-nprobe:]
+
+        # 每個區是連續的列：逐區做一次小的矩陣乘法，避免 fancy indexing 把整批列複製出來
+        row_chunks: list[np.ndarray] = []
+        score_chunks: list[np.ndarray] = []
+        for c in lists.tolist():
+            start, end = int(self.offsets[c]), int(self.offsets[c + 1])
+            if start == end:
+                continue
+            row_chunks.append(np.arange(start, end))
+            score_chunks.append(self.vectors[start:end] @ query)
+
+        if not score_chunks:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        return np.concatenate(row_chunks), np.concatenate(score_chunks)
+
+
+def _kmeans(vectors: np.ndarray, nlist: int, *, iterations: int, seed: int) -> np.ndarray:
+    """spherical k-means（內積相似度），回傳已正規化的 centroids。"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        # 依所屬區排序後以 reduceat 一次加總每區的列（比 np.add.at 快得多）
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=nlist)
+        filled = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[filled]
+
+        sums = np.zeros_like(centroids)
+        sums[filled] = np.add.reduceat(vectors[order], starts, axis=0)
+        # 空的區改用隨機一列重新播種，避免 centroid 退化
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = vectors[rng.choice(len(vectors), size=len(empty), replace=False)]
+        centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+    return centroids.astype(np.float32)
+
+
+def write_index(
+    path: str | Path,
+    *,
+    vectors: np.ndarray,
+    docs: list[dict[str, str]],
+    embedder: str,
+    model: str | None,
+    nlist: int | None = None,
+    kmeans_iterations: int = 12,
+    kmeans_sample: int = 65536,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    寫出索引目錄（vectors / centroids / offsets / docs / meta）；回傳 meta。
+    docs：[{"id", "text"}]，與 vectors 的列一一對應（vectors 需已 L2 正規化）。
+    nlist 預設 4 × sqrt(n)；筆數不超過 _BRUTE_FORCE_MAX_ROWS 時不分區。
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if len(vectors) != len(docs):
+        raise ValueError("vectors and docs must have the same length")
+
+    n = len(vectors)
+    if nlist is None:
+        nlist = 1 if n <= _BRUTE_FORCE_MAX_ROWS else int(4 * math.sqrt(n))
+    nlist = max(1, min(nlist, n))
+
+    if nlist == 1:
+        centroids = np.zeros((1, vectors.shape[1]), dtype=np.float32)
+        assign = np.zeros(n, dtype=np.int64)
+    else:
+        rng = np.random.default_rng(seed)
+        sample = vectors if n <= kmeans_sample else vectors[rng.choice(n, size=kmeans_sample, replace=False)]
+        centroids = _kmeans(sample, nlist, iterations=kmeans_iterations, seed=seed)
+        assign = np.concatenate([
+            np.argmax(vectors[i:i + 8192] @ centroids.T, axis=1) for i in range(0, n, 8192)
+        ])
+
+    order = np.argsort(assign, kind="stable")
+    offsets = np.zeros(nlist + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(assign, minlength=nlist))
+
+    out = Path(path)
+    out.mkdir(parents=True, exist_ok=True)
+    np.save(out / _VECTORS_FILE, vectors[order])
+    np.save(out / _CENTROIDS_FILE, centroids)
+    np.save(out / _OFFSETS_FILE, offsets)
+    with (out / _DOCS_FILE).open("w", encoding="utf-8") as f:
+        for i in order.tolist():
+            f.write(json.dumps({"id": docs[i]["id"], "text": docs[i]["text"]}, ensure_ascii=False) + "\n")
+
+    meta = {
+        "version": INDEX_FORMAT_VERSION,
+        "embedder": embedder,
+        "model": model,
+        "dim": int(vectors.shape[1]),
+        "count": n,
+        "nlist": nlist,
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    (out / _META_FILE).write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+    return meta
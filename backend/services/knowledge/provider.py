@@ -0,0 +1,73 @@
+# backend/services/knowledge/provider.py
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from backend.core.settings import get_settings
+from backend.services.knowledge.index import KnowledgeIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_DIR = Path(__file__).resolve().parents[2] / "data" / "knowledge_index"
+
+
+def resolve_index_dir() -> Path:
+    return Path(get_settings().chat_knowledge_index_dir or DEFAULT_INDEX_DIR)
+
+
+@lru_cache(maxsize=1)
+def get_knowledge_index() -> KnowledgeIndex | None:
+    """
+    載入零件知識索引（process 級別 singleton）；停用、尚未建索引或索引與目前 embedder 不符時回傳 None。
+    建索引：python -m backend.services.knowledge.build
+    """
+    settings = get_settings()
+    if not settings.chat_knowledge_enabled:
+        return None
+
+    path = resolve_index_dir()
+    if not (path / "meta.json").exists():
+        return None
+
+    index = KnowledgeIndex(path)
+    # 索引與查詢必須用同一個 embedder，否則分數沒有意義：設定不一致時停用檢索，不要回傳爛結果。
+    # 不拋例外：lru_cache 不快取例外，每個請求都會重新載入並回 500；回傳 None 則只記錄一次
+    expected = {
+        "embedder": settings.chat_embedder,
+        "model": settings.chat_embedding_model if settings.chat_embedder == "gemini" else None,
+        "dim": settings.chat_embedding_dim,
+    }
+    actual = {key: index.meta.get(key) for key in expected}
+    if actual != expected:
+        # 延後 import：backend.services.chat 會連帶載入 backend.db，離線工具（bench）只 import 本模組時不需要 DB
+        from backend.services.chat.metrics import get_chat_metrics
+
+        logger.error(
+            "Knowledge index %s was built with %s, current embedder is %s; retrieval disabled until rebuilt",
+            path,
+            actual,
+            expected,
+        )
+        get_chat_metrics().incr("knowledge.embedder_mismatch")
+        return None
+    return index
+
+
+def retrieve_snippets(query: np.ndarray) -> list[str]:
+    """以問題的 embedding 取 top-k 相關片段（CHAT_KNOWLEDGE_TOP_K / MIN_SCORE / NPROBE）；沒有索引時回傳空 list。"""
+    index = get_knowledge_index()
+    if index is None:
+        return []
+
+    settings = get_settings()
+    hits = index.search(
+        query,
+        k=settings.chat_knowledge_top_k,
+        nprobe=settings.chat_knowledge_nprobe,
+        min_score=settings.chat_knowledge_min_score,
+    )
+    return [hit.text for hit in hits]
@@ -0,0 +1,66 @@
+# backend/services/knowledge/snippets.py
+from __future__ import annotations
+
+from typing import Any
+
+CATEGORY_LABELS = {
+    "cpu": "處理器",
+    "motherboard": "主機板",
+    "gpu": "顯示卡",
+    "psu": "電源供應器",
+    "ram": "記憶體",
+    "case": "機殼",
+}
+
+# 規格欄位 → (中文標籤, 單位)；未列出的欄位照原 key 輸出
+SPEC_LABELS: dict[str, tuple[str, str]] = {
+    "socket": ("腳位", ""),
+    "chipset": ("晶片組", ""),
+    "cores": ("核心", ""),
+    "threads": ("執行緒", ""),
+    "tdp_w": ("TDP", "W"),
+    "max_power_w": ("最大功耗", "W"),
+    "memory_types": ("支援記憶體", ""),
+    "memory_type": ("記憶體", ""),
+    "igpu": ("內顯", ""),
+    "form_factor": ("尺寸", ""),
+    "memory_slots": ("記憶體插槽", ""),
+    "vram_gb": ("VRAM", "GB"),
+    "length_mm": ("長度", "mm"),
+    "recommended_psu_w": ("建議電源", "W"),
+    "wattage_w": ("額定功率", "W"),
+    "efficiency": ("轉換效率", ""),
+    "capacity_gb": ("容量", "GB"),
+    "modules": ("條數", ""),
+    "speed_mts": ("速度", "MT/s"),
+    "motherboard_form_factors": ("支援主機板", ""),
+    "max_gpu_length_mm": ("顯卡限長", "mm"),
+    "max_cooler_height_mm": ("散熱器限高", "mm"),
+    "psu_form_factor": ("電源規格", ""),
+    "gaming_score": ("遊戲效能指數", ""),
+    "multi_score": ("多核效能指數", ""),
+}
+
+
+def _format_value(value: Any, unit: str) -> str:
+    if isinstance(value, bool):
+        return "有" if value else "無"
+    if isinstance(value, list):
+        return "/".join(str(v) for v in value)
+    return f"{value}{unit}"
+
+
+def render_snippet(record: dict[str, Any]) -> str:
+    """一筆零件 → 一行知識片段（注入 prompt 用，盡量短）。"""
+    category = CATEGORY_LABELS.get(record["category"], record["category"])
+    specs = []
+    for key, value in (record.get("specs") or {}).items():
+        label, unit = SPEC_LABELS.get(key, (key, ""))
+        specs.append(f"{label} {_format_value(value, unit)}")
+
+    parts = [f"[{category}] {record['name']}"]
+    if specs:
+        parts.append("、".join(specs))
+    if record.get("price"):
+        parts.append(f"參考價 NT${record['price']:,}")
+    return "｜".join(parts)
@@ -0,0 +1,14 @@
+# backend/services/parts/__init__.py
+from .catalog import PartsCatalogService, current_parts, get_parts_catalog
+from .seed import SEED_PATH, iter_part_records
+from .snapshot import SORT_KEYS, PartsSnapshot
+
+__all__ = [
+    "PartsCatalogService",
+    "PartsSnapshot",
+    "SEED_PATH",
+    "SORT_KEYS",
+    "current_parts",
+    "get_parts_catalog",
+    "iter_part_records",
+]
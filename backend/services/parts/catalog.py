@@ -0,0 +1,103 @@
+# backend/services/parts/catalog.py
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import select
+
+from backend.db import SessionLocal
+from backend.models import Part
+from backend.services.parts.seed import iter_part_records
+from backend.services.parts.snapshot import PartsSnapshot
+
+# 增量刷新時往回多讀的時間：較早開始、較晚 commit 的交易，updated_at 可能比上次看到的最大值還舊
+_REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+def _to_record(part: Part) -> dict[str, Any]:
+    return {
+        "id": part.id,
+        "category": part.category,
+        "name": part.name,
+        "price": part.price,
+        "specs": dict(part.specs or {}),
+        "aliases": list(part.aliases or []),
+    }
+
+
+class PartsCatalogService:
+    """
+    parts 表的記憶體快照（PartsSnapshot）與增量刷新：
+
+    - 第一次 refresh() 載入全部上架零件；之後只讀 updated_at 在上次水位之後的列
+      （含 is_active = false 的下架列），合併後重建快照並整個替換
+    - 沒有任何變更時不重建（snapshot.version 不變，下游的衍生索引可以據此判斷要不要重建）
+    - 查詢一律讀 self.snapshot，不碰 DB
+
+    refresh() 為同步（DB I/O），async 端請以 run_in_threadpool 呼叫；由 lifespan 在啟動時與定期呼叫。
+    """
+
+    def __init__(self) -> None:
+        self.snapshot = PartsSnapshot([], version=0)
+        self._records: dict[str, dict[str, Any]] = {}
+        self._watermark: datetime | None = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> int:
+        """回傳這次有變動（新增 / 修改 / 下架）的筆數。"""
+        with self._lock:
+            stmt = select(Part)
+            if self._watermark is None:
+                stmt = stmt.where(Part.is_active.is_(True))
+            else:
+                stmt = stmt.where(Part.updated_at > self._watermark - _REFRESH_OVERLAP)
+
+            with SessionLocal() as db:
+                parts = db.execute(stmt).scalars().all()
+
+            changed = 0
+            for part in parts:
+                if self._watermark is None or part.updated_at > self._watermark:
+                    self._watermark = part.updated_at
+                if not part.is_active:
+                    changed += self._records.pop(part.id, None) is not None
+                    continue
+                record = _to_record(part)
+                if self._records.get(part.id) != record:
+                    self._records[part.id] = record
+                    changed += 1
+
+            if changed or self.snapshot.version == 0:
+                self.snapshot = PartsSnapshot(list(self._records.values()), version=self.snapshot.version + 1)
+            return changed
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "parts": len(self.snapshot),
+            "version": self.snapshot.version,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_parts_catalog() -> PartsCatalogService:
+    return PartsCatalogService()
+
+
+def current_parts() -> tuple[int, list[dict[str, Any]]]:
+    """
+    (快照版本, 零件) 給衍生索引（相容性別名、配單候選）判斷要不要重建；
+    快照還是空的（尚未載入 / DB 沒有資料）時改用種子資料（版本 -1），讓本地開發不需要 DB。
+    """
+    snapshot = get_parts_catalog().snapshot
+    if len(snapshot):
+        return snapshot.version, snapshot.records
+    return -1, _seed_records()
+
+
+@lru_cache(maxsize=1)
+def _seed_records() -> list[dict[str, Any]]:
+    return list(iter_part_records())
@@ -0,0 +1,80 @@
+# backend/services/parts/seed.py
+"""
+零件種子資料（JSONL，每行一筆）：
+{"id", "category", "name", "price"（新台幣）, "specs": {...}, "aliases": [...]}
+
+寫入 / 更新 parts 表：
+
+    python -m backend.services.parts.seed [--source parts.jsonl]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.db import SessionLocal
+from backend.models import Part
+
+SEED_PATH = Path(__file__).resolve().parents[2] / "data" / "parts_seed.jsonl"
+
+
+def iter_part_records(path: str | Path = SEED_PATH) -> Iterator[dict[str, Any]]:
+    with Path(path).open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def upsert_parts(records: list[dict[str, Any]]) -> int:
+    """以 id 為鍵批次 upsert（已存在的列覆寫內容並重新上架）；回傳筆數。"""
+    if not records:
+        return 0
+
+    rows = [
+        {
+            "id": r["id"],
+            "category": r["category"],
+            "name": r["name"],
+            "price": r["price"],
+            "specs": r.get("specs") or {},
+            "aliases": r.get("aliases") or [],
+            "is_active": True,
+        }
+        for r in records
+    ]
+    stmt = insert(Part).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Part.id],
+        set_={
+            "category": stmt.excluded.category,
+            "name": stmt.excluded.name,
+            "price": stmt.excluded.price,
+            "specs": stmt.excluded.specs,
+            "aliases": stmt.excluded.aliases,
+            "is_active": stmt.excluded.is_active,
+            "updated_at": func.now(),
+        },
+    )
+    with SessionLocal() as db:
+        db.execute(stmt)
+        db.commit()
+    return len(rows)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Load parts seed data into the parts table.")
+    parser.add_argument("--source", default=str(SEED_PATH), help="parts JSONL file")
+    args = parser.parse_args(argv)
+
+    count = upsert_parts(list(iter_part_records(args.source)))
+    print(f"upserted {count} parts from {args.source}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# backend/services/parts/snapshot.py
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+# 可排序欄位；前面加 "-" 代表由大到小
+SORT_KEYS = ("price", "tdp", "name")
+
+
+class PartsSnapshot:
+    """
+    零件目錄的唯讀欄式快照：每個可篩選欄位一個 NumPy 陣列（類別 / 腳位編碼成整數），
+    查詢 = 幾個向量化比較組成 mask，再套用預先算好的排序，不必逐筆跑 Python、也不碰 DB。
+
+    快照建好後不再修改；刷新時建一份新的整個換掉（讀取端拿到的永遠是完整一致的一份）。
+    """
+
+    def __init__(self, records: list[dict[str, Any]], *, version: int) -> None:
+        self.version = version
+        self.records = sorted(records, key=lambda r: r["id"])
+
+        self._category_codes = {c: i for i, c in enumerate(sorted({r["category"] for r in self.records}))}
+        sockets = sorted({r["specs"]["socket"] for r in self.records if r["specs"].get("socket")})
+        self._socket_codes = {s: i for i, s in enumerate(sockets)}
+
+        self.category = np.array([self._category_codes[r["category"]] for r in self.records], dtype=np.int16)
+        self.socket = np.array(
+            [self._socket_codes.get(r["specs"].get("socket"), -1) for r in self.records],
+            dtype=np.int16,
+        )
+        self.price = np.array([r["price"] for r in self.records], dtype=np.int64)
+        # 沒有 TDP 的類別（電源、機殼…）記為 NaN：任何 TDP 條件都不會成立
+        self.tdp = np.array([r["specs"].get("tdp_w", np.nan) for r in self.records], dtype=np.float32)
+
+        names = np.array([r["name"].lower() for r in self.records])
+        self._orders = {
+            "price": np.argsort(self.price, kind="stable"),
+            "-price": np.argsort(-self.price, kind="stable"),
+            # NaN 排在最後（遞減時取負號，NaN 仍是 NaN）
+            "tdp": np.argsort(self.tdp, kind="stable"),
+            "-tdp": np.argsort(-self.tdp, kind="stable"),
+            "name": np.argsort(names, kind="stable"),
+            "-name": np.argsort(names, kind="stable")[::-1].copy(),
+        }
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def query(
+        self,
+        *,
+        category: str | None = None,
+        socket: str | None = None,
+        price_min: int | None = None,
+        price_max: int | None = None,
+        tdp_min: float | None = None,
+        tdp_max: float | None = None,
+        sort: str = "price",
+        limit: int = 20,
+        offset: int = 0,
+    ) -> tuple[int, list[dict[str, Any]]]:
+        """回傳 (符合條件的總筆數, 該頁的零件)。"""
+        mask = np.ones(len(self.records), dtype=bool)
+        if category is not None:
+            code = self._category_codes.get(category)
+            if code is None:
+                return 0, []
+            mask &= self.category == code
+        if socket is not None:
+            code = self._socket_codes.get(socket)
+            if code is None:
+                return 0, []
+            mask &= self.socket == code
+        if price_min is not None:
+            mask &= self.price >= price_min
+        if price_max is not None:
+            mask &= self.price <= price_max
+        if tdp_min is not None:
+            mask &= self.tdp >= tdp_min
+        if tdp_max is not None:
+            mask &= self.tdp <= tdp_max
+
+        order = self._orders[sort]
+        selected = order[mask[order]]
+        page = selected[offset:offset + limit]
+        return len(selected), [self.records[i] for i in page.tolist()]
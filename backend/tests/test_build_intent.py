@@ -0,0 +1,66 @@
+# backend/tests/test_build_intent.py
+import pytest
+
+from backend.services.builds.intent import BuildRequest, parse_build_request
+
+
+@pytest.mark.parametrize(
+    ("message", "budget"),
+    [
+        ("預算 3 萬", 30000),
+        ("預算30000元", 30000),
+        ("預算 30,000 元左右", 30000),
+        ("3.5萬的預算", 35000),
+        ("4w 怎麼配", 40000),
+        ("預算 3 萬 5", 35000),
+        ("預算3萬5千", 35000),
+        ("預算 3萬5000", 35000),
+        ("預算大概 45k", 45000),
+        ("預算三萬", 30000),
+        ("三萬預算怎麼配", 30000),
+        ("預算兩萬五", 25000),
+        ("三萬五千的預算", 35000),
+        ("預算十萬", 100000),
+        ("預算十五萬", 150000),
+        ("二十萬以內怎麼配", 200000),
+        ("預算 NT$ 60000", 60000),
+        ("30000元能配什麼", 30000),
+        ("30000 的預算", 30000),
+        # 萬之後緊接英數字的不是零頭
+        ("預算4萬 2K螢幕", 40000),
+    ],
+)
+def test_budget(message, budget):
+    request = parse_build_request(message)
+    assert request is not None
+    assert request.budget == budget
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "推薦一張顯卡",
+        "預算 5000",  # 太少，組不出完整主機
+        "預算 100 萬",  # 超過上限，多半是打錯字
+        "這兩張卡差多少",
+        # 型號後面接「能配」不是預算
+        "i5-13400 能配 B760 嗎",
+        "12400 可以配 4060 嗎",
+        "14600 能配哪張板子",
+        "R5-7600 能配 DDR4 嗎",
+        "i5-13600K 能配 B760 嗎",
+    ],
+)
+def test_no_budget(message):
+    assert parse_build_request(message) is None
+
+
+@pytest.mark.parametrize(
+    ("message", "expected"),
+    [
+        ("預算3萬想玩3A遊戲", BuildRequest(budget=30000, profile="gaming")),
+        ("五萬預算要剪片", BuildRequest(budget=50000, profile="creator")),
+    ],
+)
+def test_profile(message, expected):
+    assert parse_build_request(message) == expected
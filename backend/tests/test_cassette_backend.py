@@ -0,0 +1,83 @@
+# backend/tests/test_cassette_backend.py
+import asyncio
+
+import pytest
+
+from backend.services.chat.backends import CassetteBackend, CassetteMissError, StubBackend
+from backend.services.chat.prompt import build_prompt
+from backend.services.chat.routing import ModelTier
+
+_TIER = ModelTier(name="standard", model="gemini-test", max_output_tokens=64, thinking_budget=0)
+
+
+def _stub() -> StubBackend:
+    return StubBackend(latency_seconds=0, chunk_delay_seconds=0, chunks=4, reply_chars=80)
+
+
+async def _collect(backend, prompt, usage: list) -> list[str]:
+    chunks = await backend.stream(prompt, tier=_TIER, on_usage=usage.append)
+    try:
+        return [piece async for piece in chunks]
+    finally:
+        await chunks.aclose()
+
+
+def test_record_then_replay_round_trip(tmp_path):
+    path = tmp_path / "tapes.jsonl"
+    generate_prompt = build_prompt("預算 3 萬怎麼配", [])
+    stream_prompt = build_prompt("推薦一張顯卡", [])
+
+    async def record() -> tuple[str, list[str], list, list]:
+        recorder = CassetteBackend(path, mode="record", inner=_stub())
+        generate_usage: list = []
+        stream_usage: list = []
+        reply = await recorder.generate(generate_prompt, tier=_TIER, on_usage=generate_usage.append)
+        pieces = await _collect(recorder, stream_prompt, stream_usage)
+        return reply, pieces, generate_usage, stream_usage
+
+    async def replay() -> tuple[str, list[str], list, list]:
+        # 新的 instance 只讀檔案，不需要內層 backend
+        player = CassetteBackend(path, mode="replay", replay_timing=False)
+        generate_usage: list = []
+        stream_usage: list = []
+        reply = await player.generate(generate_prompt, tier=_TIER, on_usage=generate_usage.append)
+        pieces = await _collect(player, stream_prompt, stream_usage)
+        return reply, pieces, generate_usage, stream_usage
+
+    recorded = asyncio.run(record())
+    replayed = asyncio.run(replay())
+
+    assert recorded[0] and len(recorded[1]) == 4
+    assert replayed == recorded
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_replay_miss_raises(tmp_path):
+    path = tmp_path / "tapes.jsonl"
+
+    async def record() -> None:
+        recorder = CassetteBackend(path, mode="record", inner=_stub())
+        await recorder.generate(build_prompt("推薦一張顯卡", []), tier=_TIER)
+
+    async def replay_other() -> None:
+        player = CassetteBackend(path, mode="replay", replay_timing=False)
+        other = build_prompt("推薦一張主機板", [])
+        with pytest.raises(CassetteMissError):
+            await player.generate(other, tier=_TIER)
+        with pytest.raises(CassetteMissError):
+            await player.stream(other, tier=_TIER)
+        # 同一個 prompt 換模型也是不同的錄音
+        with pytest.raises(CassetteMissError):
+            await player.generate(build_prompt("推薦一張顯卡", []), tier=ModelTier(
+                name="lite", model="gemini-other", max_output_tokens=64, thinking_budget=0,
+            ))
+
+    asyncio.run(record())
+    asyncio.run(replay_other())
+
+
+def test_replay_without_file_misses(tmp_path):
+    player = CassetteBackend(tmp_path / "missing.jsonl", mode="replay", replay_timing=False)
+
+    with pytest.raises(CassetteMissError):
+        asyncio.run(player.generate(build_prompt("推薦一張顯卡", []), tier=_TIER))
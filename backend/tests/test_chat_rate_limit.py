@@ -0,0 +1,95 @@
+# backend/tests/test_chat_rate_limit.py
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from limits import parse
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+
+from backend.api.dependencies.auth import get_active_user
+from backend.api.routes import chat as chat_routes
+from backend.core.middleware.throttling.rate_limit import RATE_LIMIT_KEY_PREFIX, limiter
+from backend.services.auth.sessions import SessionUser
+
+_USER = SessionUser(id=1, is_active=True)
+# TestClient 的 client.host 不是合法 IP，get_client_ip 原樣當 key
+_CLIENT_KEY = "testclient"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def resolve_conversation(body, user):
+        return uuid4(), [], None, True
+
+    async def generate_chat_reply(**kwargs):
+        return "回覆"
+
+    async def stream_chat_reply(**kwargs):
+        async def chunks():
+            yield "回覆"
+
+        return chunks()
+
+    async def save_round(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(chat_routes, "_resolve_conversation", resolve_conversation)
+    monkeypatch.setattr(chat_routes, "generate_chat_reply", generate_chat_reply)
+    monkeypatch.setattr(chat_routes, "stream_chat_reply", stream_chat_reply)
+    monkeypatch.setattr(chat_routes, "_save_round", save_round)
+    monkeypatch.setattr(chat_routes, "is_trusted_origin", lambda websocket: True)
+    monkeypatch.setattr(chat_routes, "_load_ws_user", lambda raw_token: _USER)
+
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    app.include_router(chat_routes.router)
+    app.dependency_overrides[get_active_user] = lambda: _USER
+
+    limiter.reset()
+    yield TestClient(app)
+    limiter.reset()
+
+
+def _remaining() -> int:
+    item = parse(chat_routes.CHAT_RATE_LIMIT)
+    return limiter.limiter.get_window_stats(
+        item, RATE_LIMIT_KEY_PREFIX, _CLIENT_KEY, chat_routes.CHAT_RATE_LIMIT_SCOPE
+    ).remaining
+
+
+def _batch(client: TestClient, n: int):
+    return client.post("/api/chat/batch", json={"items": [{"message": f"問題{i}"} for i in range(n)]})
+
+
+def _ws_turn(client: TestClient) -> list[dict]:
+    with client.websocket_connect("/api/chat/ws") as ws:
+        ws.send_text('{"message": "問題"}')
+        frames = [ws.receive_json()]
+        while frames[-1]["type"] == "delta":
+            frames.append(ws.receive_json())
+    return frames
+
+
+def test_decorated_routes_batch_and_ws_share_one_bucket(client):
+    limit = parse(chat_routes.CHAT_RATE_LIMIT).amount
+
+    assert client.post("/api/chat", json={"message": "問題"}).status_code == 200
+    assert _batch(client, 10).status_code == 200
+    assert _ws_turn(client)[-1]["type"] == "done"
+    assert _remaining() == limit - 12
+
+    # 用 batch 把剩下的額度扣完，decorator 路徑與 WebSocket 都一起被擋
+    while _remaining() > 0:
+        assert _batch(client, min(10, _remaining())).status_code == 200
+
+    assert client.post("/api/chat", json={"message": "問題"}).status_code == 429
+    assert client.post("/api/chat/stream", json={"message": "問題"}).status_code == 429
+    rejected = _batch(client, 1)
+    assert rejected.status_code == 429
+    assert int(rejected.headers["Retry-After"]) >= 1
+    frames = _ws_turn(client)
+    assert frames[-1]["type"] == "error"
+    assert frames[-1]["retry_after"] >= 1
@@ -0,0 +1,111 @@
+# backend/tests/test_chat_slot.py
+import asyncio
+
+import pytest
+
+from backend.services.chat import service
+from backend.services.chat.scheduler import ChatOverloadedError, ChatScheduler
+from backend.services.chat.service import _CacheProbe, _SlotStream, _stream_upstream
+
+
+class _FakeBackend:
+    def __init__(self, chunks: list[str]) -> None:
+        self.chunks = chunks
+        self.started = False
+
+    async def stream(self, prompt, *, tier, on_usage):
+        self.started = True
+
+        async def gen():
+            for text in self.chunks:
+                yield text
+
+        return gen()
+
+
+def _scheduler(max_concurrency: int = 1, max_queue: int = 4) -> ChatScheduler:
+    return ChatScheduler(
+        max_concurrency=max_concurrency,
+        max_queue=max_queue,
+        max_queue_per_user=2,
+        queue_timeout_seconds=1.0,
+    )
+
+
+def _slot_stream(monkeypatch, scheduler: ChatScheduler, backend: _FakeBackend):
+    monkeypatch.setattr(service, "get_chat_backend", lambda: backend)
+
+    async def no_store(probe, reply_text):
+        return None
+
+    monkeypatch.setattr(service, "_store_caches", no_store)
+
+    async def open_stream() -> _SlotStream:
+        slot = await scheduler.acquire("u1")
+        chunks = _stream_upstream(slot, prompt=None, tier=None, probe=_CacheProbe("k"), on_usage=lambda usage: None)
+        return _SlotStream(slot, chunks)
+
+    return open_stream
+
+
+def test_aclose_before_iteration_releases_slot(monkeypatch):
+    scheduler = _scheduler()
+    backend = _FakeBackend(["a", "b"])
+    open_stream = _slot_stream(monkeypatch, scheduler, backend)
+
+    async def run() -> None:
+        chunks = await open_stream()
+        assert scheduler.stats()["active"] == 1
+        await chunks.aclose()
+
+    asyncio.run(run())
+    assert scheduler.stats()["active"] == 0
+    assert not backend.started
+
+
+def test_full_iteration_releases_slot_once(monkeypatch):
+    scheduler = _scheduler()
+    open_stream = _slot_stream(monkeypatch, scheduler, _FakeBackend(["a", "b"]))
+
+    async def run() -> list[str]:
+        chunks = await open_stream()
+        parts = [text async for text in chunks]
+        await chunks.aclose()
+        return parts
+
+    assert asyncio.run(run()) == ["a", "b"]
+    assert scheduler.stats()["active"] == 0
+
+
+def test_closed_stream_hands_slot_to_waiter(monkeypatch):
+    scheduler = _scheduler(max_concurrency=1)
+    open_stream = _slot_stream(monkeypatch, scheduler, _FakeBackend(["a"]))
+
+    async def run() -> None:
+        chunks = await open_stream()
+        waiter = asyncio.create_task(scheduler.acquire("u2"))
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queued"] == 1
+
+        await chunks.aclose()
+        slot = await asyncio.wait_for(waiter, timeout=1.0)
+        assert scheduler.stats()["active"] == 1
+        assert scheduler.stats()["queued"] == 0
+        slot.release()
+
+    asyncio.run(run())
+    assert scheduler.stats()["active"] == 0
+
+
+def test_queue_full_raises_overloaded():
+    scheduler = _scheduler(max_concurrency=1, max_queue=0)
+
+    async def run() -> None:
+        slot = await scheduler.acquire("u1")
+        with pytest.raises(ChatOverloadedError) as excinfo:
+            await scheduler.acquire("u2")
+        assert excinfo.value.status_code == 503
+        slot.release()
+
+    asyncio.run(run())
+    assert scheduler.stats()["active"] == 0
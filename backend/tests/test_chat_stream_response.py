@@ -0,0 +1,89 @@
+# backend/tests/test_chat_stream_response.py
+import asyncio
+
+import pytest
+from starlette.requests import ClientDisconnect
+
+from backend.api.routes.chat import _ClosingStreamingResponse
+
+
+class _Stream:
+    def __init__(self) -> None:
+        self.started = False
+        self.body_closed = False
+        self.close_calls = 0
+
+    async def body(self):
+        self.started = True
+        try:
+            yield "a"
+            yield "b"
+        finally:
+            self.body_closed = True
+
+    async def on_close(self) -> None:
+        self.close_calls += 1
+
+    def response(self) -> _ClosingStreamingResponse:
+        return _ClosingStreamingResponse(self.body(), on_close=self.on_close, media_type="text/event-stream")
+
+
+def _scope(spec_version: str) -> dict:
+    return {"type": "http", "asgi": {"version": "3.0", "spec_version": spec_version}}
+
+
+async def _never_disconnect() -> dict:
+    await asyncio.Event().wait()
+    return {"type": "http.disconnect"}
+
+
+def test_cancel_before_body_starts_still_closes():
+    stream = _Stream()
+    blocked = asyncio.Event()
+
+    async def send(message) -> None:
+        blocked.set()
+        await asyncio.Event().wait()  # 卡在送出 headers，body 還沒開始
+
+    async def run() -> None:
+        task = asyncio.create_task(stream.response()(_scope("2.4"), _never_disconnect, send))
+        await blocked.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert not stream.started
+    assert stream.close_calls == 1
+
+
+def test_disconnect_on_send_closes_body_and_stream():
+    stream = _Stream()
+    sent: list[dict] = []
+
+    async def send(message) -> None:
+        if message["type"] == "http.response.body":
+            raise OSError("connection reset")
+        sent.append(message)
+
+    async def run() -> None:
+        with pytest.raises(ClientDisconnect):
+            await stream.response()(_scope("2.4"), _never_disconnect, send)
+
+    asyncio.run(run())
+    assert stream.started
+    assert stream.body_closed
+    assert stream.close_calls == 1
+
+
+def test_completed_response_closes_once():
+    stream = _Stream()
+    bodies: list[bytes] = []
+
+    async def send(message) -> None:
+        if message["type"] == "http.response.body":
+            bodies.append(message["body"])
+
+    asyncio.run(stream.response()(_scope("2.4"), _never_disconnect, send))
+    assert b"".join(bodies) == b"ab"
+    assert stream.close_calls == 1
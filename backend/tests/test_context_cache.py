@@ -0,0 +1,183 @@
+# backend/tests/test_context_cache.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from google.genai import errors as genai_errors
+
+from backend.services.chat import context_cache
+from backend.services.chat.backends import gemini
+from backend.services.chat.backends.gemini import GeminiBackend
+from backend.services.chat.config import SYSTEM_PROMPT
+from backend.services.chat.context_cache import ContextCacheRegistry
+from backend.services.chat.prompt import ChatPrompt, build_prompt
+from backend.services.chat.routing import ModelTier
+
+_TIER = ModelTier(name="standard", model="gemini-test", max_output_tokens=64, thinking_budget=0)
+_LONG_PREFIX = "穩定前綴" * 400
+
+
+class _FakeCaches:
+    def __init__(self, *, fail: bool = False) -> None:
+        self.fail = fail
+        self.created: list[dict] = []
+
+    async def create(self, *, model, config):
+        self.created.append({"model": model, "config": config})
+        if self.fail:
+            raise RuntimeError("prefix too short")
+        return SimpleNamespace(name=f"cachedContents/{len(self.created)}")
+
+
+class _FakeModels:
+    def __init__(self) -> None:
+        self.configs: list = []
+        # 帶 cached_content 的呼叫要丟出的錯誤
+        self.cached_error: Exception | None = None
+
+    async def generate_content(self, *, model, contents, config):
+        self.configs.append(config)
+        if config.cached_content is not None and self.cached_error is not None:
+            raise self.cached_error
+        return SimpleNamespace(text="回覆", usage_metadata=None)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def _setup(monkeypatch, *, fail: bool = False, min_tokens: int = 100):
+    caches = _FakeCaches(fail=fail)
+    models = _FakeModels()
+    clock = _Clock()
+    registry = ContextCacheRegistry(ttl_seconds=3600, min_tokens=min_tokens)
+    monkeypatch.setattr(context_cache, "get_async_genai_client", lambda: SimpleNamespace(caches=caches))
+    monkeypatch.setattr(context_cache, "time", clock)
+    monkeypatch.setattr(gemini, "get_context_cache_registry", lambda: registry)
+    monkeypatch.setattr(gemini, "get_resilient_genai_client", lambda: SimpleNamespace(models=models))
+    return caches, models, clock
+
+
+def _generate(times: int, system_prefix: str = _LONG_PREFIX) -> None:
+    prompt = ChatPrompt(system_instruction=system_prefix, contents=build_prompt("問題", []).contents)
+
+    async def run() -> None:
+        backend = GeminiBackend()
+        await asyncio.gather(*(backend.generate(prompt, tier=_TIER) for _ in range(times)))
+
+    asyncio.run(run())
+
+
+def test_create_once_then_reuse_handle(monkeypatch):
+    caches, models, _clock = _setup(monkeypatch)
+
+    _generate(5)
+
+    assert len(caches.created) == 1
+    assert caches.created[0]["config"].ttl == "3600s"
+    assert [c.cached_content for c in models.configs] == ["cachedContents/1"] * 5
+    assert all(c.system_instruction is None for c in models.configs)
+
+
+def test_recreate_after_ttl(monkeypatch):
+    caches, models, clock = _setup(monkeypatch)
+
+    _generate(1)
+    clock.now += 3600
+    _generate(1)
+
+    assert len(caches.created) == 2
+    assert [c.cached_content for c in models.configs] == ["cachedContents/1", "cachedContents/2"]
+
+
+def test_failure_backs_off_to_inline_system_instruction(monkeypatch):
+    caches, models, clock = _setup(monkeypatch, fail=True)
+
+    _generate(3)
+    assert len(caches.created) == 1
+    assert all(c.cached_content is None for c in models.configs)
+    assert all(c.system_instruction == _LONG_PREFIX for c in models.configs)
+
+    # 暫停期間不再嘗試登記；過了之後才重試
+    clock.now += 60
+    _generate(1)
+    assert len(caches.created) == 1
+    clock.now += 300
+    _generate(1)
+    assert len(caches.created) == 2
+
+
+def test_short_prefix_is_not_cached(monkeypatch):
+    caches, models, _clock = _setup(monkeypatch)
+
+    _generate(1, system_prefix="短")
+
+    assert caches.created == []
+    assert models.configs[0].system_instruction == "短"
+
+
+def _client_error(code: int, message: str, status: str) -> genai_errors.ClientError:
+    return genai_errors.ClientError(code, {"error": {"code": code, "message": message, "status": status}})
+
+
+def test_stale_handle_is_dropped_and_resent(monkeypatch):
+    caches, models, _clock = _setup(monkeypatch)
+    models.cached_error = _client_error(403, "CachedContent not found (or permission denied)", "PERMISSION_DENIED")
+
+    _generate(1)
+
+    assert [c.cached_content for c in models.configs] == ["cachedContents/1", None]
+    assert models.configs[1].system_instruction == _LONG_PREFIX
+
+    # handle 已作廢，下次請求重新登記
+    models.cached_error = None
+    _generate(1)
+    assert len(caches.created) == 2
+
+
+@pytest.mark.parametrize(
+    ("code", "message", "status"),
+    [
+        (400, "Invalid value at 'contents'", "INVALID_ARGUMENT"),
+        (429, "Resource has been exhausted", "RESOURCE_EXHAUSTED"),
+        (403, "Permission denied on resource project", "PERMISSION_DENIED"),
+    ],
+)
+def test_unrelated_client_error_is_not_resent(monkeypatch, code, message, status):
+    caches, models, _clock = _setup(monkeypatch)
+    models.cached_error = _client_error(code, message, status)
+
+    with pytest.raises(genai_errors.ClientError):
+        _generate(1)
+    assert len(models.configs) == 1
+
+    # 仍有效的 handle 不會被作廢
+    models.cached_error = None
+    _generate(1)
+    assert len(caches.created) == 1
+    assert models.configs[-1].cached_content == "cachedContents/1"
+
+
+def test_summaries_stay_out_of_the_shared_prefix(monkeypatch):
+    caches, models, _clock = _setup(monkeypatch, min_tokens=0)
+    prompts = [
+        build_prompt("問題", [], summary="使用者預算 3 萬"),
+        build_prompt("問題", [], summary="使用者要剪片"),
+    ]
+
+    async def run() -> None:
+        backend = GeminiBackend()
+        for prompt in prompts:
+            await backend.generate(prompt, tier=_TIER)
+
+    asyncio.run(run())
+
+    assert all(p.system_instruction == SYSTEM_PROMPT for p in prompts)
+    assert "使用者預算 3 萬" in prompts[0].contents[0].parts[0].text
+    # 不同對話的摘要共用同一份 cached content
+    assert len(caches.created) == 1
+    assert [c.cached_content for c in models.configs] == ["cachedContents/1"] * 2
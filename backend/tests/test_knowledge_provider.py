@@ -0,0 +1,43 @@
+# backend/tests/test_knowledge_provider.py
+import numpy as np
+import pytest
+
+from backend.core.settings import get_settings
+from backend.services.chat.metrics import get_chat_metrics
+from backend.services.knowledge.index import l2_normalize, write_index
+from backend.services.knowledge.provider import get_knowledge_index, retrieve_snippets
+
+
+@pytest.fixture
+def index_dir(tmp_path, monkeypatch):
+    vectors = l2_normalize(np.random.default_rng(0).standard_normal((8, 16)))
+    docs = [{"id": f"doc-{i}", "text": f"片段 {i}"} for i in range(8)]
+    write_index(tmp_path, vectors=vectors, docs=docs, embedder="hashing", model=None)
+
+    monkeypatch.setenv("CHAT_KNOWLEDGE_INDEX_DIR", str(tmp_path))
+    monkeypatch.setenv("CHAT_EMBEDDER", "hashing")
+    get_settings.cache_clear()
+    get_knowledge_index.cache_clear()
+    yield vectors
+    get_settings.cache_clear()
+    get_knowledge_index.cache_clear()
+
+
+def test_matching_embedder_loads_index(index_dir, monkeypatch):
+    monkeypatch.setenv("CHAT_EMBEDDING_DIM", "16")
+    get_settings.cache_clear()
+
+    assert len(get_knowledge_index()) == 8
+    assert retrieve_snippets(index_dir[3])[0] == "片段 3"
+
+
+def test_embedder_mismatch_disables_retrieval_once(index_dir, monkeypatch):
+    monkeypatch.setenv("CHAT_EMBEDDING_DIM", "256")
+    get_settings.cache_clear()
+    before = get_chat_metrics().snapshot().get("knowledge.embedder_mismatch", 0)
+
+    for _ in range(3):
+        assert get_knowledge_index() is None
+        assert retrieve_snippets(index_dir[0]) == []
+
+    assert get_chat_metrics().snapshot()["knowledge.embedder_mismatch"] == before + 1
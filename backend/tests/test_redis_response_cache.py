@@ -0,0 +1,91 @@
+# backend/tests/test_redis_response_cache.py
+import asyncio
+
+import pytest
+from fakeredis import aioredis
+
+from backend.services.chat.cache import redis_backend
+from backend.services.chat.cache.redis_backend import RedisResponseCache
+from backend.services.chat.metrics import ChatMetrics
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(redis_backend, "time", clock)
+    return clock
+
+
+def _cache(*, max_entries: int = 16, ttl_seconds: float = 3600) -> tuple[RedisResponseCache, ChatMetrics]:
+    metrics = ChatMetrics()
+    cache = RedisResponseCache(
+        aioredis.FakeRedis(),
+        max_entries=max_entries,
+        ttl_seconds=ttl_seconds,
+        metrics=metrics,
+    )
+    return cache, metrics
+
+
+def test_round_trip():
+    cache, metrics = _cache()
+
+    async def run() -> tuple[str | None, str | None]:
+        await cache.set("k1", "組一台 3 萬的電腦")
+        return await cache.get("k1"), await cache.get("missing")
+
+    assert asyncio.run(run()) == ("組一台 3 萬的電腦", None)
+    assert metrics.snapshot()["cache.hit"] == 1
+    assert metrics.snapshot()["cache.miss"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache, _metrics = _cache(ttl_seconds=1)
+
+    async def run() -> tuple[str | None, str | None]:
+        await cache.set("k1", "v1")
+        before = await cache.get("k1")
+        await asyncio.sleep(1.2)
+        return before, await cache.get("k1")
+
+    assert asyncio.run(run()) == ("v1", None)
+
+
+def test_lru_evicts_least_recently_used_not_oldest_write(clock):
+    cache, metrics = _cache(max_entries=2)
+
+    async def run() -> list[str | None]:
+        await cache.set("a", "A")
+        clock.now += 1
+        await cache.set("b", "B")
+        clock.now += 1
+        assert await cache.get("a") == "A"  # a 比 b 先寫入，但最近剛被使用
+        clock.now += 1
+        await cache.set("c", "C")
+        return [await cache.get(k) for k in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == ["A", None, "C"]
+    assert metrics.snapshot()["cache.eviction"] == 1
+
+
+def test_expired_members_are_pruned_from_lru_index(clock):
+    cache, metrics = _cache(max_entries=2, ttl_seconds=10)
+
+    async def run() -> dict:
+        await cache.set("a", "A")
+        clock.now += 11
+        await cache.set("b", "B")
+        await cache.set("c", "C")
+        return await cache.stats()
+
+    # a 在 LRU 索引中已過期，會先被清掉，不占名額也不算淘汰
+    assert asyncio.run(run())["size"] == 2
+    assert "cache.eviction" not in metrics.snapshot()
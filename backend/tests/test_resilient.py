@@ -0,0 +1,177 @@
+# backend/tests/test_resilient.py
+import asyncio
+
+import pytest
+from google.genai import errors as genai_errors
+
+from backend.services.chat.clients import resilient
+from backend.services.chat.clients.resilient import (
+    CircuitBreaker,
+    ResilientModels,
+    RetryPolicy,
+    UpstreamUnavailableError,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(resilient, "time", clock)
+    return clock
+
+
+def _breaker() -> CircuitBreaker:
+    return CircuitBreaker(failure_threshold=2, recovery_seconds=30)
+
+
+def _open(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_success()  # 成功會清掉連續失敗數
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(UpstreamUnavailableError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_after == 30
+
+
+def test_half_open_allows_single_probe(clock):
+    breaker = _breaker()
+    _open(breaker)
+    clock.now += 30
+    assert breaker.state == "half_open"
+
+    breaker.before_call()
+    with pytest.raises(UpstreamUnavailableError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = _breaker()
+    _open(breaker)
+    clock.now += 30
+
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    clock.now += 29
+    with pytest.raises(UpstreamUnavailableError):
+        breaker.before_call()
+
+
+def test_released_probe_lets_next_request_probe(clock):
+    breaker = _breaker()
+    _open(breaker)
+    clock.now += 30
+
+    breaker.before_call()
+    breaker.release_probe()
+
+    assert breaker.state == "half_open"
+    breaker.before_call()
+
+
+class _FakeModels:
+    def __init__(self, behaviour) -> None:
+        self.behaviour = behaviour
+
+    async def generate_content(self, **kwargs):
+        return self.behaviour()
+
+    async def generate_content_stream(self, **kwargs):
+        return self.behaviour()
+
+
+def _models(behaviour, breaker: CircuitBreaker) -> ResilientModels:
+    client = type("Client", (), {"models": _FakeModels(behaviour)})()
+    return ResilientModels(
+        lambda: client,
+        policy=RetryPolicy(timeout_seconds=5, max_retries=0, backoff_base_seconds=0, backoff_max_seconds=0),
+        breaker=breaker,
+        hedge_enabled=False,
+        hedge_min_seconds=1,
+    )
+
+
+def _client_error():
+    raise genai_errors.ClientError(400, {"error": {"code": 400, "message": "bad", "status": "INVALID_ARGUMENT"}})
+
+
+def test_non_retryable_error_during_probe_does_not_close(clock):
+    breaker = _breaker()
+    _open(breaker)
+    clock.now += 30
+
+    with pytest.raises(genai_errors.ClientError):
+        asyncio.run(_models(_client_error, breaker).generate_content(model="m"))
+
+    # 試探沒有結論：維持半開，下一個請求仍可試探
+    assert breaker.state == "half_open"
+    breaker.before_call()
+
+
+def test_retryable_errors_count_toward_opening(clock):
+    breaker = _breaker()
+
+    def server_error():
+        raise genai_errors.ServerError(503, {"error": {"code": 503, "message": "busy", "status": "UNAVAILABLE"}})
+
+    models = _models(server_error, breaker)
+    for _ in range(2):
+        with pytest.raises(UpstreamUnavailableError):
+            asyncio.run(models.generate_content(model="m"))
+    assert breaker.state == "open"
+
+
+async def _chunks(n: int):
+    for i in range(n):
+        yield i
+
+
+def test_abandoned_stream_probe_is_released_not_success(clock):
+    breaker = _breaker()
+    _open(breaker)
+    clock.now += 30
+
+    async def run() -> None:
+        stream = await _models(lambda: _chunks(3), breaker).generate_content_stream(model="m")
+        assert await stream.__anext__() == 0
+        await stream.aclose()
+
+    asyncio.run(run())
+    assert breaker.state == "half_open"
+
+
+def test_completed_stream_probe_closes(clock):
+    breaker = _breaker()
+    _open(breaker)
+    clock.now += 30
+
+    async def run() -> list[int]:
+        stream = await _models(lambda: _chunks(3), breaker).generate_content_stream(model="m")
+        return [chunk async for chunk in stream]
+
+    assert asyncio.run(run()) == [0, 1, 2]
+    assert breaker.state == "closed"
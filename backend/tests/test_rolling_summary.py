@@ -0,0 +1,105 @@
+# backend/tests/test_rolling_summary.py
+import asyncio
+from uuid import uuid4
+
+from backend.schemas.chat import Turn
+from backend.services.chat import backends
+from backend.services.chat.summary import ConversationWindow, RollingSummarizer
+
+
+class _FakeBackend:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def generate(self, prompt, *, tier, on_usage=None):
+        text = prompt.contents[0].parts[0].text
+        self.calls.append(text)
+        return f"摘要{len(self.calls)}"
+
+
+def _conversation(n: int) -> list[tuple[int, Turn]]:
+    # 訊息 id 與其他對話共用序列，刻意不連號
+    return [(10 + i * 3, Turn(role="user" if i % 2 == 0 else "ai", content=f"第{i}則")) for i in range(n)]
+
+
+def _summarizer(load_older=None) -> RollingSummarizer:
+    return RollingSummarizer(
+        max_summary_tokens=400,
+        max_entries=16,
+        max_background=4,
+        refresh_turns=6,
+        load_older=load_older,
+    )
+
+
+def test_sliding_window_reuses_summary_and_batches_refreshes(monkeypatch):
+    backend = _FakeBackend()
+    monkeypatch.setattr(backends, "get_chat_backend", lambda: backend)
+    messages = _conversation(40)
+
+    def load_older(conversation_id, after_id, before_id):
+        return [(i, t) for i, t in messages if (after_id is None or i > after_id) and i < before_id]
+
+    summarizer = _summarizer(load_older=load_older)
+    conversation_id = uuid4()
+
+    async def run() -> None:
+        # 模擬 store：每輪多兩則，最多載入 16 則，prompt 只放最後 8 則
+        for total in range(18, 41, 2):
+            loaded = messages[max(0, total - 16):total]
+            window = ConversationWindow(
+                conversation_id=conversation_id,
+                message_ids=[message_id for message_id, _ in loaded],
+                has_older=total > 16,
+            )
+            dropped = [t for _, t in loaded[:-8]]
+            summarizer.summarize(dropped, window)
+            await asyncio.gather(*summarizer._pending.values())
+
+    asyncio.run(run())
+    # 12 輪共擠出 32 則：第一次補讀 + 之後每累積 6 則才濃縮一次，而不是每輪都呼叫模型
+    assert len(backend.calls) == 4
+    # 已併入的訊息各只出現一次；最後 4 則還不到 refresh_turns，先以節錄暫代
+    summarized = "".join(backend.calls)
+    assert "：第28則" not in summarized
+    for i in range(0, 28):
+        assert summarized.count(f"：第{i}則") == 1
+
+
+def test_behind_window_backfills_from_store(monkeypatch):
+    backend = _FakeBackend()
+    monkeypatch.setattr(backends, "get_chat_backend", lambda: backend)
+    messages = _conversation(20)
+    requests: list[tuple] = []
+
+    def load_older(conversation_id, after_id, before_id):
+        requests.append((after_id, before_id))
+        return [(message_id, t) for message_id, t in messages if message_id < before_id]
+
+    summarizer = _summarizer(load_older=load_older)
+    conversation_id = uuid4()
+    loaded = messages[4:]
+    window = ConversationWindow(
+        conversation_id=conversation_id,
+        message_ids=[message_id for message_id, _ in loaded],
+        has_older=True,
+    )
+
+    async def run() -> tuple[str, str]:
+        dropped = [t for _, t in loaded[:-8]]
+        first = summarizer.summarize(dropped, window)
+        await asyncio.gather(*summarizer._pending.values())
+        return first, summarizer.summarize(dropped, window)
+
+    first, second = asyncio.run(run())
+    assert requests == [(None, loaded[0][0])]
+    assert "第0則" in backend.calls[0] and "第11則" in backend.calls[0]
+    assert first != second == "摘要1"
+
+
+def test_client_history_uses_excerpts_without_model(monkeypatch):
+    backend = _FakeBackend()
+    monkeypatch.setattr(backends, "get_chat_backend", lambda: backend)
+    summary = _summarizer().summarize([t for _, t in _conversation(4)], None)
+    assert "使用者：第0則" in summary
+    assert backend.calls == []
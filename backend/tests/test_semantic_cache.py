@@ -0,0 +1,112 @@
+# backend/tests/test_semantic_cache.py
+import asyncio
+
+import numpy as np
+import pytest
+
+from backend.services.chat import service
+from backend.services.chat.cache import semantic
+from backend.services.chat.cache.semantic import SemanticCache
+from backend.services.chat.embeddings import HashingEmbedder
+from backend.services.chat.metrics import ChatMetrics
+from backend.services.chat.prompt import build_prompt
+from backend.services.chat.routing import ModelTier
+
+_LITE = ModelTier(name="lite", model="gemini-lite", max_output_tokens=64, thinking_budget=0)
+_STANDARD = ModelTier(name="standard", model="gemini-standard", max_output_tokens=64, thinking_budget=0)
+
+
+def _embed(*texts: str) -> np.ndarray:
+    return asyncio.run(HashingEmbedder(dim=256).embed(list(texts)))
+
+
+def _cache(threshold: float = 0.8, ttl_seconds: float = 60.0) -> SemanticCache:
+    return SemanticCache(capacity=8, dim=256, threshold=threshold, ttl_seconds=ttl_seconds, metrics=ChatMetrics())
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    first = _embed("推薦一張顯卡", "今天天氣如何")
+    second = asyncio.run(HashingEmbedder(dim=256).embed(["推薦一張顯卡", "今天天氣如何"]))
+
+    assert first.shape == (2, 256)
+    assert first.dtype == np.float32
+    np.testing.assert_array_equal(first, second)
+    np.testing.assert_allclose(np.linalg.norm(first, axis=1), 1.0, rtol=1e-6)
+    # 全形 / 半形、大小寫、空白不影響結果
+    np.testing.assert_allclose(_embed("RTX 4060"), _embed("ｒｔｘ４０６０"), rtol=1e-6)
+
+
+def test_lookup_respects_threshold():
+    cache = _cache(threshold=0.8)
+    query, paraphrase, unrelated = _embed("推薦一張顯卡", "推薦一張顯示卡", "今天天氣如何")
+    cache.add(query, "回覆")
+
+    assert float(query @ paraphrase) >= 0.8
+    assert cache.lookup(paraphrase) == "回覆"
+    assert cache.lookup(unrelated) is None
+
+    strict = _cache(threshold=0.9)
+    strict.add(query, "回覆")
+    assert strict.lookup(paraphrase) is None
+    assert strict.lookup(query) == "回覆"
+
+
+def test_lookup_skips_expired_rows(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(semantic.time, "monotonic", lambda: now[0])
+    cache = _cache(ttl_seconds=60)
+    query = _embed("推薦一張顯卡")[0]
+    cache.add(query, "回覆")
+
+    now[0] += 61
+    assert cache.lookup(query) is None
+
+
+def test_partitions_do_not_share_replies():
+    cache = _cache()
+    query = _embed("推薦一張顯卡")[0]
+    cache.add(query, "lite 回覆", partition="lite")
+
+    assert cache.lookup(query, partition="lite") == "lite 回覆"
+    assert cache.lookup(query, partition="standard") is None
+
+    cache.add(query, "standard 回覆", partition="standard")
+    assert cache.lookup(query, partition="standard") == "standard 回覆"
+    assert cache.lookup(query, partition="lite") == "lite 回覆"
+
+
+def _probe(monkeypatch, cache: SemanticCache, message: str, *, tier: ModelTier, verified: bool):
+    monkeypatch.setattr(service, "get_response_cache", lambda: None)
+    monkeypatch.setattr(service, "get_semantic_cache", lambda: cache)
+    return asyncio.run(service._probe_caches(
+        [],
+        build_prompt(message, []),
+        embedding=_embed(message)[0],
+        tier=tier,
+        verified=verified,
+        bypass_cache=False,
+    ))
+
+
+def test_budget_paraphrases_skip_semantic_cache(monkeypatch):
+    # 不同預算的問法只差一個字，門檻夠低時就會互相命中
+    cache = _cache(threshold=0.75)
+    three, five = _embed("3萬怎麼配", "5萬怎麼配")
+    assert float(three @ five) >= 0.75
+    cache.add(three, "3 萬的配單", partition=_STANDARD.name)
+
+    cached, probe = _probe(monkeypatch, cache, "5萬怎麼配", tier=_STANDARD, verified=True)
+
+    assert cached is None
+    assert probe.embedding is None  # 也不會寫回近似快取
+
+
+@pytest.mark.parametrize(("tier", "hit"), [(_STANDARD, True), (_LITE, False)])
+def test_semantic_cache_is_partitioned_by_tier(monkeypatch, tier, hit):
+    cache = _cache()
+    cache.add(_embed("推薦一張顯卡")[0], "standard 回覆", partition=_STANDARD.name)
+
+    cached, probe = _probe(monkeypatch, cache, "推薦一張顯示卡", tier=tier, verified=False)
+
+    assert cached == ("standard 回覆" if hit else None)
+    assert probe.partition == tier.name
@@ -0,0 +1,125 @@
+# backend/tests/test_session_generations.py
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from backend.api.auth.config import SESSION_COOKIE_NAME
+from backend.api.auth.utils import get_valid_session_from_request
+from backend.models import Session as SessionModel, User
+from backend.services.auth.sessions import generations
+from backend.services.auth.sessions.cache import CachedSessionStore
+from backend.services.auth.sessions.generations import SessionGenerations, bump_session_generation
+from backend.services.auth.sessions.types import ResolvedSession, SessionUser, parse_session_id
+
+
+@pytest.fixture
+def user(db) -> User:
+    user = User(email="gen@example.com", username="gen", password_hash="x", is_active=True)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _login(db, user: User) -> SessionModel:
+    session = SessionModel(
+        id=uuid4(),
+        user_id=user.id,
+        expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+        generation=user.session_generation,
+    )
+    db.add(session)
+    db.commit()
+    return session
+
+
+def _request(session: SessionModel) -> SimpleNamespace:
+    return SimpleNamespace(cookies={SESSION_COOKIE_NAME: str(session.id)})
+
+
+def _revoke_all(db, user: User) -> None:
+    bump_session_generation(db, user.id)
+    db.commit()
+
+
+def test_rotation_lookup_rejects_mass_revoked_session(db, user):
+    session = _login(db, user)
+    assert get_valid_session_from_request(_request(session), db).id == session.id
+
+    _revoke_all(db, user)
+
+    assert get_valid_session_from_request(_request(session), db) is None
+    # 撤銷後重新登入的 session 帶新的 generation，不受影響
+    db.refresh(user)
+    fresh = _login(db, user)
+    assert get_valid_session_from_request(_request(fresh), db).id == fresh.id
+
+
+class _FakeBackend:
+    """回傳預先登記的 session；與 DbSessionStore 相同，generation 與 users 不符時視為無效。"""
+
+    def __init__(self, session_factory) -> None:
+        self.session_factory = session_factory
+        self.sessions: dict = {}
+
+    def resolve(self, raw_token):
+        session = self.sessions.get(parse_session_id(raw_token))
+        if session is None:
+            return None
+        with self.session_factory() as db:
+            if db.get(User, session.user.id).session_generation != session.generation:
+                return None
+        return session
+
+    def session_id(self, raw_token):
+        return parse_session_id(raw_token)
+
+    def invalidate_user(self, user_id):
+        return None
+
+    def stats(self):
+        return {}
+
+
+def _cached_store(monkeypatch, session_factory, db, user, *, generation_ttl: float):
+    monkeypatch.setattr(generations, "SessionLocal", session_factory)
+    session = _login(db, user)
+    backend = _FakeBackend(session_factory)
+    backend.sessions[session.id] = ResolvedSession(
+        session_id=session.id,
+        kind="login",
+        expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+        user=SessionUser(id=user.id, is_active=True),
+        generation=session.generation,
+    )
+    store = CachedSessionStore(
+        backend,
+        SessionGenerations(ttl_seconds=generation_ttl, max_users=16),
+        max_entries=16,
+        ttl_seconds=60,
+    )
+    return store, str(session.id)
+
+
+def test_cached_session_rejected_after_generation_expires(monkeypatch, session_factory, db, user):
+    store, cookie = _cached_store(monkeypatch, session_factory, db, user, generation_ttl=0)
+    assert store.resolve(cookie) is not None
+
+    # 其他 worker 整批撤銷：本 worker 的 session 快取仍在，但 generation 重新讀取後不符
+    _revoke_all(db, user)
+
+    assert store.resolve(cookie) is None
+    assert store.stats()["cached_sessions"] == 0
+
+
+def test_invalidate_user_takes_effect_immediately(monkeypatch, session_factory, db, user):
+    store, cookie = _cached_store(monkeypatch, session_factory, db, user, generation_ttl=3600)
+    assert store.resolve(cookie) is not None
+
+    _revoke_all(db, user)
+    # generation 快取還沒過期：同一 worker 靠 invalidate_user 立即生效
+    assert store.resolve(cookie) is not None
+    store.invalidate_user(user.id)
+
+    assert store.resolve(cookie) is None
@@ -0,0 +1,51 @@
+# backend/tests/test_session_revocations.py
+import dataclasses
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from backend.models import Session as SessionModel, User
+from backend.services.auth.sessions import signed
+from backend.services.auth.sessions.signed import RevocationSet, SessionTokenSigner
+from backend.services.auth.sessions.types import ResolvedSession, SessionUser
+
+_LIFETIME = timedelta(hours=2)
+
+
+def test_revocation_outlives_unflushed_renewal(monkeypatch, session_factory, db):
+    monkeypatch.setattr(signed, "SessionLocal", session_factory)
+    user = User(email="rev@example.com", username="rev", password_hash="x", is_active=True)
+    db.add(user)
+    db.commit()
+
+    # 續期後的 token 帶著延長的 exp，但 worker 在 flush 前當掉：DB 的 expires_at 仍是舊的（已過）
+    now = datetime.now(timezone.utc)
+    row = SessionModel(
+        id=uuid4(),
+        user_id=user.id,
+        expires_at=now - timedelta(minutes=5),
+        generation=user.session_generation,
+        revoked=True,
+    )
+    db.add(row)
+    db.commit()
+
+    signer = SessionTokenSigner("k")
+    session = ResolvedSession(
+        session_id=row.id,
+        kind="login",
+        expires_at=now - timedelta(minutes=5),
+        user=SessionUser(id=user.id, is_active=True),
+        generation=row.generation,
+    )
+    token = signer.issue(dataclasses.replace(session, expires_at=now + _LIFETIME - timedelta(minutes=5)))
+    assert signer.verify(token) is not None
+
+    revocations = RevocationSet(max_token_lifetime=_LIFETIME)
+    revocations.sync()
+    assert row.id in revocations
+
+    # 超過一個效期之後 token 必定已過期，撤銷才會移出集合
+    row.expires_at = now - _LIFETIME - timedelta(minutes=1)
+    db.commit()
+    revocations.sync()
+    assert row.id not in revocations
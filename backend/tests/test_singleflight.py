@@ -0,0 +1,110 @@
+# backend/tests/test_singleflight.py
+import asyncio
+
+import pytest
+
+from backend.services.chat.singleflight import SingleFlight
+
+
+class _Upstream:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return "回覆"
+
+
+async def _settle() -> None:
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_callers_share_one_call():
+    async def run() -> None:
+        flights = SingleFlight()
+        upstream = _Upstream()
+        callers = [asyncio.ensure_future(flights.do("k", upstream)) for _ in range(3)]
+        await _settle()
+        assert flights.stats() == {"in_flight": 1, "waiters": 3}
+
+        upstream.release.set()
+        assert await asyncio.gather(*callers) == ["回覆"] * 3
+        assert upstream.calls == 1
+        assert flights.stats() == {"in_flight": 0, "waiters": 0}
+
+    asyncio.run(run())
+
+
+def test_cancelling_one_waiter_keeps_shared_call_running():
+    async def run() -> None:
+        flights = SingleFlight()
+        upstream = _Upstream()
+        leader = asyncio.ensure_future(flights.do("k", upstream))
+        follower = asyncio.ensure_future(flights.do("k", upstream))
+        await _settle()
+
+        leader.cancel()
+        await _settle()
+        assert leader.cancelled()
+        assert not upstream.cancelled
+        assert flights.stats() == {"in_flight": 1, "waiters": 1}
+
+        upstream.release.set()
+        assert await follower == "回覆"
+
+    asyncio.run(run())
+
+
+def test_last_waiter_leaving_cancels_upstream():
+    async def run() -> None:
+        flights = SingleFlight()
+        upstream = _Upstream()
+        callers = [asyncio.ensure_future(flights.do("k", upstream)) for _ in range(2)]
+        await _settle()
+
+        for caller in callers:
+            caller.cancel()
+        await _settle()
+
+        assert upstream.cancelled
+        assert flights.stats() == {"in_flight": 0, "waiters": 0}
+        # 之後的同 key 呼叫重新執行，不會拿到已取消的 task
+        upstream.release.set()
+        assert await flights.do("k", upstream) == "回覆"
+        assert upstream.calls == 2
+
+    asyncio.run(run())
+
+
+def test_join_shares_leader_exception():
+    async def run() -> None:
+        flights = SingleFlight()
+        gate = asyncio.Event()
+
+        async def failing() -> str:
+            await gate.wait()
+            raise ValueError("upstream 4xx")
+
+        leader = asyncio.ensure_future(flights.do("k", failing))
+        await _settle()
+        assert flights.in_flight("k")
+        joiner = asyncio.ensure_future(flights.join("k"))
+        await _settle()
+
+        gate.set()
+        for task in (leader, joiner):
+            with pytest.raises(ValueError):
+                await task
+        assert not flights.in_flight("k")
+        with pytest.raises(KeyError):
+            await flights.join("k")
+
+    asyncio.run(run())
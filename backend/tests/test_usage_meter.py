@@ -0,0 +1,96 @@
+# backend/tests/test_usage_meter.py
+from collections.abc import Callable
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import Select
+
+from backend.services.chat import usage
+from backend.services.chat.usage import TokenCounts, UsageMeter
+
+
+class _FakeDatabase:
+    """
+    token_usage 只記一個使用者的總量。
+    on_select 讓測試在「查詢送出」與「結果回來」之間插入另一個 worker thread 的 flush。
+    """
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.selects = 0
+        self.on_select: Callable[[], None] | None = None
+        # True：查詢看到的是 on_select 之前的資料；False：看到的是之後的
+        self.snapshot_before = True
+
+    def __call__(self) -> "_FakeDatabase":
+        return self
+
+    def __enter__(self) -> "_FakeDatabase":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def execute(self, stmt):
+        if isinstance(stmt, Select):
+            self.selects += 1
+            seen = self.total
+            hook, self.on_select = self.on_select, None
+            if hook is not None:
+                hook()
+            if not self.snapshot_before:
+                seen = self.total
+            return _Result((seen, seen))
+        params = stmt.compile(dialect=postgresql.dialect()).params
+        self.total += sum(value for key, value in params.items() if key.startswith("total_tokens"))
+        return None
+
+    def commit(self) -> None:
+        return None
+
+
+class _Result:
+    def __init__(self, row) -> None:
+        self.row = row
+
+    def one(self):
+        return self.row
+
+
+@pytest.fixture
+def database(monkeypatch) -> _FakeDatabase:
+    database = _FakeDatabase()
+    monkeypatch.setattr(usage, "SessionLocal", database)
+    return database
+
+
+def _meter() -> UsageMeter:
+    return UsageMeter(daily_quota=1000, monthly_quota=0, counter_ttl_seconds=60)
+
+
+@pytest.mark.parametrize("snapshot_before", [True, False])
+def test_flush_during_load_is_counted_once(database, snapshot_before):
+    meter = _meter()
+    flushed: list[int] = []
+    meter.record(1, TokenCounts(total_tokens=300, requests=1))
+    database.snapshot_before = snapshot_before
+    database.on_select = lambda: flushed.append(meter.flush())
+
+    counter = meter._load_counter(1)
+
+    assert flushed == [1]
+    assert database.total == 300
+    # 不論查詢看到 flush 之前或之後的資料都不會少算 / 重複計算
+    assert counter.day_total == 300
+    assert database.selects == 2
+
+
+def test_pending_usage_is_added_to_db_total(database):
+    meter = _meter()
+    database.total = 500
+    meter.record(1, TokenCounts(total_tokens=200, requests=1))
+
+    counter = meter._load_counter(1)
+
+    assert counter.day_total == 700
+    assert database.selects == 1
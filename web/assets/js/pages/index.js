@@ -1,5 +1,5 @@
 // web/assets/js/index.js
-const API = "/api/chat";
+const API = "/api/chat/stream";  // SSE 串流版本（/api/chat 仍保留一次回傳）
 const log = document.getElementById('log');
 const chatInput = document.getElementById('chat-input');
 const chatSendBtn = document.getElementById('chat-send-btn');
@@ -24,9 +24,8 @@ function clearVerifySessionStorage() {
   }
 }
 
-/* === 新增：在前端保存最近 N 筆對話（純文字） === */
-const HISTORY_LIMIT = 8;
-const history = [];  // [{role:"user"|"ai", content:"..."}]
+/* 對話紀錄由伺服器保存：前端只記住 conversation_id，每次只送本輪訊息 */
+let conversationId = null;
 
 function row(who, innerHTML) {
   const wrap = document.createElement('div');
@@ -50,6 +49,89 @@ function appendMarkdown(who, md, inline=false) {
   log.scrollTop = log.scrollHeight;
 }
 
+/* 串流用：先放一個空的 AI 泡泡，之後每收到一段文字就整段重新渲染 */
+function appendStreamingBubble() {
+  const wrap = row('ai', '');
+  log.appendChild(wrap);
+  log.scrollTop = log.scrollHeight;
+  const message = wrap.querySelector('.message');
+  return {
+    render(md) {
+      message.innerHTML = DOMPurify.sanitize(marked.parse(md));
+      log.scrollTop = log.scrollHeight;
+    },
+    remove() {
+      wrap.remove();
+    },
+  };
+}
+
+/* 解析 SSE：以空行分隔事件，回傳 [{event, data}]，剩餘未完整的片段留在 buffer */
+function parseSseEvents(buffer) {
+  const events = [];
+  let idx;
+  while ((idx = buffer.indexOf("\n\n")) !== -1) {
+    const raw = buffer.slice(0, idx);
+    buffer = buffer.slice(idx + 2);
+
+    let event = "message";
+    const dataLines = [];
+    for (const line of raw.split("\n")) {
+      if (line.startsWith("event:")) event = line.slice(6).trim();
+      else if (line.startsWith("data:")) dataLines.push(line.slice(5).trimStart());
+    }
+    if (!dataLines.length) continue;
+
+    try {
+      events.push({ event, data: JSON.parse(dataLines.join("\n")) });
+    } catch (_) {
+      // 非 JSON 的事件直接忽略
+    }
+  }
+  return { events, rest: buffer };
+}
+
+/* 讀取 /api/chat/stream 的回應，邊收邊畫；回傳完整回覆（失敗時拋錯） */
+async function readChatStream(r) {
+  const bubble = appendStreamingBubble();
+  const reader = r.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let text = "";
+
+  try {
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      const parsed = parseSseEvents(buffer);
+      buffer = parsed.rest;
+
+      for (const { event, data } of parsed.events) {
+        if (event === "delta") {
+          text += String(data?.text ?? "");
+          bubble.render(text);
+        } else if (event === "done") {
+          text = String(data?.reply ?? text);
+          if (data?.conversation_id) conversationId = String(data.conversation_id);
+          bubble.render(text);
+          return text;
+        } else if (event === "error") {
+          throw new Error(String(data?.errors?._global ?? "stream error"));
+        }
+      }
+    }
+  } catch (e) {
+    bubble.remove();
+    throw e;
+  }
+
+  // 連線結束但沒收到 done：視為中斷
+  bubble.remove();
+  throw new Error("stream closed");
+}
+
 /* 自動增高維持你原本版本 */
 function autoResize() {
   const maxPx = Math.floor(window.innerHeight * 0.40);
@@ -73,11 +155,9 @@ if (!chatEnabled) {
   // UI 先顯示
   appendMarkdown('user', m, true);
 
-  // === 準備 payload：把最近 N 筆 history 一起送到後端 ===
-  const payload = {
-    message: m,
-    history: history.slice(-HISTORY_LIMIT)   // 注意：role 必須是 "user" 或 "ai"
-  };
+  // === 準備 payload：只送本輪訊息；有 conversation_id 時由後端接續脈絡 ===
+  const payload = { message: m };
+  if (conversationId) payload.conversation_id = conversationId;
 
   chatInput.value = '';
   autoResize();
@@ -104,26 +184,25 @@ if (!chatEnabled) {
       return;
     }
 
+    // 404：對話已不存在（例如被清除）→ 下一句改開新對話
+    if (r.status === 404) {
+      conversationId = null;
+      appendMarkdown("ai", "找不到先前的對話紀錄，請重新送出訊息開始新對話。", false);
+      return;
+    }
+
     // 其他非 2xx：顯示一般錯誤（不要當成登出）
     if (!r.ok) {
       appendMarkdown("ai", "目前服務暫時無法處理請求，請稍後再試。", false);
       return;
     }
 
-    // 只有成功才解析 JSON
-    const data = await r.json();
-    const aiText = String(data?.reply ?? "");
-
-    // UI 顯示 AI
-    appendMarkdown('ai', aiText, false);
-
-    // === 成功後再把「本輪」加入 history（純文字，不要塞 HTML）===
-    history.push({ role: 'user', content: m });
-    history.push({ role: 'ai', content: aiText });
-
-    // 可選：只保留上限，避免記憶體暴增
-    if (history.length > HISTORY_LIMIT * 2) {
-      history.splice(0, history.length - HISTORY_LIMIT * 2);
+    // 只有成功才開始讀串流（SSE），邊收邊顯示 AI 回覆；本輪紀錄由後端自行追加
+    try {
+      await readChatStream(r);
+    } catch (_) {
+      appendMarkdown("ai", "目前服務暫時無法處理請求，請稍後再試。", false);
+      return;
     }
   } catch (e) {
     appendMarkdown('ai', `發生錯誤：\`${String(e)}\``, false);